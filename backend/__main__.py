@@ -1,10 +1,74 @@
-"""Run the API from project root: python -m backend"""
-import uvicorn
+"""
+Run from project root:
+  python -m backend                          API (uvicorn, auto-reload)
+  python -m backend worker [--concurrency N] [--metrics-port P]
+                                             scoring worker pulling from the shared job queue
+  python -m backend score-batch --calibration <id> <dir-or-zip>
+                                             offline parse + score of a folder/ZIP of PDFs
+"""
+import argparse
+import logging
+import sys
+from pathlib import Path
+
+from dotenv import load_dotenv
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog="python -m backend")
+    commands = parser.add_subparsers(dest="command")
+    worker = commands.add_parser("worker", help="Score jobs from the shared queue (scale out by running more).")
+    worker.add_argument("--concurrency", type=int, default=None, help="Concurrent jobs (default: SCORING_WORKERS).")
+    worker.add_argument("--metrics-port", type=int, default=None, help="Serve this worker's /metrics on a port.")
+    batch = commands.add_parser("score-batch", help="Parse and score a directory or ZIP of PDFs on a process pool.")
+    batch.add_argument("input", type=Path, help="Directory (searched recursively), ZIP archive or single PDF.")
+    batch.add_argument("--calibration", required=True, help="Calibration id to score against and import into.")
+    batch.add_argument("--output", type=Path, default=None, help="NDJSON results/checkpoint (default: <input>.scores.ndjson).")
+    batch.add_argument("--workers", type=int, default=None, help="Pool size (default: CPU count).")
+    batch.add_argument("--resume", action="store_true", help="Skip files already scored in --output.")
+    batch.add_argument("--rule-based", action="store_true", help="Rule-based scoring only (no LLM calls).")
+    batch.add_argument("--no-commit", action="store_true", help="Only write NDJSON; do not import into the store.")
+    batch.add_argument("--direct", action="store_true", help="Write the data file directly (only when the API is not running).")
+    args = parser.parse_args()
+
+    if args.command in ("worker", "score-batch"):
+        load_dotenv(Path(__file__).resolve().parent / ".env")
+        logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+
+    if args.command == "worker":
+        from backend.scoring_tasks import run_worker
+
+        run_worker(args.concurrency, args.metrics_port)
+        return
+
+    if args.command == "score-batch":
+        from backend.batch_scoring import run_batch
+
+        try:
+            summary = run_batch(
+                args.calibration,
+                args.input,
+                output=args.output,
+                workers=args.workers,
+                resume=args.resume,
+                rule_based=args.rule_based,
+                commit=not args.no_commit,
+                direct=args.direct,
+            )
+        except ValueError as exc:
+            parser.exit(2, f"score-batch: {exc}\n")
+        print(summary.report(), file=sys.stderr)
+        return
+
+    import uvicorn
 
-if __name__ == "__main__":
     uvicorn.run(
         "backend.main:app",
         host="0.0.0.0",
         port=8000,
         reload=True,
     )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,253 @@
+"""
+Offline bulk scoring: `python -m backend score-batch --calibration <id> <dir-or-zip>`.
+
+Parses and scores every PDF in a directory (recursively) or a ZIP archive on a process
+pool, outside the HTTP path. Each result is appended to an NDJSON file as soon as it is
+ready; that file doubles as the checkpoint, so `--resume` skips files already scored.
+When the run finishes, all new candidates are written to the store in one commit:
+published to the job queue outbox for the API process to apply (it owns the data file),
+or written directly with `--direct` when no API is running.
+"""
+from __future__ import annotations
+
+import json
+import os
+import sys
+import time
+import uuid
+import zipfile
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Iterator, Optional, TextIO
+
+from backend import store
+from backend.models import CandidateProfile, RankingPayload
+
+MAX_FILE_SIZE_BYTES = 15 * 1024 * 1024  # same per-file cap as POST /api/upload
+
+
+@dataclass
+class BatchSummary:
+    total: int = 0
+    skipped: int = 0
+    ok: int = 0
+    errors: int = 0
+    parse_seconds: float = 0.0
+    score_seconds: float = 0.0
+    elapsed_seconds: float = 0.0
+    engines: dict[str, int] = field(default_factory=dict)
+
+    @property
+    def processed(self) -> int:
+        return self.ok + self.errors
+
+    @property
+    def files_per_second(self) -> float:
+        return self.processed / self.elapsed_seconds if self.elapsed_seconds > 0 else 0.0
+
+    def record(self, result: dict) -> None:
+        if result["status"] == "ok":
+            self.ok += 1
+            engine = result.get("engine") or "unknown"
+            self.engines[engine] = self.engines.get(engine, 0) + 1
+        else:
+            self.errors += 1
+        self.parse_seconds += result.get("parse_seconds") or 0.0
+        self.score_seconds += result.get("score_seconds") or 0.0
+
+    def report(self) -> str:
+        processed = max(self.processed, 1)
+        engines = ", ".join(f"{k} {v}" for k, v in sorted(self.engines.items())) or "none"
+        return (
+            f"{self.processed}/{self.total} files in {self.elapsed_seconds:.1f}s ({self.files_per_second:.2f} files/s); "
+            f"ok {self.ok}, errors {self.errors}, skipped (checkpoint) {self.skipped}; "
+            f"avg parse {self.parse_seconds / processed:.2f}s, avg score {self.score_seconds / processed:.2f}s per file; "
+            f"engines: {engines}"
+        )
+
+
+def iter_sources(path: Path) -> Iterator[str]:
+    """Source keys for every PDF: file paths for a directory, "archive.zip!entry" for ZIP members."""
+    if path.is_dir():
+        for pdf in sorted(path.rglob("*")):
+            if pdf.is_file() and pdf.suffix.lower() == ".pdf":
+                yield str(pdf)
+    elif zipfile.is_zipfile(path):
+        with zipfile.ZipFile(path) as archive:
+            for info in archive.infolist():
+                if not info.is_dir() and info.filename.lower().endswith(".pdf"):
+                    yield f"{path}!{info.filename}"
+    elif path.suffix.lower() == ".pdf":
+        yield str(path)
+    else:
+        raise ValueError(f"{path} is not a directory, ZIP archive or PDF.")
+
+
+def _read_source(source: str) -> bytes:
+    archive_path, sep, entry = source.partition("!")
+    if sep and zipfile.is_zipfile(archive_path):
+        with zipfile.ZipFile(archive_path) as archive:
+            if archive.getinfo(entry).file_size > MAX_FILE_SIZE_BYTES:
+                raise ValueError("File exceeds the 15 MB limit.")
+            return archive.read(entry)
+    if os.path.getsize(source) > MAX_FILE_SIZE_BYTES:
+        raise ValueError("File exceeds the 15 MB limit.")
+    return Path(source).read_bytes()
+
+
+def _candidate_name(source: str) -> str:
+    base = Path(source.rpartition("!")[2] or source).stem
+    return base.replace("_", " ").replace("-", " ").strip() or "Unknown"
+
+
+def _process_file(source: str, calibration: dict, rule_based: bool) -> dict:
+    """Pool task: parse and score one PDF. Never raises; failures come back as status "error"."""
+    from backend.parser import parse_pdf_cached
+    from backend.scoring_engine import score_resume, score_resume_rule_based
+
+    result: dict = {"source": source, "name": _candidate_name(source), "candidate_id": str(uuid.uuid4())}
+    started = time.perf_counter()
+    try:
+        parsed = parse_pdf_cached(_read_source(source))
+        text = parsed.text.strip()
+        result["content_sha256"] = parsed.sha256
+        result["parser"] = parsed.parser
+        result["parse_seconds"] = round(time.perf_counter() - started, 3)
+        started = time.perf_counter()
+        payload = (score_resume_rule_based if rule_based else score_resume)(calibration, text)
+        result["score_seconds"] = round(time.perf_counter() - started, 3)
+    except Exception as exc:
+        result.update(status="error", error=str(exc) or type(exc).__name__)
+        return result
+    result.update(
+        status="ok",
+        total_score=payload.total_score,
+        engine=payload.engine,
+        summary=payload.summary,
+        parsed_text=text,
+        scoring=payload.model_dump(mode="json"),
+    )
+    return result
+
+
+def load_checkpoint(output: Path) -> dict[str, dict]:
+    """Successful results from a previous run's NDJSON output, by source. Truncated trailing lines are ignored."""
+    done: dict[str, dict] = {}
+    if not output.exists():
+        return done
+    with output.open(encoding="utf-8") as fh:
+        for line in fh:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            if record.get("status") == "ok" and record.get("source"):
+                done[record["source"]] = record
+    return done
+
+
+def commit_results(calibration_id: str, generation: int, records: list[dict], direct: bool) -> tuple[int, int]:
+    """Write candidates + scores in one store commit. Returns (candidates added or published, needing scoring)."""
+    calibration = store.get_calibration(calibration_id)
+    stages = (calibration.pipeline_stages if calibration else None) or ["Applied"]
+    now = datetime.now(timezone.utc)
+    profiles = [
+        CandidateProfile(
+            id=r["candidate_id"],
+            name=r["name"],
+            parsed_text=r.get("parsed_text") or "",
+            created_at=now,
+            source_filename=Path(r["source"].rpartition("!")[2] or r["source"]).name,
+            stage=stages[0],
+            content_sha256=r.get("content_sha256"),
+            parser=r.get("parser"),
+        )
+        for r in records
+    ]
+    payloads = {r["candidate_id"]: RankingPayload.model_validate(r["scoring"]) for r in records if r.get("scoring")}
+    if direct:
+        added, unscored = store.import_candidates(calibration_id, profiles, payloads, generation)
+        return added, len(unscored)
+
+    from backend.job_queue import get_queue
+
+    value = json.dumps(
+        {
+            "profiles": [p.model_dump(mode="json") for p in profiles],
+            "payloads": {cid: p.model_dump(mode="json") for cid, p in payloads.items()},
+        }
+    )
+    get_queue().publish_result(calibration_id, "*", generation, "import", value)
+    return len(profiles), len(profiles) - len(payloads)
+
+
+def run_batch(
+    calibration_id: str,
+    input_path: Path,
+    output: Optional[Path] = None,
+    workers: Optional[int] = None,
+    resume: bool = False,
+    rule_based: bool = False,
+    commit: bool = True,
+    direct: bool = False,
+    progress: TextIO = sys.stderr,
+) -> BatchSummary:
+    if direct:
+        store.reload_if_changed()
+    else:
+        store.open_read_only()
+    calibration = store.get_calibration(calibration_id)
+    if calibration is None:
+        raise ValueError(f"Calibration {calibration_id} not found.")
+    output = output or input_path.with_name(f"{input_path.name}.scores.ndjson")
+    sources = list(iter_sources(input_path))
+    done = load_checkpoint(output) if resume else {}
+    pending = [s for s in sources if s not in done]
+    summary = BatchSummary(total=len(sources), skipped=len(sources) - len(pending))
+    cal_dict = calibration.model_dump()
+    workers = workers or os.cpu_count() or 1
+    new_records: list[dict] = []
+    started = time.perf_counter()
+    last_report = 0.0
+
+    with output.open("a" if resume else "w", encoding="utf-8") as out, ProcessPoolExecutor(max_workers=workers) as pool:
+        queue = iter(pending)
+        in_flight: set[Future] = set()
+        while True:
+            # Bounded submission keeps memory flat for very large batches.
+            while len(in_flight) < workers * 2:
+                source = next(queue, None)
+                if source is None:
+                    break
+                in_flight.add(pool.submit(_process_file, source, cal_dict, rule_based))
+            if not in_flight:
+                break
+            finished, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in finished:
+                result = future.result()
+                out.write(json.dumps(result) + "\n")
+                summary.record(result)
+                if result["status"] == "ok":
+                    new_records.append(result)
+            out.flush()
+            summary.elapsed_seconds = time.perf_counter() - started
+            if summary.elapsed_seconds - last_report >= 2 or not in_flight:
+                last_report = summary.elapsed_seconds
+                remaining = len(pending) - summary.processed
+                eta = remaining / summary.files_per_second if summary.files_per_second else 0
+                print(
+                    f"[{summary.processed + summary.skipped}/{summary.total}] {summary.files_per_second:.2f} files/s,"
+                    f" errors {summary.errors}, eta {eta:.0f}s",
+                    file=progress,
+                    flush=True,
+                )
+
+    summary.elapsed_seconds = time.perf_counter() - started
+    if commit:
+        records = list(done.values()) + new_records
+        added, unscored = commit_results(calibration_id, calibration.scoring_generation, records, direct)
+        target = "written to the store" if direct else "published for the API to import"
+        print(f"{added} candidates {target} ({unscored} need scoring)", file=progress)
+    return summary
@@ -0,0 +1,42 @@
+"""
+Conditional GET for the read endpoints the dashboard refreshes (candidates, rankings,
+calibrations, analytics overview).
+
+ETags are derived from the store's version counters (store.data_version, store.catalog_version)
+rather than from the response body, so a request whose If-None-Match still matches is answered
+304 after a dictionary lookup, without building or serializing the payload. The counters are
+per process; the ETag includes this process's start time so tags never survive a restart.
+"""
+from __future__ import annotations
+
+import time
+from typing import Optional
+
+from starlette.requests import Request
+from starlette.responses import Response
+
+_EPOCH = format(int(time.time() * 1000), "x")
+
+# Browsers may reuse the body but must revalidate it on every request.
+CACHE_CONTROL = "no-cache"
+
+
+def make_etag(*parts: object) -> str:
+    return 'W/"' + "-".join([_EPOCH, *(str(p) for p in parts)]) + '"'
+
+
+def _matches(header: str, etag: str) -> bool:
+    if header.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == opaque for tag in header.split(","))
+
+
+def not_modified(request: Request, response: Response, etag: str) -> Optional[Response]:
+    """A 304 response if the request's If-None-Match matches etag; otherwise None, with the ETag set on response."""
+    header = request.headers.get("if-none-match")
+    if header and _matches(header, etag):
+        return Response(status_code=304, headers={"ETag": etag, "Cache-Control": CACHE_CONTROL})
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = CACHE_CONTROL
+    return None
@@ -0,0 +1,132 @@
+"""
+Live scoring progress for GET /api/calibrations/{id}/events (Server-Sent Events).
+
+The store publishes a compact delta (candidate id, status, total score, tier, rank and
+previous rank, in ranking order) whenever a candidate's scoring state changes, so a dashboard can follow a rescore
+without re-fetching the ranked list. Deltas from one store write go out as one event.
+
+Each calibration keeps its last EVENT_BUFFER deltas in memory, so a client reconnecting
+with Last-Event-ID receives what it missed. If that gap is no longer buffered, or the id
+is from before a restart (ids carry a per-process epoch), the client gets a "reset" event
+and should re-fetch the rankings once. Only the API process publishes: results from
+scoring worker processes reach the store through the job queue outbox.
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+import threading
+import time
+from collections import deque
+from typing import AsyncIterator, Optional
+
+EVENT_BUFFER = 1000  # deltas kept per calibration for Last-Event-ID resume
+
+_EPOCH = format(int(time.time() * 1000), "x")  # event ids from an earlier process can't be resumed
+_lock = threading.Lock()  # store writes run on the event loop, but scoring helpers may publish from threads
+_seq = 0
+
+
+def heartbeat_s() -> float:
+    """SSE_HEARTBEAT_S: idle interval between keep-alive comments (default 15s; proxies drop silent streams)."""
+    try:
+        return max(1.0, float(os.environ.get("SSE_HEARTBEAT_S") or 15))
+    except ValueError:
+        return 15.0
+
+
+class _Channel:
+    def __init__(self) -> None:
+        self.events: deque[tuple[int, list[dict]]] = deque()
+        self.buffered = 0  # deltas in self.events
+        self.evicted_through = 0  # highest event id dropped from the buffer
+        self.subscribers: set[tuple[asyncio.AbstractEventLoop, asyncio.Event]] = set()
+
+
+_channels: dict[str, _Channel] = {}
+
+
+def is_watched(calibration_id: str) -> bool:
+    """True once a stream has opened for the calibration (its events are then buffered for resume)."""
+    return calibration_id in _channels
+
+
+def publish(calibration_id: str, deltas: list[dict]) -> None:
+    """Record one event (a list of per-candidate deltas) for the calibration and wake its streams."""
+    global _seq
+    if not deltas:
+        return
+    with _lock:
+        channel = _channels.setdefault(calibration_id, _Channel())
+        _seq += 1
+        channel.events.append((_seq, deltas))
+        channel.buffered += len(deltas)
+        while channel.buffered > EVENT_BUFFER and len(channel.events) > 1:
+            seq, dropped = channel.events.popleft()
+            channel.buffered -= len(dropped)
+            channel.evicted_through = seq
+        subscribers = list(channel.subscribers)
+    for loop, wake in subscribers:
+        loop.call_soon_threadsafe(wake.set)
+
+
+def forget(calibration_id: str) -> None:
+    """Drop a deleted calibration's buffer; open streams get a final "calibration_deleted" delta and end."""
+    if calibration_id not in _channels:
+        return
+    publish(calibration_id, [{"calibration_id": calibration_id, "status": "calibration_deleted"}])
+    with _lock:
+        channel = _channels.get(calibration_id)
+        if channel is not None and not channel.subscribers:
+            del _channels[calibration_id]
+
+
+def _format(event: str, data: object, seq: Optional[int] = None) -> str:
+    head = f"id: {_EPOCH}-{seq}\n" if seq is not None else ""
+    return f"{head}event: {event}\ndata: {json.dumps(data, separators=(',', ':'))}\n\n"
+
+
+def _resume_point(channel: _Channel, last_event_id: Optional[str]) -> tuple[int, bool]:
+    """(cursor, reset): the id to send events after, and whether the client missed unbuffered events."""
+    current = _seq
+    if not last_event_id:
+        return current, False
+    epoch, _, seq = last_event_id.partition("-")
+    if epoch != _EPOCH or not seq.isdigit() or int(seq) > current:
+        return current, True
+    if int(seq) < channel.evicted_through:
+        return current, True
+    return int(seq), False
+
+
+async def stream(calibration_id: str, last_event_id: Optional[str] = None) -> AsyncIterator[str]:
+    """SSE body: a "scoring" event per store write after the resume point, ": ping" comments while idle."""
+    wake = asyncio.Event()
+    subscriber = (asyncio.get_running_loop(), wake)
+    with _lock:
+        channel = _channels.setdefault(calibration_id, _Channel())
+        channel.subscribers.add(subscriber)
+        cursor, reset = _resume_point(channel, last_event_id)
+    try:
+        yield "retry: 3000\n\n"
+        if reset:
+            yield _format("reset", {"calibration_id": calibration_id}, cursor)
+        while True:
+            wake.clear()
+            with _lock:
+                pending = [(seq, deltas) for seq, deltas in channel.events if seq > cursor]
+            for seq, deltas in pending:
+                yield _format("scoring", deltas, seq)
+                cursor = seq
+                if any(d.get("status") == "calibration_deleted" for d in deltas):
+                    return
+            if pending:
+                continue
+            try:
+                await asyncio.wait_for(wake.wait(), heartbeat_s())
+            except asyncio.TimeoutError:
+                yield ": ping\n\n"
+    finally:
+        with _lock:
+            channel.subscribers.discard(subscriber)
@@ -0,0 +1,63 @@
+"""
+On-demand sub-metric evidence for the candidate detail endpoint and full rankings (SCORING_EVIDENCE=lazy).
+
+With lazy evidence, rule-based scoring stores ratings, points and matched terms but no
+evidence snippets, which keeps bulk rescores and the data file small. When a recruiter
+opens a candidate, the snippets are retrieved from the resume text and memoized per
+candidate. A memo entry is only reused while the calibration's scoring_generation and the
+candidate's scoring updated_at are unchanged, so a rescore or a calibration edit
+recomputes it. LLM-scored results carry their own evidence and are returned as stored.
+"""
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from typing import Optional
+
+from backend import store
+from backend.models import RankedCandidateResult
+from backend.scoring_engine import rule_based_evidence
+
+MAX_ENTRIES = 512  # memoized candidates, least recently used dropped first
+
+_memo: OrderedDict[tuple[str, str], tuple[tuple[Optional[int], datetime], dict[str, list[str]]]] = OrderedDict()
+_lock = threading.Lock()
+
+
+def _deferred(candidate: RankedCandidateResult) -> bool:
+    scoring = candidate.scoring
+    return (
+        scoring.status == "completed"
+        and scoring.tier == "rule_based"
+        and bool(scoring.sub_metrics)
+        and not any(m.evidence for m in scoring.sub_metrics)
+    )
+
+
+def with_evidence(calibration_id: str, candidate: RankedCandidateResult) -> RankedCandidateResult:
+    """The candidate with evidence filled in if scoring skipped it; a copy, the store is not written."""
+    if not _deferred(candidate):
+        return candidate
+    calibration = store.get_calibration(calibration_id)
+    if calibration is None:
+        return candidate
+    key = (calibration_id, candidate.id)
+    version = (calibration.scoring_generation, candidate.scoring.updated_at)
+    with _lock:
+        entry = _memo.get(key)
+        if entry is not None and entry[0] == version:
+            _memo.move_to_end(key)
+            evidence = entry[1]
+        else:
+            evidence = None
+    if evidence is None:
+        evidence = rule_based_evidence(calibration.model_dump(), candidate.parsed_text or "")
+        with _lock:
+            _memo[key] = (version, evidence)
+            _memo.move_to_end(key)
+            while len(_memo) > MAX_ENTRIES:
+                _memo.popitem(last=False)
+    sub_metrics = [m.model_copy(update={"evidence": evidence.get(m.key, [])}) for m in candidate.scoring.sub_metrics]
+    return candidate.model_copy(update={"scoring": candidate.scoring.model_copy(update={"sub_metrics": sub_metrics})})
+
@@ -0,0 +1,147 @@
+"""
+Streaming export of a requisition's candidates in ranking order (GET /api/calibrations/{id}/export).
+
+Rows are produced from store.iter_ranked_candidates and written to the response as they
+are encoded, in chunks of about CHUNK_BYTES, so server memory does not grow with the size
+of the requisition. Formats: NDJSON (one JSON object per line) and CSV. `columns` selects
+and orders the fields; sub-metric points are exported as "<metric>_points".
+"""
+from __future__ import annotations
+
+import csv
+import io
+import json
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Callable, Iterator, Optional
+
+from backend import store
+from backend.models import CandidateProfile, CandidateScoringState
+from backend.scoring_engine import DEFAULT_METRICS
+
+CHUNK_BYTES = 64 * 1024
+
+
+@dataclass
+class _Row:
+    rank: int
+    profile: CandidateProfile
+    scoring: CandidateScoringState
+    first_stage: str
+
+
+def _points(key: str) -> Callable[[_Row], Optional[int]]:
+    return lambda r: next((m.points_earned for m in r.scoring.sub_metrics if m.key == key), None)
+
+
+COLUMNS: dict[str, Callable[[_Row], object]] = {
+    "rank": lambda r: r.rank,
+    "id": lambda r: r.profile.id,
+    "name": lambda r: r.profile.name,
+    "stage": lambda r: r.profile.stage or r.first_stage,
+    "rating": lambda r: r.profile.rating,
+    "status": lambda r: r.scoring.status,
+    "total_score": lambda r: r.scoring.total_score,
+    **{f"{m.key}_points": _points(m.key) for m in DEFAULT_METRICS},
+    "matched_skills": lambda r: r.scoring.matched_skills,
+    "matched_titles": lambda r: r.scoring.matched_titles,
+    "matched_companies": lambda r: r.scoring.matched_companies,
+    "matched_industries": lambda r: r.scoring.matched_industries,
+    "matched_schools": lambda r: r.scoring.matched_schools,
+    "matched_degrees": lambda r: r.scoring.matched_degrees,
+    "experience_years": lambda r: r.scoring.experience_years,
+    "summary": lambda r: r.scoring.summary,
+    "ai_summary": lambda r: r.profile.ai_summary,
+    "notes": lambda r: r.profile.notes,
+    "tier": lambda r: r.scoring.tier,
+    "error": lambda r: r.scoring.error,
+    "source_filename": lambda r: r.profile.source_filename,
+    "created_at": lambda r: r.profile.created_at,
+}
+
+DEFAULT_COLUMNS = [
+    "rank",
+    "id",
+    "name",
+    "stage",
+    "rating",
+    "status",
+    "total_score",
+    *(f"{m.key}_points" for m in DEFAULT_METRICS),
+    "matched_skills",
+]
+
+
+def parse_columns(raw: Optional[str]) -> list[str]:
+    """Comma-separated column names, or the defaults. Raises ValueError naming unknown columns."""
+    if not raw or not raw.strip():
+        return list(DEFAULT_COLUMNS)
+    columns = [c.strip() for c in raw.split(",") if c.strip()]
+    unknown = [c for c in columns if c not in COLUMNS]
+    if unknown:
+        raise ValueError(f"Unknown export columns: {', '.join(unknown)}. Available: {', '.join(COLUMNS)}.")
+    return columns
+
+
+def _rows(calibration_id: str) -> Iterator[_Row]:
+    calibration = store.get_calibration(calibration_id)
+    stages = calibration.pipeline_stages if calibration else None
+    first_stage = stages[0] if stages else "Applied"
+    for rank, (profile, scoring) in enumerate(store.iter_ranked_candidates(calibration_id), start=1):
+        yield _Row(rank, profile, scoring, first_stage)
+
+
+def _csv_cell(value: object) -> object:
+    if value is None:
+        return ""
+    if isinstance(value, list):
+        value = "; ".join(str(v) for v in value)
+    elif isinstance(value, datetime):
+        value = value.isoformat()
+    # Spreadsheet apps evaluate cells starting with these as formulas; names come from uploaded filenames.
+    if isinstance(value, str) and value[:1] in ("=", "+", "-", "@", "\t", "\r"):
+        value = "'" + value
+    return value
+
+
+def _json_value(value: object) -> object:
+    return value.isoformat() if isinstance(value, datetime) else value
+
+
+def _chunked(lines: Iterator[str]) -> Iterator[bytes]:
+    buffer: list[str] = []
+    size = 0
+    for line in lines:
+        buffer.append(line)
+        size += len(line)
+        if size >= CHUNK_BYTES:
+            yield "".join(buffer).encode("utf-8")
+            buffer, size = [], 0
+    if buffer:
+        yield "".join(buffer).encode("utf-8")
+
+
+def export_ndjson(calibration_id: str, columns: list[str]) -> Iterator[bytes]:
+    getters = [(c, COLUMNS[c]) for c in columns]
+    lines = (
+        json.dumps({c: _json_value(get(row)) for c, get in getters}, ensure_ascii=False) + "\n"
+        for row in _rows(calibration_id)
+    )
+    return _chunked(lines)
+
+
+def export_csv(calibration_id: str, columns: list[str]) -> Iterator[bytes]:
+    getters = [COLUMNS[c] for c in columns]
+    out = io.StringIO()
+    writer = csv.writer(out)
+
+    def lines() -> Iterator[str]:
+        writer.writerow(columns)
+        for row in _rows(calibration_id):
+            writer.writerow([_csv_cell(get(row)) for get in getters])
+            line = out.getvalue()
+            out.seek(0)
+            out.truncate()
+            yield line
+
+    return _chunked(lines())
@@ -0,0 +1,257 @@
+"""
+Asynchronous upload ingestion (POST /api/upload?mode=async).
+
+The request only streams the PDFs to <data dir>/ingest/<id>/ and returns 202 with an
+ingestion id. Parsing, candidate creation and scoring then run in the background as
+pipeline stages: files are parsed concurrently in the parse pool, parsed candidates are
+added to the store in batches (one data-file write each) and queued for scoring.
+
+Per-file progress lives in the job queue database, so GET /api/ingestions/{id} can report
+it from any process and an ingestion interrupted by a restart resumes from its spooled
+files. Candidate ids are assigned at spool time, which makes resuming idempotent.
+
+ZIP archives (POST /api/upload-zip) go through the same pipeline: the archive is streamed
+to the spool, its PDF entries are extracted one at a time (see backend.uploads) and each
+entry becomes one file of the ingestion, named by its path in the archive.
+
+File status: queued -> parsing -> added | failed; rejected files (not a PDF, too large)
+are recorded as "rejected" and never spooled. A file whose bytes match a candidate already
+in the calibration (or an earlier file in the batch) is "duplicate", with candidate_id
+pointing at that candidate, and is not parsed again.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import posixpath
+import shutil
+import time
+import uuid
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Optional
+
+from starlette.requests import Request
+
+from backend import store
+from backend.job_queue import get_queue
+from backend.models import CandidateProfile
+from backend.parser import ParseResult, ParseTimeout, parse_pdf_async, parser_workers
+from backend.scoring_tasks import ScoringQueueFull, defer_candidates_scoring, queue_candidates_scoring
+from backend.uploads import SpooledFile, UploadRejected, extract_zip_pdfs, receive_files, zip_max_bytes
+
+logger = logging.getLogger(__name__)
+
+ADD_BATCH_SIZE = 25  # parsed candidates per store write
+RETENTION_S = 7 * 24 * 3600  # completed ingestions stay queryable this long
+
+_tasks: dict[str, asyncio.Task] = {}
+
+
+def _spool_dir(ingestion_id: str) -> Path:
+    return store.get_data_dir() / "ingest" / ingestion_id
+
+
+def _spool_path(ingestion_id: str, index: int) -> Path:
+    return _spool_dir(ingestion_id) / f"{index:05d}.pdf"
+
+
+def _candidate_name(filename: str) -> str:
+    base = os.path.splitext(posixpath.basename(filename))[0]
+    return base.replace("_", " ").replace("-", " ").strip() or "Unknown"
+
+
+async def start_ingestion(calibration_id: str, request: Request, max_file_bytes: int) -> dict:
+    """Stream the request's files to the spool, record the ingestion and start its background pipeline.
+    Returns the initial status. Raises UploadRejected (nothing is recorded or kept)."""
+    ingestion_id = uuid.uuid4().hex
+    spool = _spool_dir(ingestion_id)
+    spool.mkdir(parents=True, exist_ok=True)
+    try:
+        received = await receive_files(request, lambda index: _spool_path(ingestion_id, index), max_file_bytes)
+    except UploadRejected:
+        shutil.rmtree(spool, ignore_errors=True)
+        raise
+    return await _record(ingestion_id, calibration_id, received)
+
+
+async def start_zip_ingestion(calibration_id: str, request: Request, max_entry_bytes: int) -> dict:
+    """Stream a ZIP archive (field "file") to the spool, extract its PDF entries and start the pipeline
+    on them. Returns the initial status, one file per archive entry. Raises UploadRejected."""
+    ingestion_id = uuid.uuid4().hex
+    spool = _spool_dir(ingestion_id)
+    spool.mkdir(parents=True, exist_ok=True)
+    archive = spool / "upload.zip"
+    try:
+        received = await receive_files(request, lambda _: archive, zip_max_bytes(), field_name="file", kind="ZIP")
+        if len(received) != 1:
+            raise UploadRejected(400, 'Expected one ZIP archive in the "file" field.')
+        if received[0].error:
+            raise UploadRejected(413 if "limit" in received[0].error else 400, received[0].error)
+        entries = await asyncio.to_thread(
+            extract_zip_pdfs, archive, lambda index: _spool_path(ingestion_id, index), max_entry_bytes
+        )
+    except UploadRejected:
+        shutil.rmtree(spool, ignore_errors=True)
+        raise
+    finally:
+        archive.unlink(missing_ok=True)
+    return await _record(ingestion_id, calibration_id, entries)
+
+
+async def _record(ingestion_id: str, calibration_id: str, received: list[SpooledFile]) -> dict:
+    records: list[tuple[str, int, str, Optional[str], Optional[str], Optional[str]]] = [
+        (u.filename, u.size, "rejected", None, u.error, None)
+        if u.error
+        else (u.filename, u.size, "queued", str(uuid.uuid4()), None, u.sha256)
+        for u in received
+    ]
+    # Exact duplicates of candidates already in the calibration, or of an earlier file in this batch.
+    known = store.find_candidates_by_sha256(calibration_id, [r[5] for r in records if r[5]])
+    for index, (filename, size, status, candidate_id, error, digest) in enumerate(records):
+        if status != "queued":
+            continue
+        if digest in known:
+            records[index] = (filename, size, "duplicate", known[digest], None, digest)
+            _spool_path(ingestion_id, index).unlink(missing_ok=True)
+        else:
+            known[digest] = candidate_id
+    queue = get_queue()
+    await asyncio.to_thread(queue.create_ingestion, ingestion_id, calibration_id, records)
+    await asyncio.to_thread(queue.prune_ingestions, time.time() - RETENTION_S)
+    _launch(ingestion_id, calibration_id)
+    return get_ingestion_status(ingestion_id) or {}
+
+
+async def wait_for_ingestion(ingestion_id: str) -> Optional[dict]:
+    """Wait for a running ingestion's pipeline to finish, then return its final status."""
+    task = _tasks.get(ingestion_id)
+    if task is not None:
+        await asyncio.shield(task)  # a disconnecting client must not cancel the pipeline
+    return get_ingestion_status(ingestion_id)
+
+
+def _launch(ingestion_id: str, calibration_id: str) -> None:
+    task = asyncio.get_running_loop().create_task(_run(ingestion_id, calibration_id))
+    _tasks[ingestion_id] = task
+    task.add_done_callback(lambda _: _tasks.pop(ingestion_id, None))
+
+
+def resume_ingestions() -> int:
+    """API startup: restart ingestions a restart interrupted (files still queued or mid-parse are redone)."""
+    resumed = 0
+    for ingestion_id, calibration_id in get_queue().unfinished_ingestions():
+        task = _tasks.get(ingestion_id)
+        if task is None or task.done():
+            _launch(ingestion_id, calibration_id)
+            resumed += 1
+    return resumed
+
+
+async def _run(ingestion_id: str, calibration_id: str) -> None:
+    queue = get_queue()
+    try:
+        info = await asyncio.to_thread(queue.get_ingestion, ingestion_id)
+        pending = [f for f in (info or {}).get("files", []) if f["status"] in ("queued", "parsing")]
+        parsed: list[tuple[dict, ParseResult]] = []
+        limit = asyncio.Semaphore(max(1, parser_workers()) * 2)  # keep the pool busy without reading every file at once
+
+        async def parse(file: dict) -> None:
+            async with limit:
+                await asyncio.to_thread(queue.update_ingestion_files, ingestion_id, [(file["index"], "parsing", None)])
+                try:
+                    result = await parse_pdf_async(_spool_path(ingestion_id, file["index"]), sha256=file["sha256"])
+                except ParseTimeout as exc:
+                    await _fail(ingestion_id, [file], str(exc))
+                    return
+                except Exception as exc:
+                    # Parser messages name the spool path; log them and report a plain error.
+                    logger.warning("Parsing %s failed: %s", file["filename"], exc)
+                    await _fail(ingestion_id, [file], "Could not read this PDF.")
+                    return
+            parsed.append((file, result))
+            if len(parsed) >= ADD_BATCH_SIZE:
+                batch = parsed[:]
+                parsed.clear()
+                await _add(ingestion_id, calibration_id, batch)
+
+        await asyncio.gather(*(parse(f) for f in pending))
+        await _add(ingestion_id, calibration_id, parsed)
+        await asyncio.to_thread(queue.finish_ingestion, ingestion_id)
+        shutil.rmtree(_spool_dir(ingestion_id), ignore_errors=True)
+    except asyncio.CancelledError:
+        raise  # Shutdown: the ingestion stays "running" and resumes on the next start.
+    except Exception:
+        logger.exception("Ingestion %s failed", ingestion_id)
+
+
+async def _fail(ingestion_id: str, files: list[dict], error: str) -> None:
+    await asyncio.to_thread(
+        get_queue().update_ingestion_files, ingestion_id, [(f["index"], "failed", error) for f in files]
+    )
+    for f in files:
+        _spool_path(ingestion_id, f["index"]).unlink(missing_ok=True)
+
+
+async def _add(ingestion_id: str, calibration_id: str, batch: list[tuple[dict, ParseResult]]) -> None:
+    """Candidate stage: add one batch of parsed files with a single store write, then queue their scoring."""
+    if not batch:
+        return
+    calibration = store.get_calibration(calibration_id)
+    if calibration is None:
+        await _fail(ingestion_id, [f for f, _ in batch], "Calibration not found.")
+        return
+    stages = calibration.pipeline_stages or ["Applied"]
+    now = datetime.now(timezone.utc)
+    profiles = [
+        CandidateProfile(
+            id=f["candidate_id"],
+            name=_candidate_name(f["filename"]),
+            parsed_text=result.text.strip(),
+            created_at=now,
+            source_filename=posixpath.basename(f["filename"]),
+            stage=stages[0],
+            content_sha256=f["sha256"],
+            parser=result.parser,
+        )
+        for f, result in batch
+        # Resumed after a crash between the store write and the status update: already added.
+        if store.get_candidate_profile(calibration_id, f["candidate_id"]) is None
+    ]
+    if profiles:
+        store.add_candidates(calibration_id, profiles)
+    await asyncio.to_thread(
+        get_queue().update_ingestion_files, ingestion_id, [(f["index"], "added", None) for f, _ in batch]
+    )
+    for f, _ in batch:
+        _spool_path(ingestion_id, f["index"]).unlink(missing_ok=True)
+    try:
+        queue_candidates_scoring(calibration_id, [p.id for p in profiles])
+    except ScoringQueueFull:
+        logger.warning("Scoring queue full; deferring scoring of %d candidates in %s", len(profiles), calibration_id)
+        defer_candidates_scoring(calibration_id)
+
+
+def get_ingestion_status(ingestion_id: str) -> Optional[dict]:
+    """Ingestion progress with per-file status (and the scoring status of added candidates)."""
+    info = get_queue().get_ingestion(ingestion_id)
+    if info is None:
+        return None
+    scoring = store.get_scoring_states(info["calibration_id"])
+    counts: dict[str, int] = {}
+    for f in info["files"]:
+        counts[f["status"]] = counts.get(f["status"], 0) + 1
+        state = scoring.get(f["candidate_id"]) if f["status"] in ("added", "duplicate") else None
+        f["scoring_status"] = state.status if state else None
+        f["updated_at"] = datetime.fromtimestamp(f["updated_at"], timezone.utc)
+    return {
+        "ingestion_id": info["id"],
+        "calibration_id": info["calibration_id"],
+        "state": info["state"],
+        "created_at": datetime.fromtimestamp(info["created_at"], timezone.utc),
+        "finished_at": datetime.fromtimestamp(info["finished_at"], timezone.utc) if info["finished_at"] else None,
+        "total": len(info["files"]),
+        "counts": counts,
+        "files": info["files"],
+    }
@@ -0,0 +1,552 @@
+"""
+Durable scoring job queue: a SQLite table next to the JSON data file.
+
+Semantics are at-least-once. claim() leases a job for a visibility timeout; the
+worker deletes it on completion. A job whose lease expires (worker crashed, process
+restarted mid-deploy) becomes claimable again. Ordering is priority first, then a
+per-calibration turn number so calibrations are served round-robin, then FIFO.
+
+Worker processes (`python -m backend worker`) share the same database. They cannot
+write the JSON data file, so they publish status and results to the scoring_results
+outbox, which the API process applies to the store.
+
+The same database records asynchronous upload ingestions (backend/ingestion.py): one
+row per ingestion and one per spooled file, with the file's pipeline status.
+"""
+from __future__ import annotations
+
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterable, Literal, Optional
+
+from backend import store
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS scoring_jobs (
+    calibration_id TEXT NOT NULL,
+    candidate_id TEXT NOT NULL,
+    priority INTEGER NOT NULL,
+    turn INTEGER NOT NULL,
+    seq INTEGER NOT NULL,
+    state TEXT NOT NULL DEFAULT 'queued',
+    lease_owner TEXT,
+    lease_expires_at REAL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    enqueued_at REAL NOT NULL,
+    generation INTEGER NOT NULL DEFAULT 0,
+    stage TEXT NOT NULL DEFAULT 'full',
+    PRIMARY KEY (calibration_id, candidate_id)
+);
+CREATE INDEX IF NOT EXISTS scoring_jobs_order ON scoring_jobs (priority, turn, seq);
+CREATE TABLE IF NOT EXISTS scoring_results (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    calibration_id TEXT NOT NULL,
+    candidate_id TEXT NOT NULL,
+    generation INTEGER NOT NULL,
+    kind TEXT NOT NULL,
+    value TEXT,
+    created_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS rescore_schedule (
+    calibration_id TEXT PRIMARY KEY,
+    due_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS deferred_scoring (
+    calibration_id TEXT PRIMARY KEY,
+    due_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS ingestions (
+    id TEXT PRIMARY KEY,
+    calibration_id TEXT NOT NULL,
+    state TEXT NOT NULL DEFAULT 'running',
+    created_at REAL NOT NULL,
+    finished_at REAL
+);
+CREATE TABLE IF NOT EXISTS ingestion_files (
+    ingestion_id TEXT NOT NULL,
+    idx INTEGER NOT NULL,
+    filename TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    status TEXT NOT NULL,
+    candidate_id TEXT,
+    error TEXT,
+    updated_at REAL NOT NULL,
+    sha256 TEXT,
+    PRIMARY KEY (ingestion_id, idx)
+);
+"""
+
+# Unique per process lifetime; a restarted process (even with a reused pid) never matches its predecessor.
+INSTANCE_ID = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+
+@dataclass(frozen=True)
+class Job:
+    calibration_id: str
+    candidate_id: str
+    priority: int
+    attempts: int
+    lease_owner: str
+    generation: int
+    stage: "JobStage" = "full"
+
+
+# "full": everything the calibration's mode needs (in cascade mode, rule-based tier first).
+# "llm": shortlisted by a cascade pass, whose rule-based tier already ran for this generation.
+JobStage = Literal["full", "llm"]
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return max(1.0, float(os.environ.get(name) or default))
+    except ValueError:
+        return default
+
+
+def visibility_timeout_s() -> float:
+    """SCORING_VISIBILITY_TIMEOUT_S: how long a claimed job stays invisible before another worker may retry it."""
+    return _env_float("SCORING_VISIBILITY_TIMEOUT_S", 300)
+
+
+def max_attempts() -> int:
+    return int(_env_float("SCORING_MAX_ATTEMPTS", 5))
+
+
+class JobQueue:
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.path), timeout=30, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(_SCHEMA)
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(scoring_jobs)")}
+            if "generation" not in columns:
+                conn.execute("ALTER TABLE scoring_jobs ADD COLUMN generation INTEGER NOT NULL DEFAULT 0")
+            if "stage" not in columns:
+                conn.execute("ALTER TABLE scoring_jobs ADD COLUMN stage TEXT NOT NULL DEFAULT 'full'")
+            if "sha256" not in {row[1] for row in conn.execute("PRAGMA table_info(ingestion_files)")}:
+                conn.execute("ALTER TABLE ingestion_files ADD COLUMN sha256 TEXT")
+            self._conn = conn
+        return self._conn
+
+    def _transaction(self, fn):
+        with self._lock:
+            conn = self._connect()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                result = fn(conn)
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+            return result
+
+    def push_many(
+        self,
+        calibration_id: str,
+        candidate_ids: Iterable[str],
+        priority: int,
+        generation: int = 0,
+        stage: JobStage = "full",
+    ) -> int:
+        """Enqueue jobs in one transaction. Already-queued jobs keep their place (or move up a priority).
+        A job from an older generation is replaced: queued ones are updated in place, running ones are
+        re-queued (the old worker's ack becomes a no-op). A queued job of the same generation becomes
+        an "llm" job when pushed as one. Returns how many jobs were added or re-queued."""
+        ids = list(candidate_ids)
+        if not ids:
+            return 0
+
+        def op(conn: sqlite3.Connection) -> int:
+            # Start this batch at the lane's current head turn so it interleaves with, not queues behind, other calibrations.
+            head = conn.execute(
+                "SELECT MIN(turn) FROM scoring_jobs WHERE priority = ? AND state = 'queued'", (priority,)
+            ).fetchone()[0]
+            own_tail = conn.execute(
+                "SELECT MAX(turn) FROM scoring_jobs WHERE priority = ? AND calibration_id = ?",
+                (priority, calibration_id),
+            ).fetchone()[0]
+            turn = max(head or 0, (own_tail + 1) if own_tail is not None else 0)
+            seq = (conn.execute("SELECT MAX(seq) FROM scoring_jobs").fetchone()[0] or 0) + 1
+            now = time.time()
+            added = 0
+            for candidate_id in ids:
+                row = conn.execute(
+                    "SELECT priority, state, generation FROM scoring_jobs WHERE calibration_id = ? AND candidate_id = ?",
+                    (calibration_id, candidate_id),
+                ).fetchone()
+                if row is None:
+                    conn.execute(
+                        "INSERT INTO scoring_jobs"
+                        " (calibration_id, candidate_id, priority, turn, seq, enqueued_at, generation, stage)"
+                        " VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                        (calibration_id, candidate_id, priority, turn, seq, now, generation, stage),
+                    )
+                    added += 1
+                    turn += 1
+                    seq += 1
+                    continue
+                old_priority, state, old_generation = row
+                if state == "running" and old_generation < generation:
+                    conn.execute(
+                        "UPDATE scoring_jobs SET state = 'queued', lease_owner = NULL, lease_expires_at = NULL,"
+                        " attempts = 0, priority = ?, turn = ?, seq = ?, generation = ?, stage = ?"
+                        " WHERE calibration_id = ? AND candidate_id = ?",
+                        (min(priority, old_priority), turn, seq, generation, stage, calibration_id, candidate_id),
+                    )
+                    added += 1
+                    turn += 1
+                    seq += 1
+                    continue
+                if state == "queued" and priority < old_priority:
+                    conn.execute(
+                        "UPDATE scoring_jobs SET priority = ?, turn = ? WHERE calibration_id = ? AND candidate_id = ?",
+                        (priority, head or 0, calibration_id, candidate_id),
+                    )
+                if state == "queued" and old_generation < generation:
+                    conn.execute(
+                        "UPDATE scoring_jobs SET generation = ?, stage = ? WHERE calibration_id = ? AND candidate_id = ?",
+                        (generation, stage, calibration_id, candidate_id),
+                    )
+                elif state == "queued" and old_generation == generation and stage == "llm":
+                    conn.execute(
+                        "UPDATE scoring_jobs SET stage = 'llm' WHERE calibration_id = ? AND candidate_id = ?",
+                        (calibration_id, candidate_id),
+                    )
+            return added
+
+        return self._transaction(op)
+
+    def push(self, calibration_id: str, candidate_id: str, priority: int, generation: int = 0) -> bool:
+        return self.push_many(calibration_id, [candidate_id], priority, generation) > 0
+
+    def claim(self, owner: str = INSTANCE_ID) -> Optional[Job]:
+        """Lease the next job: queued, or running with an expired lease. The caller fails jobs whose
+        attempts exceed max_attempts() (a poison job that keeps killing its worker)."""
+        now = time.time()
+
+        def op(conn: sqlite3.Connection) -> Optional[Job]:
+            row = conn.execute(
+                "SELECT calibration_id, candidate_id, priority, attempts, generation, stage FROM scoring_jobs"
+                " WHERE state = 'queued' OR lease_expires_at < ?"
+                " ORDER BY priority, turn, seq LIMIT 1",
+                (now,),
+            ).fetchone()
+            if row is None:
+                return None
+            calibration_id, candidate_id, priority, attempts, generation, stage = row
+            conn.execute(
+                "UPDATE scoring_jobs SET state = 'running', lease_owner = ?, lease_expires_at = ?,"
+                " attempts = attempts + 1 WHERE calibration_id = ? AND candidate_id = ?",
+                (owner, now + visibility_timeout_s(), calibration_id, candidate_id),
+            )
+            return Job(calibration_id, candidate_id, priority, attempts + 1, owner, generation, stage)
+
+        return self._transaction(op)
+
+    def extend_lease(self, job: Job) -> bool:
+        """Renew the lease. False if it was lost: re-queued for a newer generation, deleted, or taken over."""
+        return self._transaction(
+            lambda conn: conn.execute(
+                "UPDATE scoring_jobs SET lease_expires_at = ? WHERE calibration_id = ? AND candidate_id = ?"
+                " AND state = 'running' AND lease_owner = ?",
+                (time.time() + visibility_timeout_s(), job.calibration_id, job.candidate_id, job.lease_owner),
+            ).rowcount
+            > 0
+        )
+
+    def complete(self, job: Job) -> None:
+        """Acknowledge a job. A no-op if the lease was lost or the job was re-queued meanwhile."""
+        self._transaction(
+            lambda conn: conn.execute(
+                "DELETE FROM scoring_jobs WHERE calibration_id = ? AND candidate_id = ?"
+                " AND state = 'running' AND lease_owner = ?",
+                (job.calibration_id, job.candidate_id, job.lease_owner),
+            )
+        )
+
+    def depth(self) -> int:
+        with self._lock:
+            return self._connect().execute("SELECT COUNT(*) FROM scoring_jobs WHERE state = 'queued'").fetchone()[0]
+
+    def running_count(self) -> int:
+        with self._lock:
+            return self._connect().execute("SELECT COUNT(*) FROM scoring_jobs WHERE state = 'running'").fetchone()[0]
+
+    def job_keys(self) -> set[tuple[str, str]]:
+        with self._lock:
+            rows = self._connect().execute("SELECT calibration_id, candidate_id FROM scoring_jobs").fetchall()
+        return {(r[0], r[1]) for r in rows}
+
+    def position(self, calibration_id: str, candidate_id: Optional[str] = None) -> Optional[int]:
+        """Queued jobs that will be claimed before this one (or before the calibration's last queued job)."""
+        with self._lock:
+            conn = self._connect()
+            if candidate_id is not None:
+                row = conn.execute(
+                    "SELECT priority, turn, seq FROM scoring_jobs"
+                    " WHERE calibration_id = ? AND candidate_id = ? AND state = 'queued'",
+                    (calibration_id, candidate_id),
+                ).fetchone()
+            else:
+                row = conn.execute(
+                    "SELECT priority, turn, seq FROM scoring_jobs WHERE calibration_id = ? AND state = 'queued'"
+                    " ORDER BY priority DESC, turn DESC, seq DESC LIMIT 1",
+                    (calibration_id,),
+                ).fetchone()
+            if row is None:
+                return None
+            return conn.execute(
+                "SELECT COUNT(*) FROM scoring_jobs WHERE state = 'queued' AND (priority, turn, seq) < (?, ?, ?)",
+                row,
+            ).fetchone()[0]
+
+    def release_dead_leases(self) -> int:
+        """Make jobs leased by dead processes on this host claimable now instead of after the visibility timeout."""
+        host = socket.gethostname()
+
+        def op(conn: sqlite3.Connection) -> int:
+            released = 0
+            rows = conn.execute(
+                "SELECT calibration_id, candidate_id, lease_owner FROM scoring_jobs WHERE state = 'running'"
+            ).fetchall()
+            for calibration_id, candidate_id, owner in rows:
+                if owner == INSTANCE_ID or not _owner_is_dead(owner or "", host):
+                    continue
+                conn.execute(
+                    "UPDATE scoring_jobs SET state = 'queued', lease_owner = NULL, lease_expires_at = NULL"
+                    " WHERE calibration_id = ? AND candidate_id = ?",
+                    (calibration_id, candidate_id),
+                )
+                released += 1
+            return released
+
+        return self._transaction(op)
+
+    def publish_result(
+        self, calibration_id: str, candidate_id: str, generation: int, kind: str, value: Optional[str] = None
+    ) -> None:
+        """Outbox write from a worker process: kind is "processing", "completed" (value: payload JSON) or "failed"."""
+        self._transaction(
+            lambda conn: conn.execute(
+                "INSERT INTO scoring_results (calibration_id, candidate_id, generation, kind, value, created_at)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                (calibration_id, candidate_id, generation, kind, value, time.time()),
+            )
+        )
+
+    def publish_results(self, calibration_id: str, generation: int, kind: str, values: dict[str, str]) -> None:
+        now = time.time()
+        self._transaction(
+            lambda conn: conn.executemany(
+                "INSERT INTO scoring_results (calibration_id, candidate_id, generation, kind, value, created_at)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                [(calibration_id, cid, generation, kind, value, now) for cid, value in values.items()],
+            )
+        )
+
+    def fetch_results(self, limit: int = 500) -> list[tuple[int, str, str, int, str, Optional[str]]]:
+        """Oldest unapplied outbox rows: (id, calibration_id, candidate_id, generation, kind, value)."""
+        with self._lock:
+            return self._connect().execute(
+                "SELECT id, calibration_id, candidate_id, generation, kind, value FROM scoring_results"
+                " ORDER BY id LIMIT ?",
+                (limit,),
+            ).fetchall()
+
+    def delete_results(self, up_to_id: int) -> None:
+        self._transaction(lambda conn: conn.execute("DELETE FROM scoring_results WHERE id <= ?", (up_to_id,)))
+
+    def schedule_rescore(self, calibration_id: str, due_at: float) -> None:
+        """Set (or push back) the calibration's pending debounced rescore; one row per calibration coalesces bursts."""
+        self._transaction(
+            lambda conn: conn.execute(
+                "INSERT INTO rescore_schedule (calibration_id, due_at) VALUES (?, ?)"
+                " ON CONFLICT (calibration_id) DO UPDATE SET due_at = excluded.due_at",
+                (calibration_id, due_at),
+            )
+        )
+
+    def clear_rescore_schedule(self, calibration_id: str) -> None:
+        self._transaction(
+            lambda conn: conn.execute("DELETE FROM rescore_schedule WHERE calibration_id = ?", (calibration_id,))
+        )
+
+    def rescore_due_at(self, calibration_id: str) -> Optional[float]:
+        with self._lock:
+            row = self._connect().execute(
+                "SELECT due_at FROM rescore_schedule WHERE calibration_id = ?", (calibration_id,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def next_rescore_due_at(self) -> Optional[float]:
+        """Earliest due time of a debounced rescore or a deferred-scoring retry."""
+        with self._lock:
+            return self._connect().execute(
+                "SELECT MIN(due_at) FROM (SELECT due_at FROM rescore_schedule UNION ALL SELECT due_at FROM deferred_scoring)"
+            ).fetchone()[0]
+
+    def defer_scoring(self, calibration_id: str, due_at: float) -> None:
+        """Record that candidates of the calibration were added while the queue was full; retried at due_at."""
+        self._transaction(
+            lambda conn: conn.execute(
+                "INSERT INTO deferred_scoring (calibration_id, due_at) VALUES (?, ?)"
+                " ON CONFLICT (calibration_id) DO UPDATE SET due_at = MIN(due_at, excluded.due_at)",
+                (calibration_id, due_at),
+            )
+        )
+
+    def pop_due_deferred(self, now: Optional[float] = None) -> list[str]:
+        """Remove and return calibrations whose deferred-scoring retry is due."""
+        cutoff = time.time() if now is None else now
+
+        def op(conn: sqlite3.Connection) -> list[str]:
+            rows = conn.execute("SELECT calibration_id FROM deferred_scoring WHERE due_at <= ?", (cutoff,)).fetchall()
+            conn.execute("DELETE FROM deferred_scoring WHERE due_at <= ?", (cutoff,))
+            return [r[0] for r in rows]
+
+        return self._transaction(op)
+
+    def pop_due_rescores(self, now: Optional[float] = None) -> list[str]:
+        """Remove and return calibrations whose debounce window has passed. Atomic, so only one process fires each."""
+        cutoff = time.time() if now is None else now
+
+        def op(conn: sqlite3.Connection) -> list[str]:
+            rows = conn.execute("SELECT calibration_id FROM rescore_schedule WHERE due_at <= ?", (cutoff,)).fetchall()
+            conn.execute("DELETE FROM rescore_schedule WHERE due_at <= ?", (cutoff,))
+            return [r[0] for r in rows]
+
+        return self._transaction(op)
+
+    def create_ingestion(
+        self,
+        ingestion_id: str,
+        calibration_id: str,
+        files: list[tuple[str, int, str, Optional[str], Optional[str], Optional[str]]],
+    ) -> None:
+        """Record an ingestion and its files: (filename, size, status, candidate_id, error, sha256) in upload order."""
+        now = time.time()
+
+        def op(conn: sqlite3.Connection) -> None:
+            conn.execute(
+                "INSERT INTO ingestions (id, calibration_id, created_at) VALUES (?, ?, ?)",
+                (ingestion_id, calibration_id, now),
+            )
+            conn.executemany(
+                "INSERT INTO ingestion_files"
+                " (ingestion_id, idx, filename, size, status, candidate_id, error, sha256, updated_at)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                [(ingestion_id, idx, *f, now) for idx, f in enumerate(files)],
+            )
+
+        self._transaction(op)
+
+    def update_ingestion_files(
+        self, ingestion_id: str, updates: list[tuple[int, str, Optional[str]]]
+    ) -> None:
+        """Set file statuses in one transaction: (index, status, error)."""
+        now = time.time()
+        self._transaction(
+            lambda conn: conn.executemany(
+                "UPDATE ingestion_files SET status = ?, error = ?, updated_at = ? WHERE ingestion_id = ? AND idx = ?",
+                [(status, error, now, ingestion_id, idx) for idx, status, error in updates],
+            )
+        )
+
+    def finish_ingestion(self, ingestion_id: str) -> None:
+        self._transaction(
+            lambda conn: conn.execute(
+                "UPDATE ingestions SET state = 'completed', finished_at = ? WHERE id = ?", (time.time(), ingestion_id)
+            )
+        )
+
+    def get_ingestion(self, ingestion_id: str) -> Optional[dict]:
+        """The ingestion row plus its files (dicts, in upload order), or None."""
+        with self._lock:
+            conn = self._connect()
+            row = conn.execute(
+                "SELECT id, calibration_id, state, created_at, finished_at FROM ingestions WHERE id = ?",
+                (ingestion_id,),
+            ).fetchone()
+            if row is None:
+                return None
+            files = conn.execute(
+                "SELECT idx, filename, size, status, candidate_id, error, sha256, updated_at FROM ingestion_files"
+                " WHERE ingestion_id = ? ORDER BY idx",
+                (ingestion_id,),
+            ).fetchall()
+        keys = ("index", "filename", "size", "status", "candidate_id", "error", "sha256", "updated_at")
+        return {
+            **dict(zip(("id", "calibration_id", "state", "created_at", "finished_at"), row)),
+            "files": [dict(zip(keys, f)) for f in files],
+        }
+
+    def unfinished_ingestions(self) -> list[tuple[str, str]]:
+        """(ingestion_id, calibration_id) of ingestions interrupted before completing, oldest first."""
+        with self._lock:
+            return self._connect().execute(
+                "SELECT id, calibration_id FROM ingestions WHERE state = 'running' ORDER BY created_at"
+            ).fetchall()
+
+    def prune_ingestions(self, finished_before: float) -> int:
+        def op(conn: sqlite3.Connection) -> int:
+            ids = [
+                r[0]
+                for r in conn.execute(
+                    "SELECT id FROM ingestions WHERE state = 'completed' AND finished_at < ?", (finished_before,)
+                )
+            ]
+            conn.executemany("DELETE FROM ingestion_files WHERE ingestion_id = ?", [(i,) for i in ids])
+            conn.executemany("DELETE FROM ingestions WHERE id = ?", [(i,) for i in ids])
+            return len(ids)
+
+        return self._transaction(op)
+
+    def delete_calibration(self, calibration_id: str) -> None:
+        def op(conn: sqlite3.Connection) -> None:
+            conn.execute("DELETE FROM scoring_jobs WHERE calibration_id = ?", (calibration_id,))
+            conn.execute("DELETE FROM rescore_schedule WHERE calibration_id = ?", (calibration_id,))
+            conn.execute("DELETE FROM deferred_scoring WHERE calibration_id = ?", (calibration_id,))
+
+        self._transaction(op)
+
+
+def _owner_is_dead(owner: str, host: str) -> bool:
+    parts = owner.rsplit(":", 2)
+    if len(parts) != 3 or parts[0] != host:
+        return False  # Another node: rely on the visibility timeout.
+    try:
+        pid = int(parts[1])
+    except ValueError:
+        return False
+    if pid == os.getpid():
+        return True  # Same host and pid but a different instance id: our predecessor.
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return True
+    except OSError:
+        return False
+    return False
+
+
+_queue: Optional[JobQueue] = None
+
+
+def get_queue() -> JobQueue:
+    global _queue
+    if _queue is None:
+        _queue = JobQueue(store.get_data_dir() / "scoring_jobs.sqlite3")
+    return _queue
@@ -1,28 +1,69 @@
 """
 LLM provider abstraction. Set LLM_PROVIDER=openai|openrouter|gemini and the
 corresponding API key + optional model name in .env.
+
+LLM_PROVIDER may also be an ordered, comma-separated chain (e.g.
+"openrouter,gemini,openai"): scoring fails over to the next configured provider
+on error and, with LLM_HEDGE=1, sends a hedged request to the next provider when
+the current one runs past its p95 latency. The first valid RankingPayload wins.
+A losing OpenAI/OpenRouter request is aborted by closing its HTTP client; the Gemini
+SDK has no way to abort a call, so a losing Gemini request is abandoned and holds its
+hedge thread until LLM_REQUEST_TIMEOUT_S.
+Resume scoring only uses LLMs when LLM_PROVIDER is set; otherwise it is rule-based.
 """
 import json
+import logging
 import os
 import re
-from typing import Literal, Optional, TypeVar
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Callable, Literal, Optional, TypeVar
+
+from backend import metrics
 
 Provider = Literal["openai", "openrouter", "gemini"]
 
+PROVIDERS: tuple[Provider, ...] = ("openai", "openrouter", "gemini")
+
 DEFAULT_MODELS = {
     "openai": "gpt-4o-mini",
     "openrouter": "meta-llama/llama-3.1-8b-instruct:free",
     "gemini": "gemini-1.5-flash",
 }
 
+DEFAULT_BASE_URLS = {
+    "openrouter": "https://openrouter.ai/api/v1",
+}
+
 T = TypeVar("T")
 
+logger = logging.getLogger(__name__)
+
+
+def get_provider_chain() -> list[Provider]:
+    """Ordered provider chain from LLM_PROVIDER (comma-separated). Unknown names are ignored."""
+    raw = os.environ.get("LLM_PROVIDER") or "openai"
+    chain: list[Provider] = []
+    for part in raw.split(","):
+        p = part.strip().lower()
+        if p in PROVIDERS and p not in chain:
+            chain.append(p)  # type: ignore[arg-type]
+    return chain or ["openai"]
+
+
+def get_scoring_chain() -> list[Provider]:
+    """Providers that score resumes. Only an explicitly set LLM_PROVIDER enables LLM scoring: when it is unset,
+    resumes are scored rule-based even if an API key is present (keys may be set for summaries only)."""
+    if not (os.environ.get("LLM_PROVIDER") or "").strip():
+        return []
+    return get_provider_chain()
+
 
 def get_provider() -> Provider:
-    p = (os.environ.get("LLM_PROVIDER") or "openai").strip().lower()
-    if p not in ("openai", "openrouter", "gemini"):
-        return "openai"
-    return p  # type: ignore
+    """Primary provider: the first entry of the chain."""
+    return get_provider_chain()[0]
 
 
 def get_model(provider: Provider) -> str:
@@ -32,6 +73,88 @@ def get_model(provider: Provider) -> str:
     return os.environ.get(key) or DEFAULT_MODELS[provider]
 
 
+def get_api_key(provider: Provider) -> str:
+    if provider == "gemini":
+        return (os.environ.get("GEMINI_API_KEY") or os.environ.get("GOOGLE_API_KEY") or "").strip()
+    return os.environ.get(f"{provider.upper()}_API_KEY", "").strip()
+
+
+def get_base_url(provider: Provider) -> Optional[str]:
+    """Override endpoint per provider (OPENAI_BASE_URL, OPENROUTER_BASE_URL, GEMINI_BASE_URL), e.g. for local fakes."""
+    return (os.environ.get(f"{provider.upper()}_BASE_URL") or "").strip() or DEFAULT_BASE_URLS.get(provider)
+
+
+def _request_timeout_s() -> float:
+    try:
+        return max(1.0, float(os.environ.get("LLM_REQUEST_TIMEOUT_S") or 60))
+    except ValueError:
+        return 60.0
+
+
+def _max_retries() -> int:
+    """SDK-level retries per provider before failing over (LLM_MAX_RETRIES, default 2)."""
+    try:
+        return max(0, int(os.environ.get("LLM_MAX_RETRIES") or 2))
+    except ValueError:
+        return 2
+
+
+class ProviderLatency:
+    """EWMA and rolling p95 of call latencies for one provider. Thread-safe."""
+
+    def __init__(self, alpha: float = 0.2, window: int = 200) -> None:
+        self._alpha = alpha
+        self._samples: deque[float] = deque(maxlen=window)
+        self._lock = threading.Lock()
+        self.ewma_s: Optional[float] = None
+        self.successes = 0
+        self.failures = 0
+
+    def record(self, seconds: float, ok: bool) -> None:
+        with self._lock:
+            if ok:
+                self.successes += 1
+            else:
+                self.failures += 1
+            self._samples.append(seconds)
+            if self.ewma_s is None:
+                self.ewma_s = seconds
+            else:
+                self.ewma_s = self._alpha * seconds + (1 - self._alpha) * self.ewma_s
+
+    def sample_count(self) -> int:
+        with self._lock:
+            return len(self._samples)
+
+    def p95(self) -> Optional[float]:
+        with self._lock:
+            if not self._samples:
+                return None
+            ordered = sorted(self._samples)
+        return ordered[min(len(ordered) - 1, int(round(0.95 * (len(ordered) - 1))))]
+
+    def snapshot(self) -> dict:
+        p95 = self.p95()
+        with self._lock:
+            return {
+                "ewma_ms": round(self.ewma_s * 1000, 1) if self.ewma_s is not None else None,
+                "p95_ms": round(p95 * 1000, 1) if p95 is not None else None,
+                "samples": len(self._samples),
+                "successes": self.successes,
+                "failures": self.failures,
+            }
+
+
+_latency: dict[str, ProviderLatency] = {p: ProviderLatency() for p in PROVIDERS}
+_hedge_pool: Optional[ThreadPoolExecutor] = None
+_hedge_pool_lock = threading.Lock()
+
+
+def get_latency_stats() -> dict[str, dict]:
+    """Per-provider latency snapshot (EWMA, p95, success/failure counts)."""
+    return {p: stats.snapshot() for p, stats in _latency.items()}
+
+
 def chat_completion_structured(system: str, user: str, response_model: type[T]) -> Optional[T]:
     """Return structured Pydantic model when using OpenAI (instructor). Else returns None for fallback."""
     provider = get_provider()
@@ -60,34 +183,32 @@ def chat_completion_structured(system: str, user: str, response_model: type[T])
 
 
 def chat_completion(system: str, user: str) -> str:
-    """Returns the assistant message content. Raises ValueError if provider misconfigured or call fails."""
-    provider = get_provider()
-    model = get_model(provider)
+    """Returns the assistant message content, failing over along the provider chain.
+    Raises ValueError if no provider is configured or every call fails."""
+    last_error: Optional[ValueError] = None
+    for provider in get_provider_chain():
+        try:
+            return _chat_completion_with(provider, system, user)
+        except ValueError as exc:
+            last_error = last_error or exc
+        except Exception as exc:
+            last_error = ValueError(f"{provider} request failed: {exc}")
+    raise last_error or ValueError("No LLM provider configured")
 
-    if provider == "openai":
-        from openai import OpenAI
-        key = os.environ.get("OPENAI_API_KEY", "").strip()
-        if not key:
-            raise ValueError("OPENAI_API_KEY is not set")
-        client = OpenAI(api_key=key)
-        resp = client.chat.completions.create(
-            model=model,
-            messages=[
-                {"role": "system", "content": system},
-                {"role": "user", "content": user},
-            ],
-            temperature=0.2,
-        )
-        return (resp.choices[0].message.content or "").strip()
 
-    if provider == "openrouter":
+def _chat_completion_with(provider: Provider, system: str, user: str) -> str:
+    model = get_model(provider)
+
+    if provider in ("openai", "openrouter"):
         from openai import OpenAI
-        key = os.environ.get("OPENROUTER_API_KEY", "").strip()
+        key = get_api_key(provider)
         if not key:
-            raise ValueError("OPENROUTER_API_KEY is not set")
+            raise ValueError(f"{provider.upper()}_API_KEY is not set")
         client = OpenAI(
-            base_url="https://openrouter.ai/api/v1",
+            base_url=get_base_url(provider),
             api_key=key,
+            timeout=_request_timeout_s(),
+            max_retries=_max_retries(),
         )
         resp = client.chat.completions.create(
             model=model,
@@ -104,15 +225,15 @@ def chat_completion(system: str, user: str) -> str:
             import google.generativeai as genai
         except ImportError:
             raise ValueError("Gemini provider requires: pip install google-generativeai")
-        key = os.environ.get("GEMINI_API_KEY") or os.environ.get("GOOGLE_API_KEY", "").strip()
+        key = get_api_key("gemini")
         if not key:
             raise ValueError("GEMINI_API_KEY or GOOGLE_API_KEY is not set")
-        genai.configure(api_key=key)
-        gemini = genai.GenerativeModel(model)
+        gemini = _gemini_model(genai, key, model)
         full_prompt = f"{system}\n\n{user}"
         resp = gemini.generate_content(
             full_prompt,
             generation_config={"temperature": 0.2},
+            request_options={"timeout": _request_timeout_s()},
         )
         if not resp or not getattr(resp, "text", None):
             raise ValueError("Gemini returned empty response")
@@ -121,8 +242,22 @@ def chat_completion(system: str, user: str) -> str:
     raise ValueError(f"Unknown provider: {provider}")
 
 
+def _gemini_model(genai, key: str, model_name: str):
+    base_url = get_base_url("gemini")
+    if base_url:
+        genai.configure(api_key=key, transport="rest", client_options={"api_endpoint": base_url})
+    else:
+        genai.configure(api_key=key)
+    return genai.GenerativeModel(model_name)
+
+
 def _build_scoring_prompt(calibration: dict, resume_text: str) -> str:
-    """Build prompt for Gemini resume scoring. Passes full resume and job context."""
+    """Build the resume scoring prompt: job context plus the compacted resume (see backend.prompt_compaction)."""
+    from backend.prompt_compaction import compact_resume_text
+
+    compacted = compact_resume_text(resume_text)
+    logger.debug("scoring prompt compaction: %s", compacted.report())
+    resume_text = compacted.text
     role = str(calibration.get("role") or "").strip()
     jd = str(calibration.get("ideal_candidate") or calibration.get("job_description") or "").strip()
     skills = calibration.get("skills") or []
@@ -170,34 +305,55 @@ Experience: experience_years must be WORK experience only (exclude education). I
 --- JOB CONTEXT ---
 {job_context}
 
---- FULL RESUME (use the entire text for scoring) ---
+--- RESUME (use the entire text for scoring) ---
 {resume_text}
 """
 
 
-def score_resume_with_gemini(calibration: dict, resume_text: str):
-    """
-    Score a resume using Gemini with the full parsed resume text (no truncation).
-    Returns RankingPayload on success, None on failure (caller should fall back to rule-based).
-    """
-    from backend.models import RankingPayload, RankingSubMetric
-
-    if get_provider() != "gemini":
-        return None
-    resume_text = (resume_text or "").strip()
-    if not resume_text:
+class _CallHandle:
+    """Lets the hedging coordinator cancel a losing in-flight request by closing its HTTP client.
+    Scorers without a closer (Gemini) are only abandoned: their result is discarded when they finish."""
+
+    def __init__(self) -> None:
+        self.cancelled = threading.Event()
+        self._closers: list[Callable[[], None]] = []
+        self._lock = threading.Lock()
+        # Token usage reported by the provider for this call: (prompt_tokens, completion_tokens).
+        self.usage: Optional[tuple[int, int]] = None
+        self.cached_tokens = 0
+        self.retries = 0  # HTTP retries the SDK made inside this call
+
+    def on_cancel(self, closer: Callable[[], None]) -> None:
+        with self._lock:
+            if not self.cancelled.is_set():
+                self._closers.append(closer)
+                return
+        closer()
+
+    def cancel(self) -> None:
+        with self._lock:
+            self.cancelled.set()
+            closers, self._closers = self._closers, []
+        for closer in closers:
+            try:
+                closer()
+            except Exception:
+                pass
+
+
+def _score_with_gemini(prompt: str, handle: _CallHandle):
+    """One Gemini scoring call. Returns RankingPayload or None.
+
+    The SDK exposes no per-call client to close, so hedging can't abort this call: if it loses, it runs on
+    (bounded by LLM_REQUEST_TIMEOUT_S) and its result is dropped. Checked before sending so a call
+    cancelled while queued for a hedge thread never goes out."""
+    if handle.cancelled.is_set():
         return None
     try:
         import google.generativeai as genai
     except ImportError:
         return None
-    key = (os.environ.get("GEMINI_API_KEY") or os.environ.get("GOOGLE_API_KEY") or "").strip()
-    if not key:
-        return None
-    model_name = get_model("gemini")
-    genai.configure(api_key=key)
-    model = genai.GenerativeModel(model_name)
-    prompt = _build_scoring_prompt(calibration, resume_text)
+    model = _gemini_model(genai, get_api_key("gemini"), get_model("gemini"))
     generation_config = {"temperature": 0.2}
     try:
         types_mod = getattr(genai, "types", None)
@@ -210,13 +366,18 @@ def score_resume_with_gemini(calibration: dict, resume_text: str):
             generation_config["response_mime_type"] = "application/json"
     except Exception:
         pass
-    try:
-        resp = model.generate_content(
-            prompt,
-            generation_config=generation_config,
+    resp = model.generate_content(
+        prompt,
+        generation_config=generation_config,
+        request_options={"timeout": _request_timeout_s()},
+    )
+    usage = getattr(resp, "usage_metadata", None) if resp else None
+    if usage is not None:
+        handle.usage = (
+            int(getattr(usage, "prompt_token_count", 0) or 0),
+            int(getattr(usage, "candidates_token_count", 0) or 0),
         )
-    except Exception:
-        return None
+        handle.cached_tokens = int(getattr(usage, "cached_content_token_count", 0) or 0)
     text = getattr(resp, "text", None) if resp else None
     if not text or not isinstance(text, str):
         return None
@@ -226,6 +387,228 @@ def score_resume_with_gemini(calibration: dict, resume_text: str):
     return _parse_scoring_response(data)
 
 
+def _score_with_openai_compatible(provider: Provider, prompt: str, handle: _CallHandle):
+    """One OpenAI / OpenRouter scoring call (same wire format). Returns RankingPayload or None."""
+    try:
+        from openai import OpenAI
+    except ImportError:
+        return None
+    client = OpenAI(
+        base_url=get_base_url(provider),
+        api_key=get_api_key(provider),
+        timeout=_request_timeout_s(),
+        max_retries=_max_retries(),
+    )
+    handle.on_cancel(client.close)
+    system = "You are an expert recruiter. Return only valid JSON, no other text or markdown."
+    raw = client.chat.completions.with_raw_response.create(
+        model=get_model(provider),
+        messages=[
+            {"role": "system", "content": system},
+            {"role": "user", "content": prompt},
+        ],
+        temperature=0.2,
+    )
+    handle.retries = getattr(raw, "retries_taken", 0) or 0
+    resp = raw.parse()
+    if resp.usage is not None:
+        handle.usage = (resp.usage.prompt_tokens or 0, resp.usage.completion_tokens or 0)
+        details = getattr(resp.usage, "prompt_tokens_details", None)
+        handle.cached_tokens = (getattr(details, "cached_tokens", 0) or 0) if details else 0
+    content = resp.choices[0].message.content if resp.choices else None
+    if not content or not isinstance(content, str):
+        return None
+    data = _extract_json_from_response(content.strip())
+    if not data:
+        return None
+    return _parse_scoring_response(data)
+
+
+_SCORERS: dict[str, Callable[[str, _CallHandle], object]] = {
+    "openai": lambda prompt, handle: _score_with_openai_compatible("openai", prompt, handle),
+    "openrouter": lambda prompt, handle: _score_with_openai_compatible("openrouter", prompt, handle),
+    "gemini": _score_with_gemini,
+}
+
+
+def _call_scorer(provider: Provider, prompt: str, handle: Optional[_CallHandle] = None):
+    """Run one provider's scorer, recording latency, tokens and errors. Errors count as failures and return None."""
+    handle = handle or _CallHandle()
+    model = get_model(provider)
+    started = time.perf_counter()
+    error: Optional[str] = None
+    try:
+        payload = _SCORERS[provider](prompt, handle)
+        if payload is None:
+            error = "invalid_response"
+    except Exception as exc:
+        payload = None
+        error = type(exc).__name__
+    elapsed = time.perf_counter() - started
+    if payload is not None:
+        from backend.models import ScoringTelemetry
+
+        payload.engine = provider
+        prompt_tokens, completion_tokens = handle.usage or (0, 0)
+        payload.telemetry = ScoringTelemetry(
+            engine=provider,
+            model=model,
+            prompt_tokens=prompt_tokens,
+            completion_tokens=completion_tokens,
+            cached_tokens=handle.cached_tokens,
+            cache_hit=handle.cached_tokens > 0,
+            latency_ms=int(elapsed * 1000),
+            retry_count=handle.retries,
+        )
+    if handle.usage:
+        metrics.LLM_TOKENS.inc(handle.usage[0], provider=provider, model=model, type="prompt")
+        metrics.LLM_TOKENS.inc(handle.usage[1], provider=provider, model=model, type="completion")
+    if handle.cancelled.is_set():
+        metrics.LLM_REQUEST_SECONDS.observe(elapsed, provider=provider, model=model, outcome="cancelled")
+        return payload
+    _latency[provider].record(elapsed, payload is not None)
+    metrics.LLM_REQUEST_SECONDS.observe(elapsed, provider=provider, model=model, outcome="error" if error else "ok")
+    if error:
+        metrics.LLM_ERRORS.inc(provider=provider, model=model, error=error)
+    return payload
+
+
+def _hedging_enabled() -> bool:
+    return (os.environ.get("LLM_HEDGE") or "").strip().lower() in ("1", "true", "yes", "on")
+
+
+def _hedge_delay_s(provider: Provider) -> float:
+    """Hedge deadline: provider p95 once we have enough samples, else LLM_HEDGE_DELAY_S (default 8s)."""
+    stats = _latency[provider]
+    p95 = stats.p95()
+    if p95 is not None and stats.sample_count() >= 10:
+        return p95
+    try:
+        return max(0.05, float(os.environ.get("LLM_HEDGE_DELAY_S") or 8))
+    except ValueError:
+        return 8.0
+
+
+def _get_hedge_pool() -> ThreadPoolExecutor:
+    global _hedge_pool
+    with _hedge_pool_lock:
+        if _hedge_pool is None:
+            try:
+                workers = max(2, int(os.environ.get("LLM_HEDGE_THREADS") or 16))
+            except ValueError:
+                workers = 16
+            _hedge_pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="llm-hedge")
+        return _hedge_pool
+
+
+def _score_hedged(chain: list[Provider], prompt: str):
+    """Failover plus hedging: at most two requests in flight; first valid payload wins, the loser is cancelled."""
+    pool = _get_hedge_pool()
+    remaining = list(chain)
+    in_flight: dict[Future, tuple[Provider, _CallHandle]] = {}
+
+    def launch() -> Optional[Provider]:
+        if not remaining:
+            return None
+        provider = remaining.pop(0)
+        handle = _CallHandle()
+        in_flight[pool.submit(_call_scorer, provider, prompt, handle)] = (provider, handle)
+        return provider
+
+    newest = launch()
+    try:
+        while in_flight:
+            timeout = _hedge_delay_s(newest) if remaining and len(in_flight) == 1 and newest else None
+            done, _ = wait(list(in_flight), timeout=timeout, return_when=FIRST_COMPLETED)
+            if not done:
+                newest = launch() or newest  # hedge: primary is past its p95 deadline
+                metrics.LLM_FALLBACKS.inc(kind="hedge")
+                continue
+            for future in done:
+                in_flight.pop(future)
+                payload = future.result()
+                if payload is not None:
+                    if payload.telemetry is not None:
+                        payload.telemetry.retry_count += len(chain) - len(remaining) - 1
+                    return payload
+            if not in_flight:
+                newest = launch()  # failover: every outstanding request errored
+                if newest:
+                    metrics.LLM_FALLBACKS.inc(kind="failover")
+        return None
+    finally:
+        for future, (_, handle) in in_flight.items():
+            future.cancel()
+            handle.cancel()
+
+
+def score_resume_with_llm(calibration: dict, resume_text: str):
+    """
+    Score a resume with the configured provider chain (compacted parsed resume text).
+    Returns RankingPayload on success, None when LLM_PROVIDER is unset, no provider in
+    it has a key, or all fail (caller falls back to rule-based).
+    """
+    resume_text = (resume_text or "").strip()
+    if not resume_text:
+        return None
+    chain = [p for p in get_scoring_chain() if get_api_key(p)]
+    if not chain:
+        return None
+    started = time.perf_counter()
+    with metrics.SCORE_STAGE_SECONDS.time(stage="prompt"):
+        prompt = _build_scoring_prompt(calibration, resume_text)
+    if _hedging_enabled() and len(chain) > 1:
+        payload = _score_hedged(chain, prompt)
+    else:
+        payload = None
+        for index, provider in enumerate(chain):
+            if index:
+                metrics.LLM_FALLBACKS.inc(kind="failover")
+            payload = _call_scorer(provider, prompt)
+            if payload is not None:
+                if payload.telemetry is not None:
+                    payload.telemetry.retry_count += index
+                break
+    if payload is None:
+        metrics.LLM_FALLBACKS.inc(kind="rule_based")
+    elif payload.telemetry is not None:
+        payload.telemetry.latency_ms = int((time.perf_counter() - started) * 1000)  # end to end, incl. failover
+    return payload
+
+
+# USD per 1M (input, output) tokens. Override or extend with LLM_PRICES='{"model": [input, output], ...}'.
+DEFAULT_PRICES_PER_1M: dict[str, tuple[float, float]] = {
+    "gpt-4o-mini": (0.15, 0.60),
+    "gpt-4o": (2.50, 10.00),
+    "gemini-1.5-flash": (0.075, 0.30),
+    "gemini-1.5-pro": (1.25, 5.00),
+}
+
+
+def get_model_prices() -> dict[str, tuple[float, float]]:
+    prices = dict(DEFAULT_PRICES_PER_1M)
+    raw = os.environ.get("LLM_PRICES")
+    if raw:
+        try:
+            for model, pair in json.loads(raw).items():
+                prices[model] = (float(pair[0]), float(pair[1]))
+        except (ValueError, TypeError, IndexError, AttributeError):
+            logger.warning("Ignoring invalid LLM_PRICES: %s", raw)
+    return prices
+
+
+def estimate_cost_usd(model: Optional[str], prompt_tokens: int, completion_tokens: int) -> Optional[float]:
+    """Cost of one call at list prices; None if the model is unpriced. OpenRouter ":free" models cost 0."""
+    if not model:
+        return None
+    if model.endswith(":free"):
+        return 0.0
+    price = get_model_prices().get(model)
+    if price is None:
+        return None
+    return (prompt_tokens * price[0] + completion_tokens * price[1]) / 1_000_000
+
+
 def _parse_scoring_response(data: dict):
     """Build RankingPayload from parsed JSON. Returns None if invalid."""
     from backend.models import RankingPayload, RankingSubMetric
@@ -322,44 +705,3 @@ def _extract_json_from_response(text: str) -> dict | None:
         return json.loads(json_str)
     except json.JSONDecodeError:
         return None
-
-
-def score_resume_with_openrouter(calibration: dict, resume_text: str):
-    """
-    Score a resume using OpenRouter with the full parsed resume text.
-    Returns RankingPayload on success, None on failure (caller falls back to rule-based).
-    """
-    if get_provider() != "openrouter":
-        return None
-    resume_text = (resume_text or "").strip()
-    if not resume_text:
-        return None
-    key = os.environ.get("OPENROUTER_API_KEY", "").strip()
-    if not key:
-        return None
-    try:
-        from openai import OpenAI
-    except ImportError:
-        return None
-    model = get_model("openrouter")
-    client = OpenAI(base_url="https://openrouter.ai/api/v1", api_key=key)
-    prompt = _build_scoring_prompt(calibration, resume_text)
-    system = "You are an expert recruiter. Return only valid JSON, no other text or markdown."
-    try:
-        resp = client.chat.completions.create(
-            model=model,
-            messages=[
-                {"role": "system", "content": system},
-                {"role": "user", "content": prompt},
-            ],
-            temperature=0.2,
-        )
-    except Exception:
-        return None
-    content = resp.choices[0].message.content if resp.choices else None
-    if not content or not isinstance(content, str):
-        return None
-    data = _extract_json_from_response(content.strip())
-    if not data:
-        return None
-    return _parse_scoring_response(data)
@@ -1,13 +1,20 @@
 import os
+import threading
+from contextlib import asynccontextmanager
 from pathlib import Path
 from typing import List
 
 from dotenv import load_dotenv
-from fastapi import FastAPI
+from fastapi import FastAPI, HTTPException
+from fastapi.responses import Response
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
 
+from backend import metrics
+from backend.ingestion import resume_ingestions
+from backend.parser import shutdown_parse_pool, warm_up_parse_pool
 from backend.routers import analytics, calibration, candidates
+from backend.scoring_tasks import recover_scoring_jobs
 
 # Load .env from backend/ when run as "uvicorn backend.main:app" (cwd = project root)
 _env = Path(__file__).resolve().parent / ".env"
@@ -25,7 +32,20 @@ allowed_origins = _csv_env(
 )
 trusted_hosts = _csv_env("TRUSTED_HOSTS", "localhost,127.0.0.1")
 
-app = FastAPI(title="RecruitOS API")
+
+@asynccontextmanager
+async def lifespan(_app: FastAPI):
+    # Resume scoring interrupted by a restart/deploy (durable job queue + orphaned "pending"/"processing").
+    recover_scoring_jobs()
+    resume_ingestions()
+    if os.getenv("PARSER_WARMUP", "").strip().lower() in ("1", "true", "yes", "on"):
+        # Start the parse processes (the Marker one loads its models) in the background so the first upload doesn't pay for it.
+        threading.Thread(target=warm_up_parse_pool, name="parser-warmup", daemon=True).start()
+    yield
+    shutdown_parse_pool()
+
+
+app = FastAPI(title="RecruitOS API", lifespan=lifespan)
 app.add_middleware(TrustedHostMiddleware, allowed_hosts=trusted_hosts)
 app.add_middleware(
     CORSMiddleware,
@@ -50,6 +70,14 @@ def health() -> dict[str, str]:
     return {"status": "ok"}
 
 
+@app.get("/metrics", include_in_schema=False)
+def prometheus_metrics() -> Response:
+    """Prometheus text exposition of scoring, LLM, parser and store metrics (METRICS_ENABLED=0 disables)."""
+    if not metrics.is_enabled():
+        raise HTTPException(status_code=404, detail="Metrics are disabled.")
+    return Response(content=metrics.render(), media_type=metrics.CONTENT_TYPE)
+
+
 app.include_router(calibration.router, prefix="/api")
 app.include_router(candidates.router, prefix="/api")
 app.include_router(analytics.router, prefix="/api")
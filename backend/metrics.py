@@ -0,0 +1,259 @@
+"""
+In-process metrics with Prometheus text exposition (served at GET /metrics).
+
+Counters, histograms and callback gauges keyed by label values. Each metric update is
+a dict lookup plus a short lock, so the hot-path cost is negligible. METRICS_ENABLED=0
+turns every update into a no-op and the endpoint into a 404.
+
+Metrics are per process; `python -m backend worker --metrics-port N` serves a worker's own.
+"""
+from __future__ import annotations
+
+import bisect
+import math
+import os
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Iterator, Optional
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60, 120)
+SIZE_BUCKETS = (1e3, 1e4, 1e5, 5e5, 1e6, 5e6, 1e7, 5e7, 1e8)
+PAGE_BUCKETS = (1, 2, 3, 5, 10, 20, 50, 100)
+
+_enabled = (os.environ.get("METRICS_ENABLED") or "1").strip().lower() not in ("0", "false", "no", "off")
+
+
+def is_enabled() -> bool:
+    return _enabled
+
+
+def set_enabled(enabled: bool) -> None:
+    global _enabled
+    _enabled = enabled
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: tuple[str, ...], values: tuple[str, ...], extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _number(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) and not value.is_integer() else str(int(value))
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self._lock = threading.Lock()
+        _registry.append(self)
+
+    def _key(self, labels: dict[str, str]) -> tuple[str, ...]:
+        return tuple(str(labels.get(n, "")) for n in self.labelnames)
+
+    def header(self) -> list[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+    def samples(self) -> list[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()) -> None:
+        super().__init__(name, documentation, labelnames)
+        self._values: dict[tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        if not _enabled or amount <= 0:
+            return
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels: str) -> float:
+        return self._values.get(self._key(labels), 0)
+
+    def samples(self) -> list[str]:
+        with self._lock:
+            items = list(self._values.items())
+        return [f"{self.name}{_labels(self.labelnames, k)} {_number(v)}" for k, v in items]
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = LATENCY_BUCKETS,
+    ) -> None:
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # label values -> [per-bucket counts (non-cumulative, last = +Inf), sum, count]
+        self._values: dict[tuple[str, ...], list] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        if not _enabled:
+            return
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            state[0][index] += 1
+            state[1] += value
+            state[2] += 1
+
+    @contextmanager
+    def time(self, **labels: str) -> Iterator[dict[str, str]]:
+        """Observe the block's duration. The yielded dict can update labels inside the block (e.g. outcome)."""
+        started = time.perf_counter()
+        try:
+            yield labels
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def samples(self) -> list[str]:
+        with self._lock:
+            items = [(k, list(v[0]), v[1], v[2]) for k, v in self._values.items()]
+        lines: list[str] = []
+        for key, counts, total, count in items:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (math.inf,), counts):
+                cumulative += bucket_count
+                le = 'le="' + _number(bound) + '"'
+                lines.append(f"{self.name}_bucket{_labels(self.labelnames, key, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, key)} {_number(total)}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, key)} {count}")
+        return lines
+
+
+class Gauge(_Metric):
+    """Gauge read from a callback at scrape time (no hot-path cost)."""
+
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str, read: Callable[[], float]) -> None:
+        super().__init__(name, documentation)
+        self.read = read
+
+    def samples(self) -> list[str]:
+        try:
+            return [f"{self.name} {_number(self.read())}"]
+        except Exception:
+            return []
+
+
+_registry: list[_Metric] = []
+
+
+def render() -> str:
+    lines: list[str] = []
+    for metric in _registry:
+        samples = metric.samples()
+        if samples:
+            lines.extend(metric.header())
+            lines.extend(samples)
+    return "\n".join(lines) + "\n"
+
+
+def serve_in_background(port: int, host: str = "0.0.0.0") -> ThreadingHTTPServer:
+    """Expose /metrics from a process without an HTTP app (scoring workers)."""
+
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *args) -> None:
+            pass
+
+        def do_GET(self) -> None:
+            if self.path.split("?")[0] != "/metrics" or not _enabled:
+                self.send_error(404)
+                return
+            body = render().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", CONTENT_TYPE)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+    return server
+
+
+# --- Scoring pipeline metrics -------------------------------------------------------------
+
+SCORING_JOB_SECONDS = Histogram(
+    "recruitos_scoring_job_seconds",
+    "Scoring job duration (one candidate, or a calibration-wide cascade pass).",
+    ("kind", "outcome"),
+)
+SCORE_STAGE_SECONDS = Histogram(
+    "recruitos_score_stage_seconds",
+    "score_resume stage duration: prompt (compaction + build), llm (provider chain), rule_based.",
+    ("stage",),
+)
+LLM_REQUEST_SECONDS = Histogram(
+    "recruitos_llm_request_seconds",
+    "LLM scoring request latency by provider, model and outcome.",
+    ("provider", "model", "outcome"),
+)
+LLM_TOKENS = Counter(
+    "recruitos_llm_tokens_total",
+    "LLM tokens reported by the provider.",
+    ("provider", "model", "type"),
+)
+LLM_ERRORS = Counter(
+    "recruitos_llm_errors_total",
+    "Failed LLM scoring requests by provider, model and error type.",
+    ("provider", "model", "error"),
+)
+LLM_FALLBACKS = Counter(
+    "recruitos_llm_fallbacks_total",
+    "Fallbacks: failover to the next provider, hedged request, or rule-based scoring after the chain failed.",
+    ("kind",),
+)
+PARSE_SECONDS = Histogram(
+    "recruitos_parse_seconds",
+    "PDF text extraction time by parser and outcome.",
+    ("parser", "outcome"),
+)
+PARSE_ESCALATIONS = Counter(
+    "recruitos_parse_escalations_total",
+    "Adaptive parsing: PyMuPDF extractions sent to Marker, by quality problem.",
+    ("reason",),
+)
+PARSE_CACHE = Counter("recruitos_parse_cache_total", "Parse cache lookups by result (hit, miss).", ("result",))
+PARSE_PAGES = Histogram("recruitos_parse_pages", "Pages per parsed PDF.", ("parser",), buckets=PAGE_BUCKETS)
+STORE_SAVE_SECONDS = Histogram("recruitos_store_save_seconds", "Data file write duration.")
+STORE_SAVE_BYTES = Histogram("recruitos_store_save_bytes", "Data file size per write.", buckets=SIZE_BUCKETS)
+
+
+def gauge(name: str, documentation: str, read: Callable[[], float]) -> Optional[Gauge]:
+    """Register a callback gauge once (module reloads in tests/dev servers re-register by name)."""
+    for metric in _registry:
+        if metric.name == name:
+            if isinstance(metric, Gauge):
+                metric.read = read
+                return metric
+            return None
+    return Gauge(name, documentation, read)
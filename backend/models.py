@@ -39,11 +39,24 @@ class CalibrationCreate(BaseModel):
     scoring_weight_education: Optional[int] = Field(None, ge=0, le=100)
     scoring_weight_experience: Optional[int] = Field(None, ge=0, le=100)
     scoring_weight_context: Optional[int] = Field(None, ge=0, le=100)
+    # Cascade scoring: rule-based pass for every candidate, LLM only for the shortlist.
+    # Shortlist = top N and/or top X% of rule-based scores, optionally above a score floor (default top 20%).
+    scoring_mode: Literal["standard", "cascade"] = "standard"
+    cascade_top_n: Optional[int] = Field(None, ge=1)
+    cascade_top_percent: Optional[int] = Field(None, ge=1, le=100)
+    cascade_min_score: Optional[int] = Field(None, ge=0, le=100)
 
 
 class Calibration(CalibrationCreate):
     id: str
     created_at: datetime
+    # Bumped on every edit that invalidates scores; jobs and results from older generations are discarded.
+    scoring_generation: int = 0
+
+
+class CalibrationUpdateResult(Calibration):
+    """PATCH response: the saved calibration plus when its debounced rescore will start (None if not scheduled)."""
+    rescore_scheduled_at: Optional[datetime] = None
 
 
 class ScoringMetrics(BaseModel):
@@ -64,6 +77,8 @@ class CandidateProfile(BaseModel):
     rating: Optional[int] = Field(None, ge=1, le=5)
     notes: Optional[str] = None
     ai_summary: Optional[str] = None  # 1–2 sentence LLM summary for pipeline view
+    content_sha256: Optional[str] = None  # of the uploaded PDF; flags exact re-uploads
+    parser: Optional[str] = None  # which extractor produced parsed_text: "pymupdf" | "marker"
 
 
 class CandidateResult(BaseModel):
@@ -79,6 +94,18 @@ class CandidateResult(BaseModel):
     ai_summary: Optional[str] = None
 
 
+class UploadDuplicate(BaseModel):
+    """An uploaded file skipped as an exact copy (same PDF bytes) of a candidate's resume."""
+    filename: str
+    candidate_id: Optional[str] = None  # the existing candidate; None if the batch's first copy failed to parse
+
+
+class UploadResult(BaseModel):
+    """POST /api/upload (sync): every candidate in the calibration, plus the files skipped as duplicates."""
+    candidates: list[CandidateResult]
+    duplicates: list[UploadDuplicate] = []
+
+
 class CandidateUpdate(BaseModel):
     """Partial update for candidate: stage, rating, notes, ai_summary."""
     stage: Optional[str] = None
@@ -98,6 +125,21 @@ class RankingSubMetric(BaseModel):
     rationale: str = ""
 
 
+ScoringEngine = Literal["rule_based", "openai", "openrouter", "gemini"]
+
+
+class ScoringTelemetry(BaseModel):
+    """How a score was produced: engine/model, token usage, end-to-end latency and extra requests."""
+    engine: ScoringEngine = "rule_based"
+    model: Optional[str] = None
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    cached_tokens: int = 0  # prompt tokens served from the provider's prompt cache
+    cache_hit: bool = False
+    latency_ms: int = 0
+    retry_count: int = 0  # requests beyond the first: SDK retries plus failover/hedged attempts
+
+
 class RankingPayload(BaseModel):
     total_score: int = Field(ge=0, le=100)
     experience_years: Optional[float] = None
@@ -109,6 +151,8 @@ class RankingPayload(BaseModel):
     matched_schools: list[str] = Field(default_factory=list)
     matched_degrees: list[str] = Field(default_factory=list)
     sub_metrics: list[RankingSubMetric] = Field(default_factory=list)
+    engine: ScoringEngine = "rule_based"
+    telemetry: Optional[ScoringTelemetry] = None
 
 
 class CandidateScoringState(BaseModel):
@@ -125,6 +169,12 @@ class CandidateScoringState(BaseModel):
     sub_metrics: list[RankingSubMetric] = Field(default_factory=list)
     error: Optional[str] = None
     updated_at: datetime = Field(default_factory=datetime.utcnow)
+    generation: Optional[int] = None  # calibration scoring_generation this result was computed for
+    # Which tier produced total_score; cascade mode keeps both tier scores.
+    tier: Optional[Literal["rule_based", "llm"]] = None
+    rule_based_score: Optional[int] = Field(default=None, ge=0, le=100)
+    llm_score: Optional[int] = Field(default=None, ge=0, le=100)
+    telemetry: Optional[ScoringTelemetry] = None
 
 
 class RankedCandidateResult(CandidateResult):
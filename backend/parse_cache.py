@@ -0,0 +1,128 @@
+"""
+Content-addressed parse cache: extracted text keyed by the SHA-256 of the PDF bytes and
+the parser version, in a SQLite file next to the data file.
+
+The same resume re-uploaded, or sent to several requisitions, is parsed once. The cache
+is bounded by PARSE_CACHE_MAX_MB of text (default 256; 0 disables it) and evicts least
+recently used entries. Lookups and inserts are safe from several processes (API, parse
+pool, score-batch workers).
+"""
+from __future__ import annotations
+
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+
+from backend import store
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS parse_cache (
+    key TEXT PRIMARY KEY,
+    parser TEXT NOT NULL,
+    pages INTEGER,
+    text TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    last_used REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS parse_cache_lru ON parse_cache (last_used);
+"""
+
+
+def content_sha256(pdf_bytes: bytes) -> str:
+    return hashlib.sha256(pdf_bytes).hexdigest()
+
+
+def file_sha256(path: str | Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        while chunk := f.read(1024 * 1024):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def max_bytes() -> int:
+    try:
+        return max(0, int(float(os.environ.get("PARSE_CACHE_MAX_MB") or 256) * 1024 * 1024))
+    except ValueError:
+        return 256 * 1024 * 1024
+
+
+class ParseCache:
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        self._size: Optional[int] = None  # running total of cached text bytes (this process's view)
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.path), timeout=30, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(_SCHEMA)
+            self._conn = conn
+        return self._conn
+
+    def get(self, key: str) -> Optional[tuple[str, str, Optional[int]]]:
+        """(text, parser, pages) for a cached key, marking it recently used; None on a miss."""
+        with self._lock:
+            conn = self._connect()
+            row = conn.execute("SELECT text, parser, pages FROM parse_cache WHERE key = ?", (key,)).fetchone()
+            if row is not None:
+                conn.execute("UPDATE parse_cache SET last_used = ? WHERE key = ?", (time.time(), key))
+        return row
+
+    def put(self, key: str, text: str, parser: str, pages: Optional[int], limit: int) -> None:
+        size = len(text.encode("utf-8"))
+        if size > limit:
+            return
+        with self._lock:
+            conn = self._connect()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                if self._size is None:
+                    self._size = conn.execute("SELECT COALESCE(SUM(size), 0) FROM parse_cache").fetchone()[0]
+                previous = conn.execute("SELECT size FROM parse_cache WHERE key = ?", (key,)).fetchone()
+                conn.execute(
+                    "INSERT OR REPLACE INTO parse_cache (key, parser, pages, text, size, last_used) VALUES (?, ?, ?, ?, ?, ?)",
+                    (key, parser, pages, text, size, time.time()),
+                )
+                self._size += size - (previous[0] if previous else 0)
+                if self._size > limit:
+                    # Other processes also insert: recount before evicting, then trim to 90% so eviction is batched.
+                    self._size = conn.execute("SELECT COALESCE(SUM(size), 0) FROM parse_cache").fetchone()[0]
+                    target = int(limit * 0.9)
+                    for old_key, old_size in conn.execute(
+                        "SELECT key, size FROM parse_cache WHERE key != ? ORDER BY last_used", (key,)
+                    ).fetchall():
+                        if self._size <= target:
+                            break
+                        conn.execute("DELETE FROM parse_cache WHERE key = ?", (old_key,))
+                        self._size -= old_size
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+
+    def clear(self) -> None:
+        with self._lock:
+            self._connect().execute("DELETE FROM parse_cache")
+            self._size = 0
+
+
+_cache: Optional[ParseCache] = None
+
+
+def get_cache() -> Optional[ParseCache]:
+    """The process-wide cache, or None when PARSE_CACHE_MAX_MB=0."""
+    global _cache
+    if not max_bytes():
+        return None
+    if _cache is None:
+        _cache = ParseCache(store.get_data_dir() / "parse_cache.sqlite3")
+    return _cache
@@ -1,49 +1,663 @@
+import asyncio
+import importlib.util
+import io
+import logging
+import multiprocessing
 import os
+import signal
 import tempfile
+import threading
+import time
+import unicodedata
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, replace
+from importlib import metadata
 from pathlib import Path
+from typing import Any, Callable, Iterator, Optional, Union
+
+from backend import metrics
+from backend.parse_cache import content_sha256, file_sha256, get_cache, max_bytes as parse_cache_max_bytes
 
 try:
     import fitz  # PyMuPDF
 except ImportError:
     fitz = None
 
+logger = logging.getLogger(__name__)
+
+# Process-wide Marker converter: model weights (layout, OCR, ...) load once, not per PDF.
+_marker_converter = None
+_marker_unavailable = False
+_marker_init_lock = threading.Lock()
+# Marker's torch models are not safe for concurrent inference; conversions in one process run one at a time.
+_marker_lock = threading.Lock()
+# Whether this Marker version accepts in-memory input (None until the first conversion tells us).
+_marker_accepts_bytes: Optional[bool] = None
+
+# Bump when extraction output changes for the same parser version, so cached text is re-parsed.
+PARSE_FORMAT_VERSION = 3
+
+# Adaptive parsing: PyMuPDF first; Marker only when the PyMuPDF extraction looks poor.
+MIN_CHARS_PER_PAGE = 200  # fewer suggests a scanned / image-only PDF
+MAX_GARBAGE_RATIO = 0.05  # replacement, private-use and control characters (broken font encodings)
+MAX_MULTI_COLUMN_RATIO = 0.4  # text lines sharing a row with another line (multi-column layout)
+MAX_TABLE_LINE_RATIO = 0.3  # text lines in rows of 3+ side-by-side lines (tables)
+
+# Long documents: PyMuPDF extraction is split into page ranges run in parallel across the parse pool.
+RANGE_MIN_PAGES = 8  # smallest page range given to one worker
+
+
+# In-memory PDF bytes, or a path to a PDF on disk (spooled uploads), which MuPDF reads itself.
+PdfSource = Union[bytes, str, Path]
+
+
+class ParseTimeout(Exception):
+    """A PDF took longer than PARSER_TIMEOUT_S to parse."""
+
+
+@dataclass(frozen=True)
+class ParseResult:
+    text: str
+    parser: str  # "marker" | "pymupdf"
+    pages: Optional[int] = None
+    # (parser, outcome, seconds) for every attempt, e.g. Marker "empty" then PyMuPDF "ok".
+    attempts: tuple[tuple[str, str, float], ...] = ()
+    sha256: Optional[str] = None  # of the PDF bytes
+    cached: bool = False  # served from the parse cache
+    escalation: Optional[str] = None  # why PyMuPDF output was sent to Marker (adaptive mode)
+    truncated: bool = False  # cut at PARSER_MAX_PAGES / PARSER_MAX_CHARS (the text ends with a marker)
+
+
+def record_parse_metrics(result: ParseResult) -> None:
+    """Record parse metrics in the calling process (pool workers' own registries are never scraped)."""
+    for parser, outcome, seconds in result.attempts:
+        metrics.PARSE_SECONDS.observe(seconds, parser=parser, outcome=outcome)
+    if result.pages:
+        metrics.PARSE_PAGES.observe(result.pages, parser=result.parser)
+    if result.escalation:
+        metrics.PARSE_ESCALATIONS.inc(reason=result.escalation)
+
+
+def parser_mode() -> str:
+    """PARSER_MODE: adaptive (default: PyMuPDF, Marker when quality is poor) | marker (prefer Marker) | pymupdf."""
+    mode = (os.environ.get("PARSER_MODE") or "adaptive").strip().lower()
+    return mode if mode in ("adaptive", "marker", "pymupdf") else "adaptive"
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return max(0, int(os.environ.get(name) or default))
+    except ValueError:
+        return default
 
-def _extract_with_pymupdf(pdf_bytes: bytes) -> str:
+
+def max_pages() -> int:
+    """PARSER_MAX_PAGES: pages extracted per PDF (default 50; 0 = no cap). Later pages are never read."""
+    return _env_int("PARSER_MAX_PAGES", 50)
+
+
+def max_chars() -> int:
+    """PARSER_MAX_CHARS: characters of text kept per PDF (default 100000; 0 = no cap)."""
+    return _env_int("PARSER_MAX_CHARS", 100_000)
+
+
+def parallel_min_pages() -> int:
+    """PARSER_PARALLEL_PAGES: PDFs with at least this many pages are extracted as parallel page ranges (default 24)."""
+    return _env_int("PARSER_PARALLEL_PAGES", 24)
+
+
+def _open_pdf(source: PdfSource):
+    if isinstance(source, (bytes, bytearray)):
+        return fitz.open(stream=source, filetype="pdf")
+    return fitz.open(str(source), filetype="pdf")
+
+
+def _require_fitz() -> None:
     if fitz is None:
         raise RuntimeError("PyMuPDF is required. Install with: pip install pymupdf")
-    doc = fitz.open(stream=pdf_bytes, filetype="pdf")
-    parts = []
-    for page in doc:
+
+
+def _iter_pages(doc, start: int, stop: Optional[int]) -> Iterator[Any]:
+    """Pages [start, stop) of an open document, loaded one at a time and never past PARSER_MAX_PAGES."""
+    end = doc.page_count if stop is None else min(stop, doc.page_count)
+    if max_pages():
+        end = min(end, max_pages())
+    for number in range(start, end):
+        yield doc.load_page(number)
+
+
+def iter_pdf_pages(source: PdfSource, start: int = 0, stop: Optional[int] = None) -> Iterator[str]:
+    """Yield the text of pages [start, stop) one at a time; only the current page is held in memory.
+    Honors PARSER_MAX_PAGES (PARSER_MAX_CHARS is left to the caller)."""
+    _require_fitz()
+    doc = _open_pdf(source)
+    try:
+        for page in _iter_pages(doc, start, stop):
+            yield page.get_text()
+    finally:
+        doc.close()
+
+
+def _extract_pages(doc, start: int, stop: int, assess: bool) -> tuple[list[str], list[int]]:
+    """Text of pages [start, stop), stopping early once PARSER_MAX_CHARS is reached; plus row segments when assess."""
+    budget = max_chars()
+    parts: list[str] = []
+    rows: list[int] = []  # text segments per visual row, over all pages
+    chars = 0
+    for page in _iter_pages(doc, start, stop):
         parts.append(page.get_text())
-    doc.close()
-    return "\n".join(parts).strip()
+        if assess:
+            rows.extend(_row_segments(page))
+        chars += len(parts[-1])
+        if budget and chars > budget:
+            break
+    return parts, rows
 
 
-def extract_text_from_pdf(pdf_bytes: bytes) -> str:
-    """Extract text from PDF. Uses Marker for layout-aware parsing when available, else PyMuPDF."""
+def _extract_page_range(source: PdfSource, start: int, stop: int, assess: bool) -> tuple[list[str], list[int]]:
+    """One worker's share of a long PDF (runs in the parse pool)."""
+    _require_fitz()
+    doc = _open_pdf(source)
+    try:
+        return _extract_pages(doc, start, stop, assess)
+    finally:
+        doc.close()
+
+
+def _truncate(text: str, pages: Optional[int], pages_read: Optional[int]) -> tuple[str, bool]:
+    """Apply PARSER_MAX_CHARS and append a truncation marker when pages or characters were dropped."""
+    limit = max_chars()
+    note = None
+    if limit and len(text) > limit:
+        text = text[:limit].rstrip()
+        note = f"first {limit} characters"
+    elif pages and pages_read is not None and pages_read < pages:
+        note = f"first {pages_read} of {pages} pages"
+    if note is None:
+        return text, False
+    return f"{text}\n\n[Truncated: {note} of this document were extracted.]", True
+
+
+def _pymupdf_result(
+    parts: list[str], rows: list[int], pages: int, pages_read: int, assess: bool, attempts: tuple
+) -> tuple[ParseResult, Optional[str]]:
+    text = "\n".join(parts).strip()
+    issue = _quality_issue(text, pages_read, rows) if assess else None
+    text, truncated = _truncate(text, pages, pages_read)
+    return ParseResult(text, "pymupdf", pages, attempts, truncated=truncated), issue
+
+
+def _extract_with_pymupdf(source: PdfSource, attempts: tuple = (), assess: bool = False) -> tuple[ParseResult, Optional[str]]:
+    """PyMuPDF text (capped), plus (when assess) the first quality problem found, or None if the extraction looks fine."""
+    _require_fitz()
+    started = time.perf_counter()
+    doc = _open_pdf(source)
     try:
-        from marker.converters.pdf import PdfConverter
-        from marker.models import create_model_dict
-        from marker.output import text_from_rendered
-    except ImportError:
-        return _extract_with_pymupdf(pdf_bytes)
+        pages = doc.page_count
+        pages_read = min(pages, max_pages() or pages)
+        parts, rows = _extract_pages(doc, 0, pages_read, assess)
+    finally:
+        doc.close()
+    attempts += (("pymupdf", "ok", time.perf_counter() - started),)
+    return _pymupdf_result(parts, rows, pages, pages_read, assess, attempts)
+
+
+def _row_segments(page) -> list[int]:
+    """Group the page's text lines into visual rows (shared baseline) and count the segments in each row."""
+    baselines = sorted(
+        round(line["bbox"][3])
+        for block in page.get_text("dict")["blocks"]
+        if block.get("type") == 0
+        for line in block["lines"]
+        if any(span["text"].strip() for span in line["spans"])
+    )
+    rows: list[int] = []
+    previous = None
+    for baseline in baselines:
+        if previous is not None and baseline - previous <= 2:
+            rows[-1] += 1
+        else:
+            rows.append(1)
+        previous = baseline
+    return rows
+
+
+def _quality_issue(text: str, pages: int, rows: list[int]) -> Optional[str]:
+    """Cheap signals that PyMuPDF's plain-text extraction is poor: sparse text, garbage characters,
+    table or multi-column layouts (whose reading order PyMuPDF interleaves)."""
+    chars = len(text)
+    if chars < MIN_CHARS_PER_PAGE * max(pages, 1):
+        return "low_text_density"
+    garbage = sum(
+        1
+        for c in text
+        if c == "\ufffd" or (unicodedata.category(c) in ("Cc", "Co", "Cs") and c not in "\n\r\t")
+    )
+    if garbage / chars > MAX_GARBAGE_RATIO:
+        return "garbage_characters"
+    lines = sum(rows)
+    if lines and sum(n for n in rows if n >= 3) / lines > MAX_TABLE_LINE_RATIO:
+        return "table_layout"
+    if lines and sum(n for n in rows if n >= 2) / lines > MAX_MULTI_COLUMN_RATIO:
+        return "multi_column"
+    return None
+
+
+def get_marker_converter():
+    """Lazily build the process-wide Marker PdfConverter. None if Marker is not installed or fails to load."""
+    global _marker_converter, _marker_unavailable
+    if _marker_converter is not None or _marker_unavailable:
+        return _marker_converter
+    with _marker_init_lock:
+        if _marker_converter is None and not _marker_unavailable:
+            try:
+                from marker.converters.pdf import PdfConverter
+                from marker.models import create_model_dict
+            except ImportError:
+                _marker_unavailable = True
+                return None
+            started = time.perf_counter()
+            try:
+                _marker_converter = PdfConverter(artifact_dict=create_model_dict())
+            except Exception:
+                logger.exception("Loading Marker models failed; using PyMuPDF")
+                _marker_unavailable = True
+                return None
+            logger.info("Marker models loaded in %.1fs", time.perf_counter() - started)
+    return _marker_converter
+
 
+def warm_up_parser() -> bool:
+    """Load Marker models ahead of the first upload (PARSER_WARMUP=1). True if Marker is ready."""
+    return get_marker_converter() is not None
+
+
+def _render_with_marker(converter, source: PdfSource):
+    """Run the converter on a path, or on in-memory bytes; older Marker versions only take a path, so bytes
+    fall back to a temp file."""
+    global _marker_accepts_bytes
+    if not isinstance(source, (bytes, bytearray)):
+        return converter(str(source))
+    pdf_bytes = source
+    if _marker_accepts_bytes is not False:
+        try:
+            rendered = converter(io.BytesIO(pdf_bytes))
+            _marker_accepts_bytes = True
+            return rendered
+        except Exception:
+            if _marker_accepts_bytes:
+                raise  # Bytes input works in this version; the PDF itself is the problem.
     with tempfile.NamedTemporaryFile(suffix=".pdf", delete=False) as f:
+        f.write(pdf_bytes)
         path = f.name
-        try:
-            f.write(pdf_bytes)
-            f.flush()
-        finally:
-            f.close()
     try:
-        converter = PdfConverter(artifact_dict=create_model_dict())
         rendered = converter(path)
-        text, _, _ = text_from_rendered(rendered)
-        return (text or "").strip() or _extract_with_pymupdf(pdf_bytes)
-    except Exception:
-        return _extract_with_pymupdf(pdf_bytes)
+        _marker_accepts_bytes = False
+        return rendered
     finally:
         try:
             os.unlink(path)
         except Exception:
             pass
+
+
+def _extract_with_marker(converter, source: PdfSource) -> tuple[Optional[ParseResult], tuple]:
+    """Marker text, or None when it fails or comes back empty; plus the attempt record."""
+    from marker.output import text_from_rendered
+
+    started = time.perf_counter()
+    try:
+        with _marker_lock:
+            rendered = _render_with_marker(converter, source)
+        text, _, _ = text_from_rendered(rendered)
+    except Exception:
+        return None, ("marker", "error", time.perf_counter() - started)
+    if not (text or "").strip():
+        return None, ("marker", "empty", time.perf_counter() - started)
+    page_stats = (getattr(rendered, "metadata", None) or {}).get("page_stats")
+    attempt = ("marker", "ok", time.perf_counter() - started)
+    pages = len(page_stats) if page_stats else None
+    text, truncated = _truncate(text.strip(), pages, pages)  # character cap only: Marker renders every page
+    return ParseResult(text, "marker", pages, (attempt,), truncated=truncated), attempt
+
+
+def parse_pdf(source: PdfSource) -> ParseResult:
+    """
+    Extract text. Adaptive mode (default) runs PyMuPDF, which takes milliseconds, and escalates to Marker
+    (layout-aware, seconds per page) only when quality signals say the extraction is poor. PARSER_MODE=marker
+    prefers Marker for every PDF; pymupdf never uses it. Reads bytes or a file path. Does not record metrics.
+    """
+    mode = parser_mode()
+    if mode == "marker":
+        converter = get_marker_converter()
+        if converter is not None:
+            result, attempt = _extract_with_marker(converter, source)
+            if result is not None:
+                return result
+            return _extract_with_pymupdf(source, (attempt,))[0]
+    if mode != "adaptive":
+        return _extract_with_pymupdf(source)[0]
+
+    try:
+        fast, issue = _extract_with_pymupdf(source, assess=True)
+    except Exception:
+        if fitz is None or get_marker_converter() is None:
+            raise
+        fast, issue = None, "pymupdf_error"  # PyMuPDF can't open it; Marker's renderer might.
+    if issue is None:
+        return fast
+    return _escalate(source, fast, issue)
+
+
+def _escalate(source: PdfSource, fast: Optional[ParseResult], issue: str) -> ParseResult:
+    """Adaptive mode: re-parse with Marker after PyMuPDF's result showed `issue`; keep PyMuPDF's if Marker fails."""
+    converter = get_marker_converter()
+    if converter is None:
+        if fast is None:
+            raise ValueError("PyMuPDF could not read this PDF and Marker is unavailable.")
+        return fast
+    result, attempt = _extract_with_marker(converter, source)
+    previous = fast.attempts if fast is not None else ()
+    if result is not None:
+        return replace(result, attempts=previous + (attempt,), escalation=issue)
+    if fast is None:
+        raise ValueError("Neither PyMuPDF nor Marker could read this PDF.")
+    return replace(fast, attempts=previous + (attempt,), escalation=issue)
+
+
+_parser_version: Optional[str] = None
+
+
+def parser_version() -> str:
+    """Identifies the text a parse produces (format version + parser + its version); part of the cache key."""
+    global _parser_version
+    if _parser_version is None:
+        if importlib.util.find_spec("marker") is not None:
+            try:
+                engine = f"marker-{metadata.version('marker-pdf')}"
+            except metadata.PackageNotFoundError:
+                engine = "marker"
+        else:
+            engine = f"pymupdf-{getattr(fitz, 'VersionBind', '')}"
+        # The caps change the text too, so they are part of the version.
+        _parser_version = f"{PARSE_FORMAT_VERSION}/{parser_mode()}/{engine}/p{max_pages()}c{max_chars()}"
+    return _parser_version
+
+
+def _cached_parse(digest: str) -> Optional[ParseResult]:
+    cache = get_cache()
+    if cache is None:
+        return None
+    try:
+        hit = cache.get(f"{digest}:{parser_version()}")
+    except Exception:
+        logger.exception("Parse cache lookup failed")
+        return None
+    metrics.PARSE_CACHE.inc(result="hit" if hit else "miss")
+    if hit is None:
+        return None
+    text, parser, pages = hit
+    return ParseResult(text, parser, pages, sha256=digest, cached=True)
+
+
+def _remember_parse(result: ParseResult) -> None:
+    cache = get_cache()
+    # A Marker error fallback may be transient (e.g. out of memory); don't pin its PyMuPDF text in the cache.
+    if cache is None or result.sha256 is None or any(outcome == "error" for _, outcome, _ in result.attempts):
+        return
+    try:
+        cache.put(f"{result.sha256}:{parser_version()}", result.text, result.parser, result.pages, parse_cache_max_bytes())
+    except Exception:
+        logger.exception("Parse cache write failed")
+
+
+def parse_pdf_cached(pdf_bytes: bytes) -> ParseResult:
+    """parse_pdf through the parse cache (identical bytes are parsed once). Records parse metrics."""
+    digest = content_sha256(pdf_bytes)
+    cached = _cached_parse(digest)
+    if cached is not None:
+        return cached
+    result = replace(parse_pdf(pdf_bytes), sha256=digest)
+    record_parse_metrics(result)
+    _remember_parse(result)
+    return result
+
+
+def extract_text_from_pdf(pdf_bytes: bytes) -> str:
+    """Extract text from PDF bytes (parse cache first). PARSER_MODE=adaptive (default) uses PyMuPDF and escalates
+    to Marker, when installed, only if the text looks poor (scanned, garbled, multi-column); marker prefers Marker
+    for every PDF, pymupdf never uses it."""
+    return parse_pdf_cached(pdf_bytes).text
+
+
+# --- Off-event-loop parsing -------------------------------------------------------------
+#
+# Two spawn pools: PARSER_WORKERS processes that only run PyMuPDF (milliseconds per PDF, no models),
+# and a single Marker process, so Marker's models are loaded once however many parse workers run.
+# Files that PyMuPDF extracts poorly (adaptive mode), or every file with PARSER_MODE=marker, go to it.
+
+
+class _ParsePool:
+    """A spawn process pool plus the pids its workers report when they start, so a pool with a stuck
+    worker (a timed-out task can't be cancelled) can be killed without touching the executor's internals."""
+
+    def __init__(self, workers: int, marker: bool) -> None:
+        context = multiprocessing.get_context("spawn")  # the API process runs threads (and maybe torch)
+        self._started = context.SimpleQueue()
+        self._pids: set[int] = set()
+        self.executor = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=context,
+            initializer=_pool_initializer,
+            initargs=(self._started, marker),
+        )
+
+    def kill(self) -> None:
+        self.executor.shutdown(wait=False, cancel_futures=True)
+        while not self._started.empty():
+            self._pids.add(self._started.get())
+        for pid in self._pids:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except (ProcessLookupError, PermissionError):
+                pass
+
+
+_parse_pools: dict[str, _ParsePool] = {}  # "pymupdf" | "marker"
+_parse_pool_lock = threading.Lock()
+
+
+def parser_workers() -> int:
+    """PARSER_WORKERS: PyMuPDF parse processes (default min(4, CPUs)). 0 parses in a thread of the API process
+    instead. Marker work always runs in one extra process."""
+    try:
+        return max(0, int(os.environ.get("PARSER_WORKERS") or min(4, os.cpu_count() or 1)))
+    except ValueError:
+        return min(4, os.cpu_count() or 1)
+
+
+def parser_timeout_s() -> float:
+    """PARSER_TIMEOUT_S: per-file parse timeout (default 120s)."""
+    try:
+        return max(1.0, float(os.environ.get("PARSER_TIMEOUT_S") or 120))
+    except ValueError:
+        return 120.0
+
+
+def _marker_installed() -> bool:
+    return importlib.util.find_spec("marker") is not None
+
+
+def _pool_initializer(started, marker: bool) -> None:
+    started.put(os.getpid())
+    if marker and (os.environ.get("PARSER_WARMUP") or "").strip().lower() in ("1", "true", "yes", "on"):
+        warm_up_parser()
+
+
+def _get_parse_pool(kind: str) -> _ParsePool:
+    with _parse_pool_lock:
+        pool = _parse_pools.get(kind)
+        if pool is None:
+            marker = kind == "marker"
+            pool = _parse_pools[kind] = _ParsePool(1 if marker else parser_workers(), marker)
+        return pool
+
+
+def _discard_parse_pool(kind: str, pool: _ParsePool) -> None:
+    """Kill a pool with a stuck or crashed worker; the next call starts a fresh one."""
+    with _parse_pool_lock:
+        if _parse_pools.get(kind) is pool:
+            del _parse_pools[kind]
+    pool.kill()
+
+
+def warm_up_parse_pool() -> None:
+    """Start the parse worker processes now, and the Marker process (which loads its models if PARSER_WARMUP=1)."""
+    if not parser_workers():
+        warm_up_parser()
+        return
+    kinds = ["pymupdf"] + (["marker"] if parser_mode() != "pymupdf" and _marker_installed() else [])
+    for kind in kinds:
+        pool = _get_parse_pool(kind)
+        workers = parser_workers() if kind == "pymupdf" else 1
+        try:
+            for future in [pool.executor.submit(time.sleep, 0) for _ in range(workers)]:
+                future.result()
+        except Exception:
+            logger.exception("Starting %s parse workers failed", kind)
+            _discard_parse_pool(kind, pool)
+
+
+def shutdown_parse_pool() -> None:
+    with _parse_pool_lock:
+        pools = list(_parse_pools.values())
+        _parse_pools.clear()
+    for pool in pools:
+        pool.executor.shutdown(wait=False, cancel_futures=True)
+
+
+async def parse_pdf_async(
+    source: PdfSource, timeout_s: Optional[float] = None, sha256: Optional[str] = None
+) -> ParseResult:
+    """
+    Parse off the event loop: in the parse process pool (or a thread when PARSER_WORKERS=0), with a
+    per-file timeout. Cached text for identical bytes is returned without parsing. Raises ParseTimeout,
+    or the parser's exception. Records parse metrics here. Pass sha256 if the caller already hashed the PDF.
+    A path source is read by the parser itself, so the API process never holds the file in memory.
+    """
+    timeout_s = timeout_s or parser_timeout_s()
+    if sha256:
+        digest = sha256
+    elif isinstance(source, (bytes, bytearray)):
+        digest = await asyncio.to_thread(content_sha256, source)
+    else:
+        digest = await asyncio.to_thread(file_sha256, source)
+    cached = await asyncio.to_thread(_cached_parse, digest)
+    if cached is not None:
+        return cached
+    if isinstance(source, Path):
+        source = str(source)
+    result = replace(await _parse_off_loop(source, timeout_s), sha256=digest)
+    record_parse_metrics(result)
+    await asyncio.to_thread(_remember_parse, result)
+    return result
+
+
+async def _parse_off_loop(source: PdfSource, timeout_s: float) -> ParseResult:
+    if not parser_workers():
+        try:
+            return await asyncio.wait_for(asyncio.to_thread(parse_pdf, source), timeout_s)
+        except asyncio.TimeoutError:
+            metrics.PARSE_SECONDS.observe(timeout_s, parser="thread", outcome="timeout")
+            raise ParseTimeout(f"Parsing took longer than {timeout_s:g}s.")
+    if parser_mode() == "marker" and _marker_installed():
+        return await _in_pool(parse_pdf, source, timeout_s=timeout_s, kind="marker")
+    started = time.monotonic()
+    if parser_workers() > 1 and parallel_min_pages():
+        pages = await asyncio.to_thread(_page_count, source)
+        if pages >= parallel_min_pages():
+            fast, issue = await _parse_page_ranges(source, pages, timeout_s)
+        else:
+            fast, issue = await _in_pool(_parse_fast, source, timeout_s=timeout_s)
+    else:
+        fast, issue = await _in_pool(_parse_fast, source, timeout_s=timeout_s)
+    if issue is None or not _marker_installed():
+        return fast
+    remaining = max(1.0, timeout_s - (time.monotonic() - started))
+    return await _in_pool(_escalate, source, fast, issue, timeout_s=remaining, kind="marker")
+
+
+def _parse_fast(source: PdfSource) -> tuple[Optional[ParseResult], Optional[str]]:
+    """parse_pdf's PyMuPDF stage, for the PyMuPDF pool (never loads Marker): the result and, in adaptive
+    mode, the quality issue that calls for Marker. (None, "pymupdf_error") if PyMuPDF can't open the
+    file but Marker is installed and might."""
+    if parser_mode() != "adaptive":
+        return _extract_with_pymupdf(source)[0], None
+    try:
+        return _extract_with_pymupdf(source, assess=True)
+    except Exception:
+        if fitz is None or not _marker_installed():
+            raise
+        return None, "pymupdf_error"
+
+
+def _page_count(source: PdfSource) -> int:
+    """Page count from the PDF's page tree (no page is parsed); 0 if it can't be opened (parse_pdf reports why)."""
+    try:
+        doc = _open_pdf(source)
+    except Exception:
+        return 0
+    try:
+        return doc.page_count
+    finally:
+        doc.close()
+
+
+async def _parse_page_ranges(
+    source: PdfSource, pages: int, timeout_s: float
+) -> tuple[ParseResult, Optional[str]]:
+    """PyMuPDF over a long PDF as page ranges on several pool workers at once. Returns the combined result
+    and, in adaptive mode, its quality issue (like _parse_fast)."""
+    started = time.perf_counter()
+    pages_read = min(pages, max_pages() or pages)
+    span = max(RANGE_MIN_PAGES, -(-pages_read // parser_workers()))
+    assess = parser_mode() == "adaptive"
+    tasks = [
+        asyncio.ensure_future(
+            _in_pool(_extract_page_range, source, start, min(start + span, pages_read), assess, timeout_s=timeout_s)
+        )
+        for start in range(0, pages_read, span)
+    ]
+    try:
+        chunks = await asyncio.gather(*tasks)
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        raise
+    parts = [part for chunk_parts, _ in chunks for part in chunk_parts]
+    rows = [n for _, chunk_rows in chunks for n in chunk_rows]
+    attempts = (("pymupdf", "ok", time.perf_counter() - started),)
+    return await asyncio.to_thread(_pymupdf_result, parts, rows, pages, pages_read, assess, attempts)
+
+
+async def _in_pool(fn: Callable[..., Any], *args: Any, timeout_s: float, kind: str = "pymupdf") -> Any:
+    """Run fn(*args) in a parse pool ("pymupdf" or "marker") with a timeout; a timed-out call's pool is
+    killed and replaced."""
+    for attempt in range(2):
+        pool = _get_parse_pool(kind)
+        future = pool.executor.submit(fn, *args)
+        try:
+            result = await asyncio.wait_for(asyncio.wrap_future(future), timeout_s)
+        except asyncio.TimeoutError:
+            metrics.PARSE_SECONDS.observe(timeout_s, parser="pool", outcome="timeout")
+            _discard_parse_pool(kind, pool)
+            raise ParseTimeout(f"Parsing took longer than {timeout_s:g}s.")
+        except BrokenProcessPool:
+            # Another file's timeout (or a crashed worker) killed the pool under us: retry once on a fresh one.
+            _discard_parse_pool(kind, pool)
+            if attempt:
+                raise
+            continue
+        return result
+    raise BrokenProcessPool("Parse pool unavailable.")
@@ -0,0 +1,230 @@
+"""
+Prompt compaction for resume text sent to the LLM.
+
+Marker output carries markdown tables, page numbers, doubled lines and long
+whitespace runs. compact_resume_text normalizes that noise, drops page furniture
+and consecutive duplicate lines, then fits the text into a token budget by section
+priority (experience first) instead of cutting it off at a fixed character offset.
+
+Run `python -m backend.prompt_compaction resume.txt [budget]` for a before/after token report.
+"""
+from __future__ import annotations
+
+import math
+import os
+import re
+import sys
+from dataclasses import dataclass, field
+
+from backend.scoring_engine import EXPERIENCE_SECTION_MARKERS
+
+try:
+    import tiktoken
+
+    _encoding = tiktoken.get_encoding("cl100k_base")
+except Exception:
+    _encoding = None
+
+DEFAULT_PROMPT_TOKEN_BUDGET = 3000
+
+# Section -> headings, matched against the whole line. Starts from the markers _extract_experience_section
+# uses for section boundaries, plus common variants; body lines that merely end in "education" are not headings.
+_SECTION_HEADINGS: dict[str, set[str]] = {
+    "experience": {*EXPERIENCE_SECTION_MARKERS, "relevant experience", "employment history", "work history"},
+    "education": {"education", "academic", "academic background", "education and training"},
+    "skills": {"skills", "technical skills", "key skills", "core skills", "skills and tools"},
+    "certifications": {"certifications", "certificates", "licenses and certifications"},
+    "projects": {"projects", "selected projects", "personal projects", "key projects"},
+    "summary": {"summary", "objective", "professional summary", "career objective", "profile"},
+    "references": {"references"},
+}
+
+# Lower index = kept first when the budget is tight. "header" is the text before the first heading (name, contact).
+SECTION_PRIORITY = ["header", "experience", "skills", "summary", "education", "certifications", "projects", "other", "references"]
+
+_PAGE_FURNITURE = re.compile(r"^(page\s*\d+(\s*(of|/)\s*\d+)?|\d+\s*(of|/)\s*\d+|-?\s*\d{1,3}\s*-?)$", re.IGNORECASE)
+_TABLE_SEPARATOR = re.compile(r"^\|?\s*:?-{3,}:?\s*(\|\s*:?-{3,}:?\s*)*\|?$")
+_MD_IMAGE = re.compile(r"!\[[^\]]*\]\([^)]*\)")
+_MD_EMPHASIS = re.compile(r"(\*\*|__)")
+
+
+@dataclass
+class CompactionResult:
+    text: str
+    tokens_before: int
+    tokens_after: int
+    token_budget: int
+    lines_dropped: int = 0
+    truncated_sections: list[str] = field(default_factory=list)
+    dropped_sections: list[str] = field(default_factory=list)
+
+    @property
+    def savings_ratio(self) -> float:
+        if self.tokens_before <= 0:
+            return 0.0
+        return 1 - self.tokens_after / self.tokens_before
+
+    def report(self) -> str:
+        parts = [
+            f"tokens {self.tokens_before} -> {self.tokens_after} ({self.savings_ratio:.0%} saved, budget {self.token_budget or 'none'})",
+            f"lines dropped {self.lines_dropped}",
+        ]
+        if self.truncated_sections:
+            parts.append(f"truncated {', '.join(self.truncated_sections)}")
+        if self.dropped_sections:
+            parts.append(f"dropped {', '.join(self.dropped_sections)}")
+        return "; ".join(parts)
+
+
+def estimate_tokens(text: str) -> int:
+    """Token count via tiktoken when installed, else the ~4 characters/token heuristic."""
+    if not text:
+        return 0
+    if _encoding is not None:
+        return len(_encoding.encode(text, disallowed_special=()))
+    return math.ceil(len(text) / 4)
+
+
+def get_prompt_token_budget() -> int:
+    """LLM_PROMPT_TOKEN_BUDGET for resume text in scoring prompts; 0 disables the budget (normalization still runs)."""
+    try:
+        return max(0, int(os.environ.get("LLM_PROMPT_TOKEN_BUDGET") or DEFAULT_PROMPT_TOKEN_BUDGET))
+    except ValueError:
+        return DEFAULT_PROMPT_TOKEN_BUDGET
+
+
+def compact_resume_text(text: str, token_budget: int | None = None) -> CompactionResult:
+    """Normalize, de-noise and fit resume text into token_budget (default: get_prompt_token_budget())."""
+    budget = get_prompt_token_budget() if token_budget is None else max(0, token_budget)
+    raw = text or ""
+    tokens_before = estimate_tokens(raw)
+    lines, dropped = _normalize_lines(raw)
+    result = CompactionResult(
+        text="",
+        tokens_before=tokens_before,
+        tokens_after=0,
+        token_budget=budget,
+        lines_dropped=dropped,
+    )
+    sections = _split_sections(lines)
+    if budget:
+        sections = _fit_to_budget(sections, budget, result)
+    result.text = "\n\n".join("\n".join(body) for _, body in sections if body).strip()
+    result.tokens_after = estimate_tokens(result.text)
+    return result
+
+
+def _normalize_lines(text: str) -> tuple[list[str], int]:
+    """Whitespace/markdown cleanup, page furniture removal and consecutive-duplicate collapse. Returns (lines, dropped count)."""
+    candidates: list[str] = []
+    for raw_line in text.replace("\r\n", "\n").replace("\r", "\n").split("\n"):
+        line = _MD_IMAGE.sub("", raw_line)
+        line = _MD_EMPHASIS.sub("", line)
+        stripped = line.strip()
+        if stripped.startswith("|") or stripped.endswith("|"):
+            if _TABLE_SEPARATOR.match(stripped):
+                continue
+            else:
+                cells = [c.strip() for c in stripped.strip("|").split("|")]
+                stripped = " | ".join(c for c in cells if c)
+        stripped = re.sub(r"^#{1,6}\s*", "", stripped)
+        stripped = re.sub(r"[ \t\u00a0]+", " ", stripped).strip()
+        candidates.append(stripped)
+
+    # Page numbers go; a line repeating the previous non-blank line (duplicated table cells, doubled extraction)
+    # collapses. Lines that repeat further apart stay: the same bullet or skill under two roles is content.
+    out: list[str] = []
+    previous = ""
+    dropped = 0
+    for line in candidates:
+        if not line:
+            if out and out[-1]:
+                out.append("")
+            continue
+        key = line.lower()
+        if key == previous or _PAGE_FURNITURE.match(line):
+            dropped += 1
+            continue
+        previous = key
+        out.append(line)
+    while out and not out[-1]:
+        out.pop()
+    return out, dropped
+
+
+def _heading_section(line: str) -> str | None:
+    """Section name if the whole line is a known section heading, else None."""
+    if not line or len(line) > 60:
+        return None
+    head = " ".join(line.lower().strip(" :-–—•*").replace("&", "and").split())
+    for section, headings in _SECTION_HEADINGS.items():
+        if head in headings:
+            return section
+    return None
+
+
+def _split_sections(lines: list[str]) -> list[tuple[str, list[str]]]:
+    sections: list[tuple[str, list[str]]] = [("header", [])]
+    for line in lines:
+        section = _heading_section(line)
+        if section is not None:
+            sections.append((section, [line]))
+        else:
+            sections[-1][1].append(line)
+    out: list[tuple[str, list[str]]] = []
+    for name, body in sections:
+        while body and not body[-1]:
+            body.pop()
+        while body and not body[0]:
+            body.pop(0)
+        if body:
+            out.append((name, body))
+    return out
+
+
+def _fit_to_budget(
+    sections: list[tuple[str, list[str]]],
+    budget: int,
+    result: CompactionResult,
+) -> list[tuple[str, list[str]]]:
+    """Keep sections by priority until the budget runs out; the first section that doesn't fit is cut at a line boundary."""
+    if sum(estimate_tokens("\n".join(body)) for _, body in sections) <= budget:
+        return sections
+
+    def priority(item: tuple[int, tuple[str, list[str]]]) -> tuple[int, int]:
+        index, (name, _) = item
+        rank = SECTION_PRIORITY.index(name) if name in SECTION_PRIORITY else SECTION_PRIORITY.index("other")
+        return rank, index
+
+    remaining = budget
+    kept: dict[int, list[str]] = {}
+    for index, (name, body) in sorted(enumerate(sections), key=priority):
+        cost = estimate_tokens("\n".join(body)) + 1
+        if cost <= remaining:
+            kept[index] = body
+            remaining -= cost
+            continue
+        partial: list[str] = []
+        for line in body:
+            line_cost = estimate_tokens(line) + 1
+            if line_cost > remaining:
+                break
+            partial.append(line)
+            remaining -= line_cost
+        if partial and len(partial) > 1:
+            kept[index] = partial + ["[... truncated ...]"]
+            result.truncated_sections.append(name)
+        else:
+            result.dropped_sections.append(name)
+    return [(name, kept[i]) for i, (name, _) in enumerate(sections) if i in kept]
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("usage: python -m backend.prompt_compaction <resume.txt> [token_budget]")
+        sys.exit(2)
+    with open(sys.argv[1], encoding="utf-8", errors="replace") as fh:
+        source = fh.read()
+    compacted = compact_resume_text(source, int(sys.argv[2]) if len(sys.argv) > 2 else None)
+    print(compacted.text)
+    print(f"\n--- {compacted.report()}", file=sys.stderr)
@@ -1,9 +1,12 @@
+import math
 from datetime import datetime
 from typing import Optional
 
-from fastapi import APIRouter, Query
+from fastapi import APIRouter, HTTPException, Query, Request, Response
 
 from backend import store
+from backend.etags import make_etag, not_modified
+from backend.llm_providers import estimate_cost_usd
 
 router = APIRouter(prefix="/analytics", tags=["analytics"])
 
@@ -16,10 +19,15 @@ def _in_month(dt: Optional[datetime], year: int, month: int) -> bool:
 
 @router.get("/overview")
 def get_analytics_overview(
+    request: Request,
+    response: Response,
     year: Optional[int] = Query(None, description="Filter by application received year"),
     month: Optional[int] = Query(None, ge=1, le=12, description="Filter by application received month (1-12)"),
 ):
     """Aggregate pipeline metrics. Optionally filter by date of application received (candidate created_at)."""
+    unchanged = not_modified(request, response, make_etag("overview", store.data_version()))
+    if unchanged is not None:
+        return unchanged
     jobs = store.list_calibrations()
     by_stage: dict[str, int] = {}
     by_requisition: list[dict] = []
@@ -50,3 +58,74 @@ def get_analytics_overview(
         "filter_year": year,
         "filter_month": month,
     }
+
+
+def _percentile(values: list[int], q: float) -> Optional[int]:
+    """Nearest-rank percentile."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(q * len(ordered)) - 1)]
+
+
+@router.get("/scoring-telemetry")
+def get_scoring_telemetry(
+    calibration_id: Optional[str] = Query(None, description="Calibration ID; defaults to active"),
+):
+    """LLM spend and latency for a calibration's last rescore (results of its current scoring generation).
+    Latency percentiles cover LLM-scored results only, overall and per model."""
+    calibration = store.get_calibration(calibration_id) if calibration_id else store.get_calibration()
+    if calibration is None:
+        raise HTTPException(status_code=404, detail="Calibration not found.")
+    generation = calibration.scoring_generation
+    latencies: list[int] = []
+    by_engine: dict[str, int] = {}
+    by_model: dict[str, dict] = {}
+    totals = {"prompt_tokens": 0, "completion_tokens": 0, "cached_tokens": 0, "cache_hits": 0, "retries": 0}
+    cost = 0.0
+    unpriced: set[str] = set()
+    scored = 0
+
+    for state in store.get_scoring_states(calibration.id).values():
+        telemetry = state.telemetry
+        if state.status != "completed" or telemetry is None or (state.generation or 0) != generation:
+            continue
+        scored += 1
+        by_engine[telemetry.engine] = by_engine.get(telemetry.engine, 0) + 1
+        totals["prompt_tokens"] += telemetry.prompt_tokens
+        totals["completion_tokens"] += telemetry.completion_tokens
+        totals["cached_tokens"] += telemetry.cached_tokens
+        totals["cache_hits"] += int(telemetry.cache_hit)
+        totals["retries"] += telemetry.retry_count
+        if telemetry.engine == "rule_based":
+            continue  # rule-based results (cascade tier, LLM fallback) take ~0 ms and would mask LLM latency
+        latencies.append(telemetry.latency_ms)
+        model = telemetry.model or telemetry.engine
+        entry = by_model.setdefault(model, {"calls": 0, "prompt_tokens": 0, "completion_tokens": 0, "latencies": []})
+        entry["calls"] += 1
+        entry["prompt_tokens"] += telemetry.prompt_tokens
+        entry["completion_tokens"] += telemetry.completion_tokens
+        entry["latencies"].append(telemetry.latency_ms)
+        call_cost = estimate_cost_usd(telemetry.model, telemetry.prompt_tokens, telemetry.completion_tokens)
+        if call_cost is None:
+            unpriced.add(model)
+        else:
+            cost += call_cost
+
+    models = []
+    for model, entry in sorted(by_model.items()):
+        lat = entry.pop("latencies")
+        models.append({"model": model, **entry, "latency_p50_ms": _percentile(lat, 0.5), "latency_p95_ms": _percentile(lat, 0.95)})
+    return {
+        "calibration_id": calibration.id,
+        "scoring_generation": generation,
+        "scored": scored,
+        "by_engine": by_engine,
+        **totals,
+        "total_tokens": totals["prompt_tokens"] + totals["completion_tokens"],
+        "latency_p50_ms": _percentile(latencies, 0.5),
+        "latency_p95_ms": _percentile(latencies, 0.95),
+        "estimated_cost_usd": round(cost, 6),
+        "unpriced_models": sorted(unpriced),
+        "by_model": models,
+    }
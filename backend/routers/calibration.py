@@ -2,12 +2,19 @@ import uuid
 from datetime import datetime
 from typing import Optional
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Request, Response
 from pydantic import BaseModel
 
-from backend.models import Calibration, CalibrationCreate
+from backend.models import Calibration, CalibrationCreate, CalibrationUpdateResult
 from backend import store
-from backend.scoring_tasks import queue_calibration_rescore
+from backend.etags import make_etag, not_modified
+from backend.scoring_tasks import (
+    QUEUE_FULL_RETRY_S,
+    ScoringQueueFull,
+    cancel_calibration_jobs,
+    check_queue_capacity,
+    schedule_calibration_rescore,
+)
 
 router = APIRouter()
 
@@ -44,19 +51,24 @@ def set_active(body: SetActiveBody) -> dict:
     return {"active": body.calibration_id}
 
 
-@router.patch("/calibration/{calibration_id}", response_model=Calibration)
-async def update_calibration(calibration_id: str, body: CalibrationCreate) -> Calibration:
+@router.patch("/calibration/{calibration_id}", response_model=CalibrationUpdateResult)
+async def update_calibration(calibration_id: str, body: CalibrationCreate) -> CalibrationUpdateResult:
     existing = store.get_calibration(calibration_id)
     if existing is None:
         raise HTTPException(status_code=404, detail="Calibration not found.")
-    cal = Calibration(
-        id=existing.id,
-        created_at=existing.created_at,
-        **body.model_dump(),
+    try:
+        check_queue_capacity(calibration_id)
+    except ScoringQueueFull as e:
+        # Refuse the edit rather than save criteria whose rescore can't be queued.
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": str(QUEUE_FULL_RETRY_S)})
+    # Partial update: fields the body leaves out (e.g. scoring_mode from an older editor) keep their values.
+    cal = existing.model_copy(
+        update={**body.model_dump(exclude_unset=True), "scoring_generation": existing.scoring_generation + 1}
     )
     store.set_calibration(cal)
-    queue_calibration_rescore(calibration_id)
-    return cal
+    # Debounced: a burst of saves from the editor collapses into one rescore after the last edit.
+    scheduled_at = schedule_calibration_rescore(calibration_id)
+    return CalibrationUpdateResult(**cal.model_dump(), rescore_scheduled_at=scheduled_at)
 
 
 @router.get("/calibration", response_model=Calibration)
@@ -68,12 +80,18 @@ def get_active_calibration() -> Calibration:
 
 
 @router.get("/calibrations", response_model=list[Calibration])
-def list_calibrations() -> list[Calibration]:
+def list_calibrations(request: Request, response: Response):
+    unchanged = not_modified(request, response, make_etag("calibrations", store.catalog_version()))
+    if unchanged is not None:
+        return unchanged
     return store.list_calibrations()
 
 
 @router.get("/templates", response_model=list[Calibration])
-def list_templates() -> list[Calibration]:
+def list_templates(request: Request, response: Response):
+    unchanged = not_modified(request, response, make_etag("templates", store.catalog_version()))
+    if unchanged is not None:
+        return unchanged
     return store.list_templates()
 
 
@@ -87,6 +105,7 @@ def create_from_template(body: CreateFromTemplateBody) -> Calibration:
     data = template.model_dump()
     data.pop("id", None)
     data.pop("created_at", None)
+    data.pop("scoring_generation", None)
     data["is_template"] = False
     data["requisition_name"] = body.requisition_name or template.requisition_name
     cal = Calibration(
@@ -106,6 +125,7 @@ def save_as_template(body: SaveAsTemplateBody) -> Calibration:
     data = cal.model_dump()
     data.pop("id", None)
     data.pop("created_at", None)
+    data.pop("scoring_generation", None)
     data["is_template"] = True
     data["requisition_name"] = body.template_name or f"Template: {cal.requisition_name}"
     template = Calibration(
@@ -129,4 +149,5 @@ def get_calibration_by_id(calibration_id: str) -> Calibration:
 def delete_calibration(calibration_id: str) -> dict:
     if not store.delete_calibration(calibration_id):
         raise HTTPException(status_code=404, detail="Calibration not found.")
+    cancel_calibration_jobs(calibration_id)
     return {"deleted": calibration_id}
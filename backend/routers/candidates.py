@@ -1,33 +1,191 @@
+import asyncio
+import logging
+import re
+import tempfile
 import uuid
 from datetime import datetime, timezone
-from typing import Optional
+from pathlib import Path
+from typing import Literal, Optional
 
-from fastapi import APIRouter, HTTPException, UploadFile, File, Query
+from fastapi import APIRouter, Header, HTTPException, Query, Request, Response
+from fastapi.responses import JSONResponse, StreamingResponse
+from fastapi.encoders import jsonable_encoder
 from pydantic import BaseModel
 
-from backend.models import CandidateProfile, CandidateResult, CandidateUpdate, RankedCandidateResult
-from backend import store
-from backend.parser import extract_text_from_pdf
+from backend.models import (
+    CandidateProfile,
+    CandidateResult,
+    CandidateUpdate,
+    RankedCandidateResult,
+    UploadDuplicate,
+    UploadResult,
+)
+from backend import events, evidence, export, store, views
+from backend.etags import make_etag, not_modified
+from backend.ingestion import get_ingestion_status, start_ingestion, start_zip_ingestion, wait_for_ingestion
+from backend.parser import parse_pdf_async
 from backend.llm_providers import chat_completion
-from backend.scoring_tasks import queue_candidate_scoring, queue_calibration_rescore
+from backend.prompt_compaction import compact_resume_text
+from backend.scoring_tasks import (
+    QUEUE_FULL_RETRY_S,
+    ScoringQueueFull,
+    check_queue_capacity,
+    defer_candidates_scoring,
+    queue_calibration_rescore,
+    queue_candidate_scoring,
+    queue_candidates_scoring,
+    queue_status,
+)
+from backend.uploads import UploadRejected, receive_files
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
 MAX_FILE_SIZE_BYTES = 15 * 1024 * 1024  # 15 MB per file
+SUMMARY_TOKEN_BUDGET = 2000  # resume tokens sent for the 1–2 sentence pipeline summary
+
+# The upload body is streamed by backend.uploads rather than parsed by FastAPI; document it by hand.
+_UPLOAD_OPENAPI = {
+    "requestBody": {
+        "required": True,
+        "content": {
+            "multipart/form-data": {
+                "schema": {
+                    "type": "object",
+                    "required": ["files"],
+                    "properties": {"files": {"type": "array", "items": {"type": "string", "format": "binary"}}},
+                }
+            }
+        },
+    }
+}
+_ZIP_UPLOAD_OPENAPI = {
+    "requestBody": {
+        "required": True,
+        "content": {
+            "multipart/form-data": {
+                "schema": {
+                    "type": "object",
+                    "required": ["file"],
+                    "properties": {"file": {"type": "string", "format": "binary"}},
+                }
+            }
+        },
+    }
+}
+
+
+def _list_etag(calibration_id: Optional[str], projection: views.Projection) -> str:
+    cid = calibration_id or store.active_calibration_id()
+    if cid is None:
+        return make_etag("none", store.catalog_version(), projection.key)
+    return make_etag(cid, store.data_version(cid), projection.key)
+
+
+_FIELDS_DESCRIPTION = (
+    "summary (default: id, name, stage, rating, ai_summary, created_at and, for rankings, scoring status/score/summary), "
+    "full (adds resume text and sub-metric evidence), or comma-separated field names"
+)
+
+
+def _projection(fields: Optional[str], ranked: bool) -> views.Projection:
+    try:
+        return views.parse_fields(fields, ranked)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
 
 @router.get("/candidates", response_model=list[CandidateResult])
 def list_candidates(
+    request: Request,
+    response: Response,
     calibration_id: Optional[str] = Query(None, description="Calibration ID; defaults to active"),
-) -> list[CandidateResult]:
-    return store.get_candidates(calibration_id)
+    fields: Optional[str] = Query(None, description=_FIELDS_DESCRIPTION),
+):
+    projection = _projection(fields, ranked=False)
+    etag = _list_etag(calibration_id, projection)
+    unchanged = not_modified(request, response, etag)
+    if unchanged is not None:
+        return unchanged
+    return views.json_response(request, views.candidates_view(calibration_id, projection), etag)
 
 
 @router.get("/candidate-rankings", response_model=list[RankedCandidateResult])
 def list_candidate_rankings(
+    request: Request,
+    response: Response,
     calibration_id: Optional[str] = Query(None, description="Calibration ID; defaults to active"),
-) -> list[RankedCandidateResult]:
-    return store.get_ranked_candidates(calibration_id)
+    fields: Optional[str] = Query(None, description=_FIELDS_DESCRIPTION),
+):
+    projection = _projection(fields, ranked=True)
+    etag = _list_etag(calibration_id, projection)
+    unchanged = not_modified(request, response, etag)
+    if unchanged is not None:
+        return unchanged
+    return views.json_response(request, views.rankings_view(calibration_id, projection), etag)
+
+
+@router.get("/calibrations/{calibration_id}/candidates/{candidate_id}", response_model=RankedCandidateResult)
+def get_candidate_detail(calibration_id: str, candidate_id: str, request: Request, response: Response):
+    """One candidate with everything: resume text, scoring state and sub-metric evidence (computed here if deferred)."""
+    if store.get_calibration(calibration_id) is None:
+        raise HTTPException(status_code=404, detail="Calibration not found.")
+    unchanged = not_modified(request, response, make_etag(candidate_id, store.data_version(calibration_id)))
+    if unchanged is not None:
+        return unchanged
+    candidate = store.get_ranked_candidate(calibration_id, candidate_id)
+    if candidate is None:
+        raise HTTPException(status_code=404, detail="Candidate not found.")
+    return evidence.with_evidence(calibration_id, candidate)
+
+
+@router.get("/calibrations/{calibration_id}/events")
+async def scoring_events(
+    calibration_id: str,
+    last_event_id: Optional[str] = Header(None),
+    since: Optional[str] = Query(None, description="Resume after this event id (for clients that can't set Last-Event-ID)"),
+) -> StreamingResponse:
+    """
+    Server-Sent Events with live scoring progress: a "scoring" event carries a JSON list of
+    {candidate_id, status, total_score, rank, previous_rank[, error]} deltas. Reconnects resume
+    from Last-Event-ID; a "reset" event means deltas were missed and the rankings should be re-fetched.
+    """
+    if store.get_calibration(calibration_id) is None:
+        raise HTTPException(status_code=404, detail="Calibration not found.")
+    return StreamingResponse(
+        events.stream(calibration_id, last_event_id or since),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.get("/calibrations/{calibration_id}/export")
+def export_candidates(
+    calibration_id: str,
+    format: Literal["ndjson", "csv"] = Query("csv", description="ndjson: one JSON object per line"),
+    columns: Optional[str] = Query(
+        None, description="Comma-separated columns, e.g. name,stage,total_score,skills_points,matched_skills"
+    ),
+) -> StreamingResponse:
+    """Stream the requisition's candidates in ranking order as CSV or NDJSON, row by row."""
+    cal = store.get_calibration(calibration_id)
+    if cal is None:
+        raise HTTPException(status_code=404, detail="Calibration not found.")
+    try:
+        selected = export.parse_columns(columns)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if format == "csv":
+        body, media_type = export.export_csv(cal.id, selected), "text/csv; charset=utf-8"
+    else:
+        body, media_type = export.export_ndjson(cal.id, selected), "application/x-ndjson"
+    slug = re.sub(r"[^A-Za-z0-9]+", "-", cal.requisition_name).strip("-").lower() or "requisition"
+    return StreamingResponse(
+        body,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{slug}-candidates.{format}"'},
+    )
 
 
 class RescoreBody(BaseModel):
@@ -45,53 +203,147 @@ async def rescore_candidate_rankings(body: RescoreBody) -> dict:
         candidate = store.get_candidate_profile(calibration.id, body.candidate_id)
         if candidate is None:
             raise HTTPException(status_code=404, detail="Candidate not found.")
-        queued = 1 if queue_candidate_scoring(calibration.id, body.candidate_id) else 0
-        return {"queued": queued, "calibration_id": calibration.id, "candidate_id": body.candidate_id}
+        try:
+            queued = 1 if queue_candidate_scoring(calibration.id, body.candidate_id) else 0
+        except ScoringQueueFull as e:
+            raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": str(QUEUE_FULL_RETRY_S)})
+        return {
+            "queued": queued,
+            "calibration_id": calibration.id,
+            "candidate_id": body.candidate_id,
+            **queue_status(calibration.id, body.candidate_id),
+        }
 
-    queued = queue_calibration_rescore(calibration.id)
-    return {"queued": queued, "calibration_id": calibration.id}
+    try:
+        queued = queue_calibration_rescore(calibration.id)
+    except ScoringQueueFull as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": str(QUEUE_FULL_RETRY_S)})
+    return {"queued": queued, "calibration_id": calibration.id, **queue_status(calibration.id)}
 
 
-@router.post("/upload", response_model=list[CandidateResult])
+@router.post("/upload", response_model=UploadResult, openapi_extra=_UPLOAD_OPENAPI)
 async def upload_resumes(
-    files: list[UploadFile] = File(...),
+    request: Request,
+    response: Response,
     calibration_id: Optional[str] = Query(None, description="Target calibration; defaults to active"),
-) -> list[CandidateResult]:
+    mode: Literal["sync", "async"] = Query(
+        "sync", description="async: spool the files and return 202 with an ingestion id; parsing runs in the background"
+    ),
+):
     cal = store.get_calibration(calibration_id) if calibration_id else store.get_calibration()
     if cal is None:
         raise HTTPException(
             status_code=404,
             detail="Calibration not found. It may have been deleted or the server restarted—refresh the page.",
         )
-    profiles: list[CandidateProfile] = []
-    for f in files:
-        if not f.filename or not f.filename.lower().endswith(".pdf"):
-            continue
+    if mode == "async":
+        try:
+            status = await start_ingestion(cal.id, request, MAX_FILE_SIZE_BYTES)
+        except UploadRejected as e:
+            raise HTTPException(status_code=e.status_code, detail=e.detail)
+        return JSONResponse(
+            status_code=202,
+            content=jsonable_encoder(status),
+            headers={"Location": f"/api/ingestions/{status['ingestion_id']}"},
+        )
+    # Files are streamed to a temp spool (never held in memory) and parsed from there.
+    with tempfile.TemporaryDirectory(prefix="recruitos-upload-") as spool:
         try:
-            content = await f.read()
-            if len(content) > MAX_FILE_SIZE_BYTES:
+            received = await receive_files(request, lambda index: Path(spool) / f"{index:05d}.pdf", MAX_FILE_SIZE_BYTES)
+        except UploadRejected as e:
+            raise HTTPException(status_code=e.status_code, detail=e.detail)
+        uploads = []
+        seen: set[str] = set()
+        repeated = []  # later copies of a file earlier in this batch
+        for upload in received:
+            if upload.error:
                 continue
-            text = extract_text_from_pdf(content)
-        except Exception:
+            if upload.sha256 in seen:
+                repeated.append(upload)
+                continue
+            seen.add(upload.sha256)
+            uploads.append(upload)
+        # Exact re-uploads of a resume already in this calibration are skipped (not parsed, added or scored).
+        existing = store.find_candidates_by_sha256(cal.id, list(seen))
+        duplicates = [
+            UploadDuplicate(filename=u.filename, candidate_id=existing[u.sha256]) for u in uploads if u.sha256 in existing
+        ]
+        uploads = [u for u in uploads if u.sha256 not in existing]
+        try:
+            check_queue_capacity(cal.id, len(uploads))
+        except ScoringQueueFull as e:
+            raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": str(QUEUE_FULL_RETRY_S)})
+        # Parse the whole batch concurrently off the event loop (process pool, per-file timeout).
+        parsed = await asyncio.gather(
+            *(parse_pdf_async(u.path, sha256=u.sha256) for u in uploads), return_exceptions=True
+        )
+    now = datetime.now(timezone.utc)
+    stages = getattr(cal, "pipeline_stages", None) or ["Applied"]
+    first_stage = stages[0] if stages else "Applied"
+    profiles: list[CandidateProfile] = []
+    for upload, result in zip(uploads, parsed):
+        if isinstance(result, BaseException):
+            logger.warning("Skipping %s: %s", upload.filename, str(result) or type(result).__name__)
             continue
-        name = _name_from_filename(f.filename)
-        now = datetime.now(timezone.utc)
-        stages = getattr(cal, "pipeline_stages", None) or ["Applied"]
-        first_stage = stages[0] if stages else "Applied"
         profiles.append(
             CandidateProfile(
                 id=str(uuid.uuid4()),
-                name=name,
-                parsed_text=text.strip() or "",
+                name=_name_from_filename(upload.filename),
+                parsed_text=result.text.strip() or "",
                 created_at=now,
-                source_filename=f.filename,
+                source_filename=upload.filename,
                 stage=first_stage,
+                content_sha256=upload.sha256,
+                parser=result.parser,
             )
         )
     store.add_candidates(cal.id, profiles)
-    for p in profiles:
-        queue_candidate_scoring(cal.id, p.id)
-    return store.get_candidates(cal.id)
+    try:
+        queue_candidates_scoring(cal.id, [p.id for p in profiles])
+    except ScoringQueueFull:
+        defer_candidates_scoring(cal.id)  # Filled up while parsing; queued as soon as there is room.
+    known = {**{p.content_sha256: p.id for p in profiles}, **existing}
+    duplicates += [UploadDuplicate(filename=u.filename, candidate_id=known.get(u.sha256)) for u in repeated]
+    response.headers["X-Duplicate-Files"] = str(len(duplicates))
+    return UploadResult(candidates=store.get_candidates(cal.id), duplicates=duplicates)
+
+
+@router.post("/upload-zip", openapi_extra=_ZIP_UPLOAD_OPENAPI)
+async def upload_resume_archive(
+    request: Request,
+    calibration_id: Optional[str] = Query(None, description="Target calibration; defaults to active"),
+    mode: Literal["sync", "async"] = Query(
+        "sync", description="async: return 202 with an ingestion id once the archive is unpacked"
+    ),
+):
+    """Ingest a ZIP of resumes. Each PDF entry is parsed, added and queued for scoring in batches;
+    the response is the ingestion status with one outcome per archive entry."""
+    cal = store.get_calibration(calibration_id) if calibration_id else store.get_calibration()
+    if cal is None:
+        raise HTTPException(
+            status_code=404,
+            detail="Calibration not found. It may have been deleted or the server restarted—refresh the page.",
+        )
+    try:
+        status = await start_zip_ingestion(cal.id, request, MAX_FILE_SIZE_BYTES)
+    except UploadRejected as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
+    if mode == "async":
+        return JSONResponse(
+            status_code=202,
+            content=jsonable_encoder(status),
+            headers={"Location": f"/api/ingestions/{status['ingestion_id']}"},
+        )
+    return await wait_for_ingestion(status["ingestion_id"])
+
+
+@router.get("/ingestions/{ingestion_id}")
+def get_ingestion(ingestion_id: str) -> dict:
+    """Progress of an async upload: state, counts by status, and per-file status/candidate id/scoring status."""
+    status = get_ingestion_status(ingestion_id)
+    if status is None:
+        raise HTTPException(status_code=404, detail="Ingestion not found.")
+    return status
 
 
 @router.patch("/calibrations/{calibration_id}/candidates/{candidate_id}", response_model=CandidateResult)
@@ -127,7 +379,7 @@ def summarize_candidate(calibration_id: str, candidate_id: str) -> CandidateResu
         "Write in third person. Be concise and factual."
     )
     try:
-        summary = chat_completion(system, text[:8000])
+        summary = chat_completion(system, compact_resume_text(text, SUMMARY_TOKEN_BUDGET).text)
         summary = (summary or "").strip() or "No summary generated."
     except ValueError as e:
         raise HTTPException(status_code=503, detail=str(e))
@@ -1,12 +1,16 @@
 from __future__ import annotations
 
+import math
+import os
 import re
+import time
 from collections import Counter
 from dataclasses import dataclass
-from typing import Iterable
+from typing import Iterable, Optional
 
-from backend.llm_providers import get_provider, score_resume_with_gemini, score_resume_with_openrouter
-from backend.models import RankingPayload, RankingSubMetric
+from backend.llm_providers import score_resume_with_llm
+from backend.metrics import SCORE_STAGE_SECONDS
+from backend.models import RankingPayload, RankingSubMetric, ScoringTelemetry
 
 
 @dataclass(frozen=True)
@@ -26,6 +30,12 @@ DEFAULT_METRICS: list[MetricSpec] = [
 ]
 
 
+def evidence_mode() -> str:
+    """SCORING_EVIDENCE: "eager" (rule-based scoring stores evidence snippets) or "lazy" (ratings and matched terms
+    only; the candidate detail endpoint computes evidence when it is opened)."""
+    return "lazy" if (os.environ.get("SCORING_EVIDENCE") or "").strip().lower() == "lazy" else "eager"
+
+
 def _get_metrics(calibration: dict) -> list[MetricSpec]:
     """Use calibration scoring weights if any are set; otherwise default metrics. Weights normalized to sum 100."""
     keys = ["skills", "titles", "work", "education", "experience", "context"]
@@ -66,17 +76,27 @@ def _get_metrics(calibration: dict) -> list[MetricSpec]:
 
 
 def score_resume(calibration: dict, resume_text: str) -> RankingPayload:
-    # When using Gemini or OpenRouter, score with full parsed resume (no truncation); fall back to rule-based on failure.
-    provider = get_provider()
+    # Score with the configured LLM provider chain (compacted resume); fall back to rule-based on failure.
     if (resume_text or "").strip():
-        if provider == "gemini":
-            payload = score_resume_with_gemini(calibration, resume_text)
-        elif provider == "openrouter":
-            payload = score_resume_with_openrouter(calibration, resume_text)
-        else:
-            payload = None
+        with SCORE_STAGE_SECONDS.time(stage="llm"):
+            payload = score_resume_with_llm(calibration, resume_text)
         if payload is not None:
             return payload
+    with SCORE_STAGE_SECONDS.time(stage="rule_based"):
+        return score_resume_rule_based(calibration, resume_text)
+
+
+def score_resume_rule_based(
+    calibration: dict, resume_text: str, with_evidence: Optional[bool] = None
+) -> RankingPayload:
+    """Deterministic retrieval scoring; no network calls. Used as the cheap first tier in cascade mode.
+
+    with_evidence: retrieve evidence snippets per metric (default: unless SCORING_EVIDENCE=lazy).
+    Ratings, points and matched terms do not depend on it.
+    """
+    if with_evidence is None:
+        with_evidence = evidence_mode() == "eager"
+    started = time.perf_counter()
     chunks = _chunk_text(resume_text)
     role = str(calibration.get("role") or "").strip()
     skills = _clean_terms(calibration.get("skills", []))
@@ -88,15 +108,17 @@ def score_resume(calibration: dict, resume_text: str) -> RankingPayload:
     ideal_text = str(calibration.get("ideal_candidate") or "")
     jd_text = str(calibration.get("job_description") or "")
 
-    matched_skills, skills_ev, skills_rating = _score_term_metric(chunks, skills, "skills")
-    matched_titles, titles_ev, title_rating = _score_term_metric(chunks, titles, "titles")
+    matched_skills, skills_ev, skills_rating = _score_term_metric(chunks, skills, "skills", with_evidence)
+    matched_titles, titles_ev, title_rating = _score_term_metric(chunks, titles, "titles", with_evidence)
     work_terms = companies + [t for t in industries if t.lower() not in {x.lower() for x in companies}]
-    matched_work, work_ev, work_rating = _score_term_metric(chunks, work_terms, "work")
-    matched_schools, school_ev, school_rating = _score_term_metric(chunks, schools, "schools")
-    matched_degrees, degree_ev, degree_rating = _score_term_metric(chunks, degrees, "degrees")
+    matched_work, work_ev, work_rating = _score_term_metric(chunks, work_terms, "work", with_evidence)
+    matched_schools, school_ev, school_rating = _score_term_metric(chunks, schools, "schools", with_evidence)
+    matched_degrees, degree_ev, degree_rating = _score_term_metric(chunks, degrees, "degrees", with_evidence)
     exp_years, exp_ev, exp_rating = _score_experience(chunks, calibration)
+    if not with_evidence:
+        exp_ev = []
     context_terms = _derive_context_terms(role, skills, jd_text, ideal_text)
-    _, context_ev, context_rating = _score_term_metric(chunks, context_terms, "context")
+    _, context_ev, context_rating = _score_term_metric(chunks, context_terms, "context", with_evidence)
 
     work_matches_companies = [t for t in matched_work if t.lower() in {x.lower() for x in companies}]
     work_matches_industries = [t for t in matched_work if t.lower() in {x.lower() for x in industries}]
@@ -161,9 +183,36 @@ def score_resume(calibration: dict, resume_text: str) -> RankingPayload:
         matched_schools=matched_schools,
         matched_degrees=matched_degrees,
         sub_metrics=sub_metrics,
+        telemetry=ScoringTelemetry(latency_ms=int((time.perf_counter() - started) * 1000)),
     )
 
 
+def rule_based_evidence(calibration: dict, resume_text: str) -> dict[str, list[str]]:
+    """Evidence snippets by metric key, as eager rule-based scoring would have stored them."""
+    payload = score_resume_rule_based(calibration, resume_text, with_evidence=True)
+    return {m.key: m.evidence for m in payload.sub_metrics}
+
+
+def cascade_shortlist(calibration: dict, rule_scores: dict[str, int]) -> list[str]:
+    """
+    Candidate ids promoted to LLM scoring in cascade mode, best first.
+    Applies top N and top X% (the tighter wins) and the score floor; defaults to the top 20%.
+    """
+    top_n = calibration.get("cascade_top_n")
+    top_percent = calibration.get("cascade_top_percent")
+    min_score = calibration.get("cascade_min_score")
+    if top_n is None and top_percent is None and min_score is None:
+        top_percent = 20
+    ranked = sorted(rule_scores.items(), key=lambda kv: (-kv[1], kv[0]))
+    limit = len(ranked)
+    if top_n is not None:
+        limit = min(limit, _to_int(top_n, limit))
+    if top_percent is not None:
+        limit = min(limit, math.ceil(len(ranked) * _to_int(top_percent, 100) / 100))
+    floor = _to_int(min_score, 0) if min_score is not None else None
+    return [cid for cid, score in ranked[:limit] if floor is None or score >= floor]
+
+
 def _clean_terms(values: Iterable[str]) -> list[str]:
     out: list[str] = []
     seen: set[str] = set()
@@ -241,13 +290,15 @@ def _tokenize(text: str) -> list[str]:
     return re.findall(r"[a-zA-Z0-9+#.-]+", (text or "").lower())
 
 
-def _score_term_metric(chunks: list[str], terms: list[str], key: str) -> tuple[list[str], list[str], int]:
+def _score_term_metric(
+    chunks: list[str], terms: list[str], key: str, with_evidence: bool = True
+) -> tuple[list[str], list[str], int]:
     if not terms:
         return [], [], 3
     matched = _matched_terms(chunks, terms)
     ratio = len(matched) / max(1, len(terms))
     rating = _ratio_to_rating(ratio)
-    evidence = _retrieve_evidence(chunks, matched or terms, key)
+    evidence = _retrieve_evidence(chunks, matched or terms, key) if with_evidence else []
     return matched, evidence, rating
 
 
@@ -289,6 +340,10 @@ def _retrieve_evidence(chunks: list[str], terms: list[str], key: str) -> list[st
     return snippets
 
 
+EXPERIENCE_SECTION_MARKERS = ["experience", "work experience", "employment", "professional experience", "career"]
+SECTION_END_MARKERS = ["education", "academic", "skills", "certifications", "projects", "summary", "objective", "references"]
+
+
 def _parse_month(s: str) -> int:
     """Return 1-12 for month name or number, else 0."""
     s = (s or "").strip()[:3].lower()
@@ -307,17 +362,15 @@ def _extract_experience_section(text: str) -> str | None:
     Extract the work experience section only (exclude education). Returns None if no clear section.
     """
     lower = text.lower()
-    start_markers = ["experience", "work experience", "employment", "professional experience", "career"]
-    end_markers = ["education", "academic", "skills", "certifications", "projects", "summary", "objective", "references"]
     start_idx = -1
-    for m in start_markers:
+    for m in EXPERIENCE_SECTION_MARKERS:
         i = lower.find(m)
         if i >= 0 and (start_idx < 0 or i < start_idx):
             start_idx = i
     if start_idx < 0:
         return None
     end_idx = len(text)
-    for m in end_markers:
+    for m in SECTION_END_MARKERS:
         i = lower.find(m, start_idx + 10)
         if i >= 0 and i < end_idx:
             end_idx = i
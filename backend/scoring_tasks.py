@@ -1,51 +1,589 @@
 from __future__ import annotations
 
 import asyncio
+import json
+import logging
+import os
+import time
+from datetime import datetime
+from typing import Any, Optional
 
-from backend import store
-from backend.scoring_engine import score_resume
+from backend import metrics, store
+from backend.job_queue import Job, JobQueue, JobStage, get_queue, max_attempts, visibility_timeout_s
+from backend.models import Calibration, CandidateProfile, RankingPayload
+from backend.scoring_engine import cascade_shortlist, score_resume, score_resume_rule_based
+
+# Lower value runs first. Fresh uploads and single-candidate rescores jump ahead of bulk rescores.
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BULK = 1
+
+# Pseudo candidate id for a calibration-wide cascade pass (rule-based tier for everyone, then the shortlist).
+CASCADE_JOB = "*"
 
 _active_jobs: set[tuple[str, str]] = set()
 
+logger = logging.getLogger(__name__)
+
+
+# Retry-After for 503s while the queue is full, and the delay before deferred scoring is retried.
+QUEUE_FULL_RETRY_S = 30
+
+
+class ScoringQueueFull(Exception):
+    """Raised when accepting more jobs would exceed SCORING_QUEUE_MAX (backpressure)."""
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return max(1, int(os.environ.get(name) or default))
+    except ValueError:
+        return default
+
+
+def scoring_worker_mode() -> str:
+    """SCORING_WORKER_MODE: "inline" (API process scores) or "external" (API only enqueues; run `python -m backend worker`)."""
+    return "external" if (os.environ.get("SCORING_WORKER_MODE") or "").strip().lower() == "external" else "inline"
+
+
+def rescore_debounce_s() -> float:
+    """SCORING_RESCORE_DEBOUNCE_S: quiet period after the last calibration edit before its rescore starts (0 = immediately)."""
+    try:
+        return max(0.0, float(os.environ.get("SCORING_RESCORE_DEBOUNCE_S") or 3))
+    except ValueError:
+        return 3.0
+
+
+def replica_reload_s() -> float:
+    """SCORING_REPLICA_RELOAD_S: how often a worker process re-reads the data file (default 5s), so applying
+    each result batch doesn't make every worker re-parse it per job. A job for a calibration generation or
+    candidate the worker's copy doesn't have yet reloads at once."""
+    try:
+        return max(0.0, float(os.environ.get("SCORING_REPLICA_RELOAD_S") or 5))
+    except ValueError:
+        return 5.0
+
+
+class _OutboxResults:
+    """
+    Result writer for worker processes: same calls as the store's scoring mutators, but published
+    to the job queue outbox for the API process to apply (it owns the data file). Staleness is
+    checked against the local read-only replica here and authoritatively when applied.
+    """
+
+    def __init__(self, queue: JobQueue) -> None:
+        self.queue = queue
+
+    def _stale(self, calibration_id: str, generation: Optional[int]) -> bool:
+        current = store.get_scoring_generation(calibration_id)
+        return current is None or (generation or 0) < current
+
+    def mark_candidate_scoring(self, calibration_id: str, candidate_id: str, generation: Optional[int] = None) -> bool:
+        if self._stale(calibration_id, generation):
+            return False
+        self.queue.publish_result(calibration_id, candidate_id, generation or 0, "processing")
+        return True
+
+    def set_candidate_score(
+        self, calibration_id: str, candidate_id: str, payload: RankingPayload, generation: Optional[int] = None
+    ) -> bool:
+        if self._stale(calibration_id, generation):
+            return False
+        self.queue.publish_result(calibration_id, candidate_id, generation or 0, "completed", payload.model_dump_json())
+        return True
+
+    def set_candidate_scores(
+        self, calibration_id: str, payloads: dict[str, RankingPayload], generation: Optional[int] = None
+    ) -> bool:
+        if self._stale(calibration_id, generation):
+            return False
+        values = {cid: payload.model_dump_json() for cid, payload in payloads.items()}
+        self.queue.publish_results(calibration_id, generation or 0, "completed", values)
+        return True
+
+    def mark_candidate_scoring_failed(
+        self, calibration_id: str, candidate_id: str, error: str, generation: Optional[int] = None
+    ) -> bool:
+        if self._stale(calibration_id, generation):
+            return False
+        self.queue.publish_result(calibration_id, candidate_id, generation or 0, "failed", error)
+        return True
+
+
+# Where scoring status/results go: the store itself in the API process, the outbox in `python -m backend worker`.
+_results: Any = store
+
+
+class _Scheduler:
+    """
+    Fixed pool of worker coroutines pulling from the durable job queue (backend.job_queue).
+    The queue orders by priority, then round-robin across calibrations, so one huge rescore
+    cannot starve another requisition. Workers also poll, so jobs whose lease expired
+    (e.g. after a restart) are picked up without a new enqueue.
+
+    In the API process the scheduler also applies results published by worker processes; with
+    SCORING_WORKER_MODE=external it runs no scoring workers of its own and only enqueues.
+    """
+
+    def __init__(self) -> None:
+        self.is_worker_process = False
+        self.worker_count_override: Optional[int] = None
+        self._result_applier: Optional[asyncio.Task] = None
+        self._workers: list[asyncio.Task] = []
+        self._wakeup: Optional[asyncio.Event] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._avg_job_s: Optional[float] = None
+        self._replica_loaded_at: Optional[float] = None
+        self._running: dict[tuple[str, str], tuple[int, asyncio.Task]] = {}
+        self._rescore_timer: Optional[asyncio.TimerHandle] = None
+
+    @property
+    def queue(self) -> JobQueue:
+        return get_queue()
+
+    @property
+    def worker_count(self) -> int:
+        return self.worker_count_override or _env_int("SCORING_WORKERS", 4)
+
+    @property
+    def runs_jobs(self) -> bool:
+        return self.is_worker_process or scoring_worker_mode() == "inline"
+
+    @property
+    def max_queued(self) -> int:
+        return _env_int("SCORING_QUEUE_MAX", 100_000)
+
+    @property
+    def poll_interval_s(self) -> float:
+        return float(_env_int("SCORING_POLL_INTERVAL_S", 2))
+
+    def check_capacity(self, count: int) -> None:
+        if self.queue.depth() + count > self.max_queued:
+            raise ScoringQueueFull(f"Scoring queue is full ({self.max_queued} jobs).")
+
+    def push_many(self, calibration_id: str, candidate_ids: list[str], priority: int, generation: int) -> int:
+        self.check_capacity(len(candidate_ids))
+        added = self.queue.push_many(calibration_id, candidate_ids, priority, generation)
+        self.cancel_stale(calibration_id, generation)
+        self.start()
+        return added
+
+    def cancel_stale(self, calibration_id: str, generation: int) -> int:
+        """Cancel this process's in-flight jobs for older generations of a calibration, freeing their workers.
+        A cancelled LLM call may still finish in its thread; its result is never written."""
+        cancelled = 0
+        for (cal_id, _), (job_generation, task) in list(self._running.items()):
+            if cal_id == calibration_id and job_generation < generation and not task.done():
+                task.cancel()
+                cancelled += 1
+        return cancelled
+
+    def arm_rescore_timer(self) -> None:
+        """(Re)arm a single timer for the earliest pending debounced rescore."""
+        if self._rescore_timer is not None:
+            self._rescore_timer.cancel()
+            self._rescore_timer = None
+        due_at = self.queue.next_rescore_due_at()
+        if due_at is not None:
+            delay = max(0.0, due_at - time.time())
+            self._rescore_timer = asyncio.get_running_loop().call_later(delay, fire_due_rescores)
+
+    def eta_seconds(self, jobs_ahead: int) -> Optional[float]:
+        if self._avg_job_s is None:
+            return None
+        running = len(_active_jobs)
+        return round((jobs_ahead + running) * self._avg_job_s / self.worker_count + self._avg_job_s, 1)
+
+    def _record_duration(self, seconds: float) -> None:
+        self._avg_job_s = seconds if self._avg_job_s is None else 0.2 * seconds + 0.8 * self._avg_job_s
+
+    def start(self) -> None:
+        """Ensure the worker pool (and, in the API process, the result applier) is running on the current loop; wake idle workers."""
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop = loop
+            self._workers = []
+            self._result_applier = None
+            self._wakeup = asyncio.Event()
+        if not self.is_worker_process and (self._result_applier is None or self._result_applier.done()):
+            self._result_applier = loop.create_task(self._apply_results())
+        self._workers = [w for w in self._workers if not w.done()]
+        while self.runs_jobs and len(self._workers) < self.worker_count:
+            self._workers.append(loop.create_task(self._worker()))
+        assert self._wakeup is not None
+        self._wakeup.set()
+
+    async def _worker(self) -> None:
+        assert self._wakeup is not None
+        while True:
+            job = await asyncio.to_thread(self.queue.claim)
+            if job is None:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval_s)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            if self.is_worker_process:
+                self.refresh_replica(job)
+            job_key = (job.calibration_id, job.candidate_id)
+            _active_jobs.add(job_key)
+            run = asyncio.get_running_loop().create_task(_run_job(job))
+            heartbeat = asyncio.get_running_loop().create_task(self._heartbeat(job, run))
+            self._running[job_key] = (job.generation, run)
+            started = time.perf_counter()
+            try:
+                await asyncio.wait({run})
+            finally:
+                heartbeat.cancel()
+                if self._running.get(job_key, (None, None))[1] is run:
+                    del self._running[job_key]
+                _active_jobs.discard(job_key)
+                self._record_duration(time.perf_counter() - started)
+                await asyncio.to_thread(self.queue.complete, job)
+
+    def refresh_replica(self, job: Job) -> None:
+        """Worker process: pick up calibrations/candidates the API wrote, at most every SCORING_REPLICA_RELOAD_S
+        unless this job needs data the local copy doesn't have yet."""
+        now = time.monotonic()
+        generation = store.get_scoring_generation(job.calibration_id)
+        behind = generation is None or generation < job.generation or (
+            job.candidate_id != CASCADE_JOB and store.get_candidate_profile(job.calibration_id, job.candidate_id) is None
+        )
+        if behind or self._replica_loaded_at is None or now - self._replica_loaded_at >= replica_reload_s():
+            store.reload_if_changed()
+            self._replica_loaded_at = now
+
+    async def _heartbeat(self, job: Job, run: asyncio.Task) -> None:
+        """Keep the lease alive while a long LLM call runs; stop the job if the lease was lost (e.g. superseded)."""
+        while True:
+            await asyncio.sleep(visibility_timeout_s() / 3)
+            if not await asyncio.to_thread(self.queue.extend_lease, job):
+                run.cancel()
+                return
+
+    async def _apply_results(self) -> None:
+        """API process: apply status/results published by worker processes, one store write per batch."""
+        while True:
+            try:
+                rows = await asyncio.to_thread(self.queue.fetch_results)
+                if rows:
+                    apply_worker_results(rows)
+                    await asyncio.to_thread(self.queue.delete_results, rows[-1][0])
+                    continue
+            except Exception:
+                logger.exception("Applying worker scoring results failed")
+            await asyncio.sleep(self.poll_interval_s)
 
-def queue_candidate_scoring(calibration_id: str, candidate_id: str) -> bool:
-    job_key = (calibration_id, candidate_id)
-    if job_key in _active_jobs:
-        return False
-    _active_jobs.add(job_key)
-    loop = asyncio.get_running_loop()
-    loop.create_task(_run_scoring(calibration_id, candidate_id))
-    return True
+
+_scheduler = _Scheduler()
+
+metrics.gauge("recruitos_scoring_in_flight", "Scoring jobs running in this process.", lambda: len(_active_jobs))
+metrics.gauge("recruitos_scoring_queue_depth", "Queued scoring jobs (shared queue).", lambda: _scheduler.queue.depth())
+metrics.gauge("recruitos_scoring_workers", "Scoring worker coroutines in this process.", lambda: len(_scheduler._workers))
+
+
+def queue_candidate_scoring(calibration_id: str, candidate_id: str, priority: int = PRIORITY_INTERACTIVE) -> bool:
+    """Queue one candidate for the calibration's current scoring generation.
+    Returns False if it is already queued or running for that generation. Raises ScoringQueueFull."""
+    generation = store.get_scoring_generation(calibration_id) or 0
+    return _scheduler.push_many(calibration_id, [candidate_id], priority, generation) > 0
+
+
+def queue_candidates_scoring(
+    calibration_id: str, candidate_ids: list[str], priority: int = PRIORITY_INTERACTIVE
+) -> int:
+    """Queue several new candidates in one transaction. Returns how many were queued. Raises ScoringQueueFull."""
+    generation = store.get_scoring_generation(calibration_id) or 0
+    return _scheduler.push_many(calibration_id, candidate_ids, priority, generation)
+
+
+def check_queue_capacity(calibration_id: str, new_candidates: int = 0) -> None:
+    """Raise ScoringQueueFull if the queue can't take new_candidates jobs, or (with 0) a rescore of the calibration.
+    API handlers call this before saving, so a full queue is a 503 rather than unscored candidates."""
+    if new_candidates:
+        _scheduler.check_capacity(new_candidates)
+        return
+    calibration = store.get_calibration(calibration_id)
+    _scheduler.check_capacity(1 if _is_cascade(calibration) else len(store.list_candidate_ids(calibration_id)))
+
+
+def defer_candidates_scoring(calibration_id: str) -> None:
+    """The queue was full when candidates were added: retry queueing the calibration's pending candidates that
+    have no job after QUEUE_FULL_RETRY_S (persisted, so it survives a restart) until they fit."""
+    _scheduler.queue.defer_scoring(calibration_id, time.time() + QUEUE_FULL_RETRY_S)
+    _scheduler.arm_rescore_timer()
+
+
+def _queue_orphaned(calibration_id: str, generation: int, known: set[tuple[str, str]], checked: bool) -> int:
+    """Queue the calibration's pending/processing candidates that have no job."""
+    if (calibration_id, CASCADE_JOB) in known:
+        return 0
+    orphaned = [
+        cid
+        for cid in store.list_candidate_ids_with_status(calibration_id, ("pending", "processing"))
+        if (calibration_id, cid) not in known
+    ]
+    if not orphaned:
+        return 0
+    if checked:
+        return _scheduler.push_many(calibration_id, orphaned, PRIORITY_BULK, generation)
+    return _scheduler.queue.push_many(calibration_id, orphaned, PRIORITY_BULK, generation)
 
 
 def queue_calibration_rescore(calibration_id: str) -> int:
-    queued = 0
-    for candidate_id in store.list_candidate_ids(calibration_id):
-        if queue_candidate_scoring(calibration_id, candidate_id):
-            queued += 1
-    return queued
+    """Queue every candidate for the current scoring generation now (superseding any debounced rescore).
+    Queued jobs from older generations are replaced and in-flight ones cancelled (or discarded at write
+    time if running elsewhere)."""
+    _scheduler.queue.clear_rescore_schedule(calibration_id)
+    calibration = store.get_calibration(calibration_id)
+    candidate_ids = store.list_candidate_ids(calibration_id)
+    generation = calibration.scoring_generation if calibration else 0
+    if _is_cascade(calibration):
+        _scheduler.push_many(calibration_id, [CASCADE_JOB], PRIORITY_BULK, generation)
+        return len(candidate_ids)
+    return _scheduler.push_many(calibration_id, candidate_ids, PRIORITY_BULK, generation)
+
+
+def schedule_calibration_rescore(calibration_id: str) -> datetime:
+    """
+    Debounced rescore after a calibration edit: each call pushes the calibration's rescore back to
+    now + SCORING_RESCORE_DEBOUNCE_S, so a burst of saves runs one rescore after the last one settles.
+    In-flight jobs for older generations are cancelled right away. Returns when the rescore is due (UTC).
+    The due time is persisted with the job queue, so a restart inside the window still rescores.
+    """
+    _scheduler.cancel_stale(calibration_id, store.get_scoring_generation(calibration_id) or 0)
+    debounce = rescore_debounce_s()
+    if not debounce:
+        try:
+            queue_calibration_rescore(calibration_id)
+            return datetime.utcnow()
+        except ScoringQueueFull:
+            debounce = QUEUE_FULL_RETRY_S  # filled up since the caller checked: retry like a debounced rescore
+    due_at = time.time() + debounce
+    _scheduler.queue.schedule_rescore(calibration_id, due_at)
+    _scheduler.arm_rescore_timer()
+    return datetime.utcfromtimestamp(due_at)
+
+
+def fire_due_rescores() -> int:
+    """Queue every debounced rescore whose window has passed, and retry deferred scoring that is due.
+    Returns how many calibrations were queued."""
+    queue = _scheduler.queue
+    fired = 0
+    for calibration_id in queue.pop_due_rescores():
+        if store.get_calibration(calibration_id) is None:
+            continue
+        try:
+            queue_calibration_rescore(calibration_id)
+            fired += 1
+        except ScoringQueueFull:
+            queue.schedule_rescore(calibration_id, time.time() + max(rescore_debounce_s(), 1.0))
+    due_deferred = queue.pop_due_deferred()
+    known = queue.job_keys() if due_deferred else set()
+    for calibration_id in due_deferred:
+        calibration = store.get_calibration(calibration_id)
+        if calibration is None:
+            continue
+        try:
+            _queue_orphaned(calibration_id, calibration.scoring_generation, known, checked=True)
+            fired += 1
+        except ScoringQueueFull:
+            queue.defer_scoring(calibration_id, time.time() + QUEUE_FULL_RETRY_S)
+    _scheduler.arm_rescore_timer()
+    return fired
+
+
+def cancel_calibration_jobs(calibration_id: str) -> None:
+    """Drop queued work for a deleted calibration."""
+    _scheduler.queue.delete_calibration(calibration_id)
+
+
+def recover_scoring_jobs() -> int:
+    """
+    Startup hook: release leases held by dead processes on this host, re-enqueue candidates left
+    "pending"/"processing" without a job (e.g. from before the queue was durable), start the workers
+    and fire (or re-arm) debounced rescores scheduled before the restart.
+    Returns the number of jobs re-enqueued.
+    """
+    queue = _scheduler.queue
+    queue.release_dead_leases()
+    known = queue.job_keys()
+    requeued = 0
+    for calibration in store.list_calibrations():
+        requeued += _queue_orphaned(calibration.id, calibration.scoring_generation, known, checked=False)
+    _scheduler.start()
+    fire_due_rescores()
+    return requeued
+
+
+def apply_worker_results(rows: list[tuple[int, str, str, int, str, Optional[str]]]) -> int:
+    updates: list[tuple[str, str, str, Optional[int], object]] = []
+    for _, calibration_id, candidate_id, generation, kind, value in rows:
+        if kind == "import":
+            _apply_import(calibration_id, generation, value or "{}")
+        elif kind == "completed":
+            try:
+                updates.append((kind, calibration_id, candidate_id, generation, RankingPayload.model_validate_json(value or "")))
+            except ValueError:
+                updates.append(("failed", calibration_id, candidate_id, generation, "Worker returned an invalid result."))
+        else:
+            updates.append((kind, calibration_id, candidate_id, generation, value))
+    return store.apply_scoring_updates(updates)
+
 
+def _apply_import(calibration_id: str, generation: int, value: str) -> None:
+    """Bulk import published by `python -m backend score-batch`: one store write; stale/unscored candidates are queued."""
+    data = json.loads(value)
+    profiles = [CandidateProfile.model_validate(p) for p in data.get("profiles") or []]
+    payloads = {cid: RankingPayload.model_validate(p) for cid, p in (data.get("payloads") or {}).items()}
+    added, unscored = store.import_candidates(calibration_id, profiles, payloads, generation)
+    if unscored:
+        current = store.get_scoring_generation(calibration_id) or 0
+        _scheduler.queue.push_many(calibration_id, unscored, PRIORITY_BULK, current)
+        _scheduler.start()
+    logger.info("Imported %d batch-scored candidates into %s (%d queued for scoring)", added, calibration_id, len(unscored))
 
-async def _run_scoring(calibration_id: str, candidate_id: str) -> None:
+
+def run_worker(concurrency: Optional[int] = None, metrics_port: Optional[int] = None) -> None:
+    """
+    `python -m backend worker`: score jobs from the shared queue until interrupted. Run as many as
+    needed on any host that shares the data dir; the API process applies their results.
+    """
+    global _results
+    store.open_read_only()
+    _results = _OutboxResults(_scheduler.queue)
+    _scheduler.is_worker_process = True
+    _scheduler.worker_count_override = concurrency
+    if metrics_port and metrics.is_enabled():
+        metrics.serve_in_background(metrics_port)
+
+    async def main() -> None:
+        released = await asyncio.to_thread(_scheduler.queue.release_dead_leases)
+        logger.info(
+            "Scoring worker %s started: %d concurrent jobs, %d dead leases released",
+            _scheduler.queue.path,
+            _scheduler.worker_count,
+            released,
+        )
+        _scheduler.start()
+        await asyncio.Event().wait()
+
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        pass
+
+
+def queue_status(calibration_id: str, candidate_id: Optional[str] = None) -> dict:
+    """Queue position and ETA for one candidate, or for the last queued job of a calibration."""
+    queue = _scheduler.queue
+    position = queue.position(calibration_id, candidate_id)
+    due_at = queue.rescore_due_at(calibration_id)
+    return {
+        "queue_position": position + 1 if position is not None else None,
+        "queue_depth": queue.depth(),
+        "in_flight": queue.running_count(),
+        "workers": _scheduler.worker_count,
+        "eta_seconds": _scheduler.eta_seconds(position) if position is not None else None,
+        "rescore_scheduled_at": datetime.utcfromtimestamp(due_at) if due_at is not None else None,
+    }
+
+
+async def _run_job(job: Job) -> None:
+    if _is_stale(job):
+        return  # Superseded by a newer calibration edit; the newer generation's job does the work.
+    if job.attempts > max_attempts():
+        # Poison job: it keeps dying mid-run (lease expired every time). Give up instead of looping forever.
+        if job.candidate_id != CASCADE_JOB:
+            _results.mark_candidate_scoring_failed(
+                job.calibration_id,
+                job.candidate_id,
+                f"Scoring abandoned after {job.attempts - 1} interrupted attempts.",
+                job.generation,
+            )
+        return
+    kind = "cascade" if job.candidate_id == CASCADE_JOB else "candidate"
+    with metrics.SCORING_JOB_SECONDS.time(kind=kind, outcome="cancelled") as labels:
+        if kind == "cascade":
+            labels["outcome"] = await _run_cascade(job.calibration_id, job.generation)
+        else:
+            labels["outcome"] = await _run_scoring(job.calibration_id, job.candidate_id, job.generation, job.stage)
+
+
+def _is_stale(job: Job) -> bool:
+    current = store.get_scoring_generation(job.calibration_id)
+    return current is not None and job.generation < current
+
+
+def _is_cascade(calibration: Calibration | None) -> bool:
+    return calibration is not None and calibration.scoring_mode == "cascade"
+
+
+async def _run_cascade(calibration_id: str, generation: int) -> str:
+    """Cascade rescore: rule-based pass over every candidate (one store write), then LLM for the shortlist.
+    Returns the outcome label for metrics."""
+    try:
+        calibration = store.get_calibration(calibration_id)
+        if calibration is None:
+            return "stale"
+        cal_dict = calibration.model_dump()
+        texts: dict[str, str] = {}
+        for candidate_id in store.list_candidate_ids(calibration_id):
+            profile = store.get_candidate_profile(calibration_id, candidate_id)
+            if profile is not None:
+                texts[candidate_id] = profile.parsed_text or ""
+        payloads = await asyncio.to_thread(
+            lambda: {cid: score_resume_rule_based(cal_dict, text) for cid, text in texts.items()}
+        )
+        if not _results.set_candidate_scores(calibration_id, payloads, generation):
+            return "stale"
+        shortlist = cascade_shortlist(cal_dict, {cid: p.total_score for cid, p in payloads.items()})
+        _scheduler.queue.push_many(calibration_id, shortlist, PRIORITY_BULK, generation, stage="llm")
+        _scheduler.start()
+        return "completed"
+    except Exception as exc:
+        for candidate_id in store.list_candidate_ids(calibration_id):
+            _results.mark_candidate_scoring_failed(calibration_id, candidate_id, str(exc), generation)
+        return "failed"
+
+
+async def _run_scoring(calibration_id: str, candidate_id: str, generation: int, stage: JobStage = "full") -> str:
+    """Score one candidate for `generation`. Returns the outcome label for metrics.
+
+    In cascade mode a "full" job runs the rule-based tier first and the LLM only if the candidate makes
+    the shortlist; an "llm" job was shortlisted by the cascade pass. The stage comes from the job, not
+    from this process's copy of the store, which in a worker process may not have the rule-based
+    results yet."""
     try:
         calibration = store.get_calibration(calibration_id)
         candidate = store.get_candidate_profile(calibration_id, candidate_id)
         if calibration is None or candidate is None:
-            store.mark_candidate_scoring_failed(
+            _results.mark_candidate_scoring_failed(
                 calibration_id,
                 candidate_id,
                 "Calibration or candidate no longer exists.",
+                generation,
             )
-            return
+            return "failed"
+        if calibration.scoring_generation != generation:
+            return "stale"
 
-        store.mark_candidate_scoring(calibration_id, candidate_id)
-        payload = await asyncio.to_thread(
-            score_resume,
-            calibration.model_dump(),
-            candidate.parsed_text or "",
-        )
-        store.set_candidate_score(calibration_id, candidate_id, payload)
+        _results.mark_candidate_scoring(calibration_id, candidate_id, generation)
+        cal_dict = calibration.model_dump()
+        resume_text = candidate.parsed_text or ""
+        if _is_cascade(calibration) and stage != "llm":
+            # Cascade mode: rule-based tier first, LLM only if it makes the shortlist.
+            payload = await asyncio.to_thread(score_resume_rule_based, cal_dict, resume_text)
+            if not _results.set_candidate_score(calibration_id, candidate_id, payload, generation):
+                return "stale"
+            rule_scores = {**store.get_rule_based_scores(calibration_id), candidate_id: payload.total_score}
+            if candidate_id not in cascade_shortlist(cal_dict, rule_scores):
+                return "completed"
+            _results.mark_candidate_scoring(calibration_id, candidate_id, generation)
+        payload = await asyncio.to_thread(score_resume, cal_dict, resume_text)
+        if not _results.set_candidate_score(calibration_id, candidate_id, payload, generation):
+            return "stale"
+        return "completed"
     except Exception as exc:
-        store.mark_candidate_scoring_failed(calibration_id, candidate_id, str(exc))
-    finally:
-        _active_jobs.discard((calibration_id, candidate_id))
+        _results.mark_candidate_scoring_failed(calibration_id, candidate_id, str(exc), generation)
+        return "failed"
@@ -1,11 +1,14 @@
 from __future__ import annotations
 
+import bisect
 import json
 import os
+import time
 from datetime import datetime
 from pathlib import Path
-from typing import Optional
+from typing import Callable, Iterator, Optional
 
+from backend import events, metrics
 from backend.models import (
     Calibration,
     CandidateProfile,
@@ -23,6 +26,49 @@ _active_calibration_id: Optional[str] = None
 _candidates_by_calibration: dict[str, list[CandidateProfile]] = {}
 _scores_by_calibration: dict[str, dict[str, CandidateScoringState]] = {}
 _loaded = False
+_loaded_mtime_ns: Optional[int] = None
+# Scoring worker processes hold a read-only replica; only the API process writes the data file.
+_read_only = False
+
+# Change tracking for conditional GETs (ETags): every write bumps the global version, and stamps the
+# calibrations it touched (their calibration, candidates and scores) with it. Process-local counters.
+_version = 0
+_calibration_versions: dict[str, int] = {}
+_catalog_version = 0  # calibration and template lists, active calibration
+_loaded_version = 0  # version of calibrations not written since the last load
+
+
+def get_data_dir() -> Path:
+    """Directory holding the JSON data file; sidecar files (job queue, caches) live next to it."""
+    return _DATA_DIR
+
+
+def _touch(calibration_id: Optional[str] = None, catalog: bool = False) -> None:
+    global _version, _catalog_version
+    _version += 1
+    if calibration_id:
+        _calibration_versions[calibration_id] = _version
+    if catalog:
+        _catalog_version = _version
+
+
+def data_version(calibration_id: Optional[str] = None) -> int:
+    """Increases whenever one calibration's data (or, without an id, any data) changes."""
+    _ensure_loaded()
+    if calibration_id is None:
+        return _version
+    return _calibration_versions.get(calibration_id, _loaded_version)
+
+
+def catalog_version() -> int:
+    """Increases whenever a calibration or template is created, edited or deleted, or the active one changes."""
+    _ensure_loaded()
+    return _catalog_version
+
+
+def active_calibration_id() -> Optional[str]:
+    _ensure_loaded()
+    return _active_calibration_id
 
 
 def _ensure_loaded() -> None:
@@ -33,14 +79,39 @@ def _ensure_loaded() -> None:
     _load_from_disk()
 
 
+def open_read_only() -> None:
+    """Use this process's store as a read-only replica (scoring workers); refresh it with reload_if_changed()."""
+    global _read_only
+    _read_only = True
+
+
+def reload_if_changed() -> bool:
+    """Re-read the data file if another process rewrote it since we last loaded it."""
+    _ensure_loaded()
+    try:
+        mtime_ns = _DATA_FILE.stat().st_mtime_ns
+    except OSError:
+        return False
+    if mtime_ns == _loaded_mtime_ns:
+        return False
+    _load_from_disk()
+    return True
+
+
 def _load_from_disk() -> None:
-    global _calibrations, _active_calibration_id, _candidates_by_calibration, _scores_by_calibration
+    global _calibrations, _active_calibration_id, _candidates_by_calibration, _scores_by_calibration, _loaded_mtime_ns
+    global _loaded_version
     if not _DATA_FILE.exists():
         return
     try:
+        mtime_ns = _DATA_FILE.stat().st_mtime_ns
         raw = json.loads(_DATA_FILE.read_text(encoding="utf-8"))
     except Exception:
         return
+    _loaded_mtime_ns = mtime_ns
+    _touch(catalog=True)
+    _calibration_versions.clear()
+    _loaded_version = _version
     calibrations_list = raw.get("calibrations") or []
     _calibrations = {}
     for c in calibrations_list:
@@ -78,6 +149,10 @@ def _load_from_disk() -> None:
 
 
 def _save_to_disk() -> None:
+    global _loaded_mtime_ns
+    if _read_only:
+        return
+    started = time.perf_counter()
     _DATA_DIR.mkdir(parents=True, exist_ok=True)
     payload = {
         "calibrations": [c.model_dump(mode="json") for c in _calibrations.values()],
@@ -91,7 +166,14 @@ def _save_to_disk() -> None:
             for cid, score_map in _scores_by_calibration.items()
         },
     }
-    _DATA_FILE.write_text(json.dumps(payload, indent=2), encoding="utf-8")
+    # Write-then-rename so worker processes re-reading the file never see a partial write.
+    tmp = _DATA_FILE.with_suffix(".json.tmp")
+    data = json.dumps(payload, indent=2).encode("utf-8")
+    tmp.write_bytes(data)
+    os.replace(tmp, _DATA_FILE)
+    _loaded_mtime_ns = _DATA_FILE.stat().st_mtime_ns
+    metrics.STORE_SAVE_BYTES.observe(len(data))
+    metrics.STORE_SAVE_SECONDS.observe(time.perf_counter() - started)
 
 
 def get_calibration(calibration_id: Optional[str] = None) -> Optional[Calibration]:
@@ -122,6 +204,7 @@ def set_calibration(cal: Calibration) -> None:
     _ensure_loaded()
     _calibrations[cal.id] = cal
     _active_calibration_id = cal.id
+    _touch(cal.id, catalog=True)
     _save_to_disk()
 
 
@@ -130,6 +213,7 @@ def set_active_calibration(calibration_id: str) -> bool:
     _ensure_loaded()
     if calibration_id in _calibrations:
         _active_calibration_id = calibration_id
+        _touch(catalog=True)
         _save_to_disk()
         return True
     return False
@@ -146,7 +230,9 @@ def delete_calibration(calibration_id: str) -> bool:
     if _active_calibration_id == calibration_id:
         remaining = list(_calibrations.keys())
         _active_calibration_id = remaining[0] if remaining else None
+    _touch(calibration_id, catalog=True)
     _save_to_disk()
+    events.forget(calibration_id)
     return True
 
 
@@ -198,16 +284,54 @@ def get_ranked_candidates(calibration_id: Optional[str] = None) -> list[RankedCa
             )
         )
     if dirty:
+        _touch(cid)
         _save_to_disk()
+    sort_key = _ranking_key(cid)
+    merged.sort(key=lambda c: sort_key(c.name, c.scoring))
+    return merged
+
+
+def get_ranked_candidate(calibration_id: str, candidate_id: str) -> Optional[RankedCandidateResult]:
+    """One candidate with its scoring state (detail view); read-only."""
+    _ensure_loaded()
+    profile = get_candidate_profile(calibration_id, candidate_id)
+    if profile is None:
+        return None
+    cal = _calibrations.get(calibration_id)
+    stages = getattr(cal, "pipeline_stages", None) if cal else None
+    scoring = (_scores_by_calibration.get(calibration_id) or {}).get(candidate_id)
+    return RankedCandidateResult(
+        **_profile_to_result(profile, stages[0] if stages else "Applied").model_dump(),
+        scoring=scoring or CandidateScoringState(status="pending", summary="Awaiting scoring."),
+    )
+
+
+def _ranking_key(calibration_id: str) -> Callable[[str, CandidateScoringState], tuple]:
+    """Sort key for the ranking order: completed first, then by score, then name."""
     status_rank = {"completed": 0, "processing": 1, "pending": 2, "failed": 3}
-    merged.sort(
-        key=lambda c: (
-            status_rank.get(c.scoring.status, 9),
-            -(c.scoring.total_score or -1),
-            c.name.lower(),
-        )
+    # In cascade mode the LLM-scored shortlist ranks ahead of rule-based-only candidates.
+    cascade = getattr(_calibrations.get(calibration_id), "scoring_mode", "standard") == "cascade"
+    tier_rank = {"llm": 0, "rule_based": 1}
+    return lambda name, scoring: (
+        status_rank.get(scoring.status, 9),
+        tier_rank.get(scoring.tier or "", 2) if cascade else 0,
+        -(scoring.total_score or -1),
+        name.lower(),
     )
-    return merged
+
+
+def iter_ranked_candidates(calibration_id: str) -> Iterator[tuple[CandidateProfile, CandidateScoringState]]:
+    """(profile, scoring state) in ranking order, one at a time (exports). Only the sort order is built up
+    front; rows are produced as the caller consumes them. Read-only, unlike get_ranked_candidates."""
+    _ensure_loaded()
+    profiles = list(_candidates_by_calibration.get(calibration_id) or [])
+    score_map = _scores_by_calibration.get(calibration_id) or {}
+    pending = CandidateScoringState(status="pending", summary="Awaiting scoring.")
+    sort_key = _ranking_key(calibration_id)
+    order = sorted(range(len(profiles)), key=lambda i: sort_key(profiles[i].name, score_map.get(profiles[i].id) or pending))
+    for i in order:
+        profile = profiles[i]
+        yield profile, score_map.get(profile.id) or pending
 
 
 def update_candidate(calibration_id: str, candidate_id: str, **kwargs: object) -> bool:
@@ -221,6 +345,7 @@ def update_candidate(calibration_id: str, candidate_id: str, **kwargs: object) -
             for key, value in kwargs.items():
                 if hasattr(p, key):
                     setattr(p, key, value)
+            _touch(calibration_id)
             _save_to_disk()
             return True
     return False
@@ -235,7 +360,44 @@ def add_candidates(calibration_id: str, profiles: list[CandidateProfile]) -> Non
     score_map = _scores_by_calibration.setdefault(calibration_id, {})
     for profile in profiles:
         score_map[profile.id] = CandidateScoringState(status="pending", summary="Queued for scoring.")
+    _touch(calibration_id)
+    _save_to_disk()
+    _publish_scoring(calibration_id, {p.id: None for p in profiles})
+
+
+def import_candidates(
+    calibration_id: str,
+    profiles: list[CandidateProfile],
+    payloads: dict[str, RankingPayload],
+    generation: Optional[int] = None,
+) -> tuple[int, list[str]]:
+    """
+    Bulk import (offline batch scoring): add profiles and their scores with a single write.
+    Profiles whose id is already present are skipped, so re-importing a checkpoint is safe.
+    Returns (candidates added, ids added without a current score, which still need scoring).
+    """
+    _ensure_loaded()
+    if calibration_id not in _calibrations:
+        return 0, []
+    existing = {p.id for p in _candidates_by_calibration.get(calibration_id, [])}
+    new_profiles = [p for p in profiles if p.id not in existing]
+    if not new_profiles:
+        return 0, []
+    _candidates_by_calibration.setdefault(calibration_id, []).extend(new_profiles)
+    score_map = _scores_by_calibration.setdefault(calibration_id, {})
+    stale = _is_stale(calibration_id, generation)
+    unscored: list[str] = []
+    for profile in new_profiles:
+        payload = payloads.get(profile.id)
+        if payload is None or stale:
+            score_map[profile.id] = CandidateScoringState(status="pending", summary="Queued for scoring.")
+            unscored.append(profile.id)
+        else:
+            score_map[profile.id] = _scored_state(None, payload, generation)
+    _touch(calibration_id)
     _save_to_disk()
+    _publish_scoring(calibration_id, {p.id: None for p in new_profiles})
+    return len(new_profiles), unscored
 
 
 def delete_candidate(calibration_id: str, candidate_id: str) -> bool:
@@ -248,9 +410,10 @@ def delete_candidate(calibration_id: str, candidate_id: str) -> bool:
         if p.id == candidate_id:
             profiles.pop(i)
             score_map = _scores_by_calibration.get(calibration_id)
-            if score_map:
-                score_map.pop(candidate_id, None)
+            previous = score_map.pop(candidate_id, None) if score_map else None
+            _touch(calibration_id)
             _save_to_disk()
+            _publish_scoring(calibration_id, {candidate_id: previous})
             return True
     return False
 
@@ -258,13 +421,19 @@ def delete_candidate(calibration_id: str, candidate_id: str) -> bool:
 def clear_candidates(calibration_id: Optional[str] = None) -> None:
     global _candidates_by_calibration, _scores_by_calibration
     _ensure_loaded()
+    ids = [calibration_id] if calibration_id else list(_calibrations)
+    cleared = {cid: _scores_by_calibration.get(cid) or {} for cid in ids}
     if calibration_id:
         _candidates_by_calibration.pop(calibration_id, None)
         _scores_by_calibration.pop(calibration_id, None)
     else:
         _candidates_by_calibration.clear()
         _scores_by_calibration.clear()
+    for cid in cleared:
+        _touch(cid)
     _save_to_disk()
+    for cid, score_map in cleared.items():
+        _publish_scoring(cid, dict(score_map))
 
 
 def get_candidate_profile(calibration_id: str, candidate_id: str) -> Optional[CandidateProfile]:
@@ -273,31 +442,146 @@ def get_candidate_profile(calibration_id: str, candidate_id: str) -> Optional[Ca
     return next((p for p in profiles if p.id == candidate_id), None)
 
 
+def find_candidates_by_sha256(calibration_id: str, digests: list[str]) -> dict[str, str]:
+    """Existing candidate id by PDF content hash, for the given hashes (exact duplicate uploads)."""
+    _ensure_loaded()
+    wanted = set(digests)
+    found: dict[str, str] = {}
+    for p in _candidates_by_calibration.get(calibration_id) or []:
+        if p.content_sha256 in wanted and p.content_sha256 not in found:
+            found[p.content_sha256] = p.id
+    return found
+
+
 def list_candidate_ids(calibration_id: str) -> list[str]:
     _ensure_loaded()
     profiles = _candidates_by_calibration.get(calibration_id) or []
     return [p.id for p in profiles]
 
 
-def mark_candidate_scoring(calibration_id: str, candidate_id: str) -> None:
+def list_candidate_ids_with_status(calibration_id: str, statuses: tuple[str, ...]) -> list[str]:
+    """Candidate ids whose scoring status is one of statuses (candidates never scored count as pending)."""
+    _ensure_loaded()
+    score_map = _scores_by_calibration.get(calibration_id) or {}
+    out: list[str] = []
+    for candidate_id in list_candidate_ids(calibration_id):
+        state = score_map.get(candidate_id)
+        if (state.status if state else "pending") in statuses:
+            out.append(candidate_id)
+    return out
+
+
+def get_scoring_generation(calibration_id: str) -> Optional[int]:
     _ensure_loaded()
+    cal = _calibrations.get(calibration_id)
+    return cal.scoring_generation if cal else None
+
+
+def _is_stale(calibration_id: str, generation: Optional[int]) -> bool:
+    """True if a result computed for `generation` must not be written (calibration changed or was deleted)."""
+    if generation is None:
+        return False
+    current = get_scoring_generation(calibration_id)
+    return current is None or generation < current
+
+
+def mark_candidate_scoring(calibration_id: str, candidate_id: str, generation: Optional[int] = None) -> bool:
+    _ensure_loaded()
+    if _is_stale(calibration_id, generation):
+        return False
+    previous = _set_status(calibration_id, candidate_id, "processing", None, "Scoring in progress.")
+    _touch(calibration_id)
+    _save_to_disk()
+    _publish_scoring(calibration_id, {candidate_id: previous})
+    return True
+
+
+def _set_status(
+    calibration_id: str, candidate_id: str, status: str, error: Optional[str], summary: str
+) -> Optional[CandidateScoringState]:
+    """Set a candidate's scoring status; returns the state it replaced."""
     score_map = _scores_by_calibration.setdefault(calibration_id, {})
-    current = score_map.get(candidate_id) or CandidateScoringState(status="pending")
+    previous = score_map.get(candidate_id)
+    current = previous or CandidateScoringState(status="pending")
     score_map[candidate_id] = current.model_copy(
         update={
-            "status": "processing",
-            "error": None,
-            "summary": "Scoring in progress.",
+            "status": status,
+            "error": error,
+            "summary": summary,
             "updated_at": datetime.utcnow(),
         }
     )
+    return previous
+
+
+def set_candidate_score(
+    calibration_id: str,
+    candidate_id: str,
+    payload: RankingPayload,
+    generation: Optional[int] = None,
+) -> bool:
+    """Store a result. Returns False (and writes nothing) if it was computed for an older scoring generation."""
+    _ensure_loaded()
+    if _is_stale(calibration_id, generation):
+        return False
+    score_map = _scores_by_calibration.setdefault(calibration_id, {})
+    previous = score_map.get(candidate_id)
+    score_map[candidate_id] = _scored_state(previous, payload, generation)
+    _touch(calibration_id)
     _save_to_disk()
+    _publish_scoring(calibration_id, {candidate_id: previous})
+    return True
 
 
-def set_candidate_score(calibration_id: str, candidate_id: str, payload: RankingPayload) -> None:
+def set_candidate_scores(
+    calibration_id: str,
+    payloads: dict[str, RankingPayload],
+    generation: Optional[int] = None,
+) -> bool:
+    """Store many scoring results with a single write (cascade rule-based pass)."""
     _ensure_loaded()
+    if _is_stale(calibration_id, generation):
+        return False
     score_map = _scores_by_calibration.setdefault(calibration_id, {})
-    score_map[candidate_id] = CandidateScoringState(
+    previous: dict[str, Optional[CandidateScoringState]] = {}
+    for candidate_id, payload in payloads.items():
+        previous[candidate_id] = score_map.get(candidate_id)
+        score_map[candidate_id] = _scored_state(previous[candidate_id], payload, generation)
+    _touch(calibration_id)
+    _save_to_disk()
+    _publish_scoring(calibration_id, previous)
+    return True
+
+
+def get_scoring_states(calibration_id: str) -> dict[str, CandidateScoringState]:
+    """Scoring state by candidate id (read-only view; unlike get_ranked_candidates, never writes)."""
+    _ensure_loaded()
+    return dict(_scores_by_calibration.get(calibration_id) or {})
+
+
+def get_rule_based_scores(calibration_id: str) -> dict[str, int]:
+    """Rule-based tier scores for the current scoring generation, by candidate id (cascade shortlist input)."""
+    _ensure_loaded()
+    current = get_scoring_generation(calibration_id) or 0
+    score_map = _scores_by_calibration.get(calibration_id) or {}
+    return {
+        cid: s.rule_based_score
+        for cid, s in score_map.items()
+        if s.rule_based_score is not None and (s.generation or 0) >= current
+    }
+
+
+def _scored_state(
+    previous: Optional[CandidateScoringState],
+    payload: RankingPayload,
+    generation: Optional[int],
+) -> CandidateScoringState:
+    if payload.engine == "rule_based":
+        tier, rule_based_score, llm_score = "rule_based", payload.total_score, None
+    else:
+        tier, llm_score = "llm", payload.total_score
+        rule_based_score = previous.rule_based_score if previous else None
+    return CandidateScoringState(
         status="completed",
         total_score=payload.total_score,
         experience_years=payload.experience_years,
@@ -311,20 +595,109 @@ def set_candidate_score(calibration_id: str, candidate_id: str, payload: Ranking
         sub_metrics=payload.sub_metrics,
         error=None,
         updated_at=datetime.utcnow(),
+        generation=generation,
+        tier=tier,
+        rule_based_score=rule_based_score,
+        llm_score=llm_score,
+        telemetry=payload.telemetry,
     )
+
+
+def mark_candidate_scoring_failed(
+    calibration_id: str,
+    candidate_id: str,
+    error: str,
+    generation: Optional[int] = None,
+) -> bool:
+    _ensure_loaded()
+    if _is_stale(calibration_id, generation) or calibration_id not in _calibrations:
+        return False
+    previous = _set_status(calibration_id, candidate_id, "failed", error or "Unknown scoring error.", "Scoring failed.")
+    _touch(calibration_id)
     _save_to_disk()
+    _publish_scoring(calibration_id, {candidate_id: previous})
+    return True
 
 
-def mark_candidate_scoring_failed(calibration_id: str, candidate_id: str, error: str) -> None:
+def apply_scoring_updates(updates: list[tuple[str, str, str, Optional[int], object]]) -> int:
+    """
+    Apply scoring updates published by worker processes with a single write. Each update is
+    (kind, calibration_id, candidate_id, generation, value): kind "processing", "completed"
+    (value: RankingPayload) or "failed" (value: error message). Stale updates are skipped.
+    Returns how many were applied.
+    """
     _ensure_loaded()
-    score_map = _scores_by_calibration.setdefault(calibration_id, {})
-    current = score_map.get(candidate_id) or CandidateScoringState(status="pending")
-    score_map[candidate_id] = current.model_copy(
-        update={
-            "status": "failed",
-            "error": error or "Unknown scoring error.",
-            "summary": "Scoring failed.",
-            "updated_at": datetime.utcnow(),
-        }
+    applied = 0
+    changed: dict[str, dict[str, Optional[CandidateScoringState]]] = {}
+    for kind, calibration_id, candidate_id, generation, value in updates:
+        if _is_stale(calibration_id, generation) or calibration_id not in _calibrations:
+            continue
+        score_map = _scores_by_calibration.setdefault(calibration_id, {})
+        previous = score_map.get(candidate_id)
+        if kind == "processing":
+            _set_status(calibration_id, candidate_id, "processing", None, "Scoring in progress.")
+        elif kind == "completed" and isinstance(value, RankingPayload):
+            score_map[candidate_id] = _scored_state(previous, value, generation)
+        elif kind == "failed":
+            _set_status(calibration_id, candidate_id, "failed", str(value or "Unknown scoring error."), "Scoring failed.")
+        else:
+            continue
+        changed.setdefault(calibration_id, {}).setdefault(candidate_id, previous)
+        applied += 1
+    if applied:
+        for calibration_id in changed:
+            _touch(calibration_id)
+        _save_to_disk()
+    for calibration_id, previous_states in changed.items():
+        _publish_scoring(calibration_id, previous_states)
+    return applied
+
+
+def _completed_keys(
+    calibration_id: str, states: dict[str, CandidateScoringState], names: dict[str, str]
+) -> dict[str, tuple]:
+    """_ranking_key of each completed candidate. Completed candidates lead the ranking, so a candidate's rank
+    among these keys is its position in a full refresh."""
+    sort_key = _ranking_key(calibration_id)
+    return {
+        cid: sort_key(names.get(cid, ""), s)
+        for cid, s in states.items()
+        if s.status == "completed" and s.total_score is not None
+    }
+
+
+def _rank(ordered: list[tuple], key: Optional[tuple]) -> Optional[int]:
+    """1-based rank of a sort key among completed candidates; ordered is their sorted keys."""
+    return None if key is None else bisect.bisect_left(ordered, key) + 1
+
+
+def _publish_scoring(calibration_id: str, previous: dict[str, Optional[CandidateScoringState]]) -> None:
+    """Push live-progress deltas (backend.events) for candidates whose scoring state a write just changed.
+    previous: each changed candidate's state before the write (None if it had none). Ranks follow the
+    ranking order (_ranking_key: in cascade mode the LLM tier first), so they match a full refresh."""
+    if not previous or not events.is_watched(calibration_id):
+        return
+    score_map = _scores_by_calibration.get(calibration_id) or {}
+    names = {p.id: p.name for p in _candidates_by_calibration.get(calibration_id) or []}
+    after = _completed_keys(calibration_id, score_map, names)
+    before = {cid: key for cid, key in after.items() if cid not in previous}
+    before.update(
+        _completed_keys(calibration_id, {cid: s for cid, s in previous.items() if s is not None}, names)
     )
-    _save_to_disk()
+    after_ranks = sorted(after.values())
+    before_ranks = sorted(before.values())
+    deltas = []
+    for candidate_id in previous:
+        state = score_map.get(candidate_id)
+        delta = {
+            "candidate_id": candidate_id,
+            "status": state.status if state else "deleted",
+            "total_score": state.total_score if state else None,
+            "tier": state.tier if state else None,
+            "rank": _rank(after_ranks, after.get(candidate_id)),
+            "previous_rank": _rank(before_ranks, before.get(candidate_id)),
+        }
+        if state is not None and state.status == "failed":
+            delta["error"] = state.error
+        deltas.append(delta)
+    events.publish(calibration_id, deltas)
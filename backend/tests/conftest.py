@@ -0,0 +1,5 @@
+"""Shared test setup: every test session gets its own data dir, so nothing touches backend/data."""
+import os
+import tempfile
+
+os.environ["RECRUITOS_DATA_DIR"] = tempfile.mkdtemp(prefix="recruitos-test-")
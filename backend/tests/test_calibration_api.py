@@ -0,0 +1,33 @@
+from fastapi.testclient import TestClient
+
+from backend.main import app
+
+CALIBRATION = {"requisition_name": "Backend", "role": "Engineer", "location": "Remote", "skills": ["python"]}
+
+
+def test_patch_without_scoring_mode_keeps_cascade_settings():
+    client = TestClient(app, base_url="http://localhost")
+    created = client.post(
+        "/api/calibration",
+        json={**CALIBRATION, "scoring_mode": "cascade", "cascade_top_n": 25, "pipeline_stages": ["New", "Hired"]},
+    ).json()
+    assert created["scoring_mode"] == "cascade"
+
+    response = client.patch(f"/api/calibration/{created['id']}", json={**CALIBRATION, "skills": ["python", "go"]})
+    assert response.status_code == 200
+    updated = response.json()
+    assert updated["skills"] == ["python", "go"]
+    assert updated["scoring_mode"] == "cascade"
+    assert updated["cascade_top_n"] == 25
+    assert updated["pipeline_stages"] == ["New", "Hired"]
+    assert updated["scoring_generation"] == created["scoring_generation"] + 1
+
+
+def test_patch_can_clear_fields_it_sends():
+    client = TestClient(app, base_url="http://localhost")
+    created = client.post("/api/calibration", json={**CALIBRATION, "job_description": "Build APIs"}).json()
+    updated = client.patch(
+        f"/api/calibration/{created['id']}", json={**CALIBRATION, "job_description": "", "scoring_mode": "standard"}
+    ).json()
+    assert updated["job_description"] == ""
+    assert updated["scoring_mode"] == "standard"
@@ -0,0 +1,96 @@
+import asyncio
+import uuid
+from datetime import datetime
+
+import pytest
+
+from backend import scoring_tasks, store
+from backend.job_queue import Job, JobQueue
+from backend.models import Calibration, CandidateProfile, RankingPayload
+
+
+def test_job_stage_round_trips_and_shortlisting_upgrades_queued_job(tmp_path):
+    queue = JobQueue(tmp_path / "jobs.sqlite3")
+    queue.push_many("cal", ["a", "b"], priority=1, generation=2)
+    queue.push_many("cal", ["a"], priority=1, generation=2, stage="llm")
+    jobs = {job.candidate_id: job for job in (queue.claim(), queue.claim())}
+    assert jobs["a"].stage == "llm"
+    assert jobs["b"].stage == "full"
+
+
+def test_newer_generation_resets_stage(tmp_path):
+    queue = JobQueue(tmp_path / "jobs.sqlite3")
+    queue.push_many("cal", ["a"], priority=1, generation=1, stage="llm")
+    queue.push_many("cal", ["a"], priority=1, generation=2)
+    job = queue.claim()
+    assert (job.generation, job.stage) == (2, "full")
+
+
+@pytest.fixture
+def cascade_candidate(monkeypatch):
+    calibration = Calibration(
+        id=str(uuid.uuid4()),
+        created_at=datetime.utcnow(),
+        requisition_name="Cascade",
+        role="Engineer",
+        location="Remote",
+        skills=["python"],
+        scoring_mode="cascade",
+        cascade_top_n=1,
+    )
+    store.set_calibration(calibration)
+    candidate = CandidateProfile(id="c1", name="C", parsed_text="Python engineer", created_at=datetime.utcnow())
+    store.add_candidates(calibration.id, [candidate])
+    calls: list[str] = []
+
+    def rule_based(cal, text):
+        calls.append("rule_based")
+        return RankingPayload(total_score=40)
+
+    def llm(cal, text):
+        calls.append("llm")
+        return RankingPayload(total_score=80, engine="openai")
+
+    monkeypatch.setattr(scoring_tasks, "score_resume_rule_based", rule_based)
+    monkeypatch.setattr(scoring_tasks, "score_resume", llm)
+    return calibration, calls
+
+
+def test_llm_stage_job_skips_rule_based_even_without_local_rule_score(cascade_candidate):
+    calibration, calls = cascade_candidate
+    # A worker's copy of the store may not have the cascade pass's rule-based results yet.
+    assert "c1" not in store.get_rule_based_scores(calibration.id)
+    outcome = asyncio.run(scoring_tasks._run_scoring(calibration.id, "c1", calibration.scoring_generation, "llm"))
+    assert outcome == "completed"
+    assert calls == ["llm"]
+
+
+def test_full_stage_job_runs_rule_based_tier_first(cascade_candidate):
+    calibration, calls = cascade_candidate
+    outcome = asyncio.run(scoring_tasks._run_scoring(calibration.id, "c1", calibration.scoring_generation, "full"))
+    assert outcome == "completed"
+    assert calls == ["rule_based", "llm"]  # top_n=1: the only candidate makes the shortlist
+
+
+def test_worker_replica_reloads_are_throttled_unless_the_job_needs_newer_data(monkeypatch):
+    calibration = Calibration(
+        id=str(uuid.uuid4()), created_at=datetime.utcnow(), requisition_name="R", role="Engineer", location="Remote"
+    )
+    store.set_calibration(calibration)
+    store.add_candidates(calibration.id, [CandidateProfile(id="known", name="K", parsed_text="", created_at=datetime.utcnow())])
+    reloads = []
+    monkeypatch.setattr(store, "reload_if_changed", lambda: reloads.append(1) or False)
+    monkeypatch.setenv("SCORING_REPLICA_RELOAD_S", "3600")
+    scheduler = scoring_tasks._Scheduler()
+    generation = calibration.scoring_generation
+
+    def job(candidate_id, job_generation=generation):
+        return Job(calibration.id, candidate_id, 1, 0, "w", job_generation)
+
+    scheduler.refresh_replica(job("known"))  # first job always loads
+    scheduler.refresh_replica(job("known"))
+    scheduler.refresh_replica(job(scoring_tasks.CASCADE_JOB))
+    assert len(reloads) == 1
+    scheduler.refresh_replica(job("uploaded-since"))
+    scheduler.refresh_replica(job("known", generation + 1))
+    assert len(reloads) == 3
@@ -0,0 +1,59 @@
+import uuid
+from datetime import datetime
+
+from fastapi.testclient import TestClient
+
+from backend import store
+from backend.main import app
+from backend.models import Calibration, CandidateProfile
+from backend.scoring_engine import score_resume_rule_based
+
+RESUME = """Jane Doe
+Experience
+Senior Backend Engineer at Acme Corp, 2018 - 2024
+Built Python and Go services on Kubernetes for the payments industry.
+Education
+BSc Computer Science, State University
+"""
+
+
+def _scored_calibration(monkeypatch, mode: str) -> str:
+    monkeypatch.setenv("SCORING_EVIDENCE", mode)
+    calibration = Calibration(
+        id=str(uuid.uuid4()),
+        created_at=datetime.utcnow(),
+        requisition_name="Backend",
+        role="Backend Engineer",
+        location="Remote",
+        skills=["python", "go", "kubernetes"],
+        job_titles=["Backend Engineer"],
+        companies=["Acme"],
+        industries=["payments"],
+    )
+    store.set_calibration(calibration)
+    store.add_candidates(
+        calibration.id, [CandidateProfile(id="jane", name="Jane Doe", parsed_text=RESUME, created_at=datetime.utcnow())]
+    )
+    payload = score_resume_rule_based(calibration.model_dump(), RESUME)
+    store.set_candidate_scores(calibration.id, {"jane": payload}, calibration.scoring_generation)
+    return calibration.id
+
+
+def _evidence(client: TestClient, calibration_id: str) -> tuple[dict, dict]:
+    detail = client.get(f"/api/calibrations/{calibration_id}/candidates/jane").json()
+    ranking = client.get("/api/candidate-rankings", params={"calibration_id": calibration_id, "fields": "full"}).json()
+    by_key = lambda metrics: {m["key"]: m["evidence"] for m in metrics}
+    return by_key(detail["scoring"]["sub_metrics"]), by_key(ranking[0]["scoring"]["sub_metrics"])
+
+
+def test_lazy_evidence_matches_eager_in_detail_and_full_rankings(monkeypatch):
+    client = TestClient(app, base_url="http://localhost")
+    eager_detail, eager_ranking = _evidence(client, _scored_calibration(monkeypatch, "eager"))
+    lazy_id = _scored_calibration(monkeypatch, "lazy")
+    stored = store.get_ranked_candidate(lazy_id, "jane").scoring.sub_metrics
+    assert not any(m.evidence for m in stored)
+
+    lazy_detail, lazy_ranking = _evidence(client, lazy_id)
+    assert any(eager_detail.values())
+    assert lazy_detail == eager_detail
+    assert lazy_ranking == eager_ranking == eager_detail
@@ -0,0 +1,39 @@
+from fastapi.testclient import TestClient
+
+from backend.main import app
+
+CALIBRATION = {"requisition_name": "Backend", "role": "Engineer", "location": "Remote", "skills": ["python"]}
+
+
+def test_list_etags_are_single_quoted_and_revalidate():
+    client = TestClient(app, base_url="http://localhost")
+    cid = client.post("/api/calibration", json=CALIBRATION).json()["id"]
+    for path in ("/api/candidates", "/api/candidate-rankings"):
+        response = client.get(path, params={"calibration_id": cid, "fields": "full"})
+        assert response.status_code == 200
+        etag = response.headers["etag"]
+        assert etag.startswith('W/"') and etag.endswith('"')
+        assert etag[3:-1].count('"') == 0
+        assert etag.endswith('-full"')
+
+        again = client.get(path, params={"calibration_id": cid, "fields": "full"}, headers={"If-None-Match": etag})
+        assert again.status_code == 304
+        other = client.get(path, params={"calibration_id": cid}, headers={"If-None-Match": etag})
+        assert other.status_code == 200
+
+
+def test_custom_projection_etag_revalidates():
+    client = TestClient(app, base_url="http://localhost")
+    cid = client.post("/api/calibration", json=CALIBRATION).json()["id"]
+    params = {"calibration_id": cid, "fields": "id, name,scoring.total_score"}
+    response = client.get("/api/candidate-rankings", params=params)
+    assert response.status_code == 200
+    etag = response.headers["etag"]
+    assert etag[3:-1].count('"') == 0 and "," not in etag and " " not in etag
+
+    again = client.get("/api/candidate-rankings", params=params, headers={"If-None-Match": etag})
+    assert again.status_code == 304
+    reordered = {**params, "fields": "scoring.total_score,name,id"}
+    assert client.get("/api/candidate-rankings", params=reordered, headers={"If-None-Match": etag}).status_code == 304
+    other = {**params, "fields": "id,name"}
+    assert client.get("/api/candidate-rankings", params=other, headers={"If-None-Match": etag}).status_code == 200
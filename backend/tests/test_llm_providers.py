@@ -0,0 +1,114 @@
+import time
+
+import pytest
+
+from backend import llm_providers
+from backend.models import RankingPayload
+
+CALIBRATION = {"role": "Engineer", "skills": ["python"]}
+RESUME = "Python engineer with 5 years of experience."
+
+
+@pytest.fixture
+def fake_scorers(monkeypatch):
+    """Replace the real provider scorers with fakes; `calls` records which providers were asked."""
+    for name in ("LLM_PROVIDER", "LLM_HEDGE", "OPENAI_API_KEY", "OPENROUTER_API_KEY", "GEMINI_API_KEY", "GOOGLE_API_KEY"):
+        monkeypatch.delenv(name, raising=False)
+    calls: list[str] = []
+    cancelled: list[str] = []
+
+    def install(**behaviours):
+        for provider, behaviour in behaviours.items():
+            def scorer(prompt, handle, provider=provider, behaviour=behaviour):
+                calls.append(provider)
+                handle.on_cancel(lambda: cancelled.append(provider))
+                return behaviour(handle)
+
+            monkeypatch.setitem(llm_providers._SCORERS, provider, scorer)
+        return calls, cancelled
+
+    return install
+
+
+def _ok(score):
+    return lambda handle: RankingPayload(total_score=score, summary="fake")
+
+
+def _fail(handle):
+    raise RuntimeError("provider down")
+
+
+def _slow(handle):
+    handle.cancelled.wait(5)
+    return None if handle.cancelled.is_set() else RankingPayload(total_score=1)
+
+
+def test_unset_provider_scores_rule_based_even_with_key(fake_scorers, monkeypatch):
+    calls, _ = fake_scorers(openai=_ok(90))
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+    assert llm_providers.get_scoring_chain() == []
+    assert llm_providers.score_resume_with_llm(CALIBRATION, RESUME) is None
+    assert calls == []
+
+
+def test_failover_to_next_provider(fake_scorers, monkeypatch):
+    calls, _ = fake_scorers(openrouter=_fail, gemini=_ok(77))
+    monkeypatch.setenv("LLM_PROVIDER", "openrouter,gemini")
+    monkeypatch.setenv("OPENROUTER_API_KEY", "k")
+    monkeypatch.setenv("GEMINI_API_KEY", "k")
+    payload = llm_providers.score_resume_with_llm(CALIBRATION, RESUME)
+    assert calls == ["openrouter", "gemini"]
+    assert payload.total_score == 77
+    assert payload.engine == "gemini"
+    assert payload.telemetry.retry_count == 1
+
+
+def test_providers_without_keys_are_skipped(fake_scorers, monkeypatch):
+    calls, _ = fake_scorers(openrouter=_ok(10), gemini=_ok(20))
+    monkeypatch.setenv("LLM_PROVIDER", "openrouter,gemini")
+    monkeypatch.setenv("GEMINI_API_KEY", "k")
+    assert llm_providers.score_resume_with_llm(CALIBRATION, RESUME).engine == "gemini"
+    assert calls == ["gemini"]
+
+
+def test_all_providers_fail_returns_none(fake_scorers, monkeypatch):
+    fake_scorers(openrouter=_fail, gemini=_fail)
+    monkeypatch.setenv("LLM_PROVIDER", "openrouter,gemini")
+    monkeypatch.setenv("OPENROUTER_API_KEY", "k")
+    monkeypatch.setenv("GEMINI_API_KEY", "k")
+    assert llm_providers.score_resume_with_llm(CALIBRATION, RESUME) is None
+
+
+def test_hedged_request_wins_and_cancels_slow_primary(fake_scorers, monkeypatch):
+    calls, cancelled = fake_scorers(openrouter=_slow, gemini=_ok(55))
+    monkeypatch.setenv("LLM_PROVIDER", "openrouter,gemini")
+    monkeypatch.setenv("OPENROUTER_API_KEY", "k")
+    monkeypatch.setenv("GEMINI_API_KEY", "k")
+    monkeypatch.setenv("LLM_HEDGE", "1")
+    monkeypatch.setenv("LLM_HEDGE_DELAY_S", "0.05")
+    monkeypatch.setitem(llm_providers._latency, "openrouter", llm_providers.ProviderLatency())
+    started = time.perf_counter()
+    payload = llm_providers.score_resume_with_llm(CALIBRATION, RESUME)
+    assert time.perf_counter() - started < 2
+    assert payload.engine == "gemini" and payload.total_score == 55
+    assert calls == ["openrouter", "gemini"]
+    assert cancelled == ["openrouter"]
+
+
+def test_hedge_not_sent_when_primary_is_fast(fake_scorers, monkeypatch):
+    calls, _ = fake_scorers(openrouter=_ok(60), gemini=_ok(5))
+    monkeypatch.setenv("LLM_PROVIDER", "openrouter,gemini")
+    monkeypatch.setenv("OPENROUTER_API_KEY", "k")
+    monkeypatch.setenv("GEMINI_API_KEY", "k")
+    monkeypatch.setenv("LLM_HEDGE", "1")
+    monkeypatch.setenv("LLM_HEDGE_DELAY_S", "2")
+    monkeypatch.setitem(llm_providers._latency, "openrouter", llm_providers.ProviderLatency())
+    assert llm_providers.score_resume_with_llm(CALIBRATION, RESUME).engine == "openrouter"
+    assert calls == ["openrouter"]
+
+
+def test_cancelled_gemini_call_is_not_sent(monkeypatch):
+    handle = llm_providers._CallHandle()
+    handle.cancel()
+    monkeypatch.setattr(llm_providers, "_gemini_model", lambda *a: pytest.fail("Gemini request sent after cancel"))
+    assert llm_providers._score_with_gemini("prompt", handle) is None
@@ -0,0 +1,68 @@
+"""Parse pools: PyMuPDF work runs in the PARSER_WORKERS pool, Marker work in one separate process."""
+import asyncio
+import os
+import time
+
+import fitz
+import pytest
+
+from backend import parser
+
+
+def _pdf_bytes(text: str) -> bytes:
+    doc = fitz.open()
+    page = doc.new_page()
+    page.insert_text((72, 72), text)
+    data = doc.tobytes()
+    doc.close()
+    return data
+
+
+@pytest.fixture(autouse=True)
+def _fresh_pools(monkeypatch):
+    monkeypatch.setenv("PARSE_CACHE_MAX_MB", "0")
+    parser.shutdown_parse_pool()
+    yield
+    parser.shutdown_parse_pool()
+
+
+def test_fast_parse_never_loads_marker(monkeypatch):
+    monkeypatch.setenv("PARSER_MODE", "adaptive")
+    monkeypatch.setattr(parser, "get_marker_converter", lambda: pytest.fail("Marker loaded in the PyMuPDF stage"))
+    result, _issue = parser._parse_fast(_pdf_bytes("Jane Doe Senior Engineer Python"))
+    assert result.parser == "pymupdf"
+    assert "Jane Doe" in result.text
+
+
+def test_upload_parse_uses_only_the_pymupdf_pool(monkeypatch):
+    monkeypatch.setenv("PARSER_WORKERS", "2")
+    monkeypatch.setenv("PARSER_MODE", "pymupdf")
+    result = asyncio.run(parser.parse_pdf_async(_pdf_bytes("Jane Doe Senior Engineer Python")))
+    assert "Jane Doe" in result.text
+    assert set(parser._parse_pools) == {"pymupdf"}
+
+
+def test_marker_pool_has_one_worker():
+    pool = parser._get_parse_pool("marker")
+    assert pool.executor._max_workers == 1
+
+
+def test_discarded_pool_kills_its_workers(monkeypatch):
+    monkeypatch.setenv("PARSER_WORKERS", "1")
+    pool = parser._get_parse_pool("pymupdf")
+    pid = pool.executor.submit(os.getpid).result(timeout=60)
+    parser._discard_parse_pool("pymupdf", pool)
+    assert "pymupdf" not in parser._parse_pools
+    deadline = time.monotonic() + 10
+    while time.monotonic() < deadline:
+        try:
+            os.kill(pid, 0)
+        except ProcessLookupError:
+            return
+        # Reap the child if it is a zombie of this process.
+        try:
+            os.waitpid(pid, os.WNOHANG)
+        except ChildProcessError:
+            return
+        time.sleep(0.05)
+    pytest.fail("parse worker still running after its pool was discarded")
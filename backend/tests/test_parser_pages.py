@@ -0,0 +1,33 @@
+import fitz
+
+from backend import parser
+
+
+def _pdf_bytes(pages: int) -> bytes:
+    doc = fitz.open()
+    for number in range(pages):
+        doc.new_page().insert_text((72, 72), f"Page {number + 1} text")
+    data = doc.tobytes()
+    doc.close()
+    return data
+
+
+def test_iter_pdf_pages_yields_pages_in_order(monkeypatch):
+    monkeypatch.setenv("PARSER_MAX_PAGES", "0")
+    pages = list(parser.iter_pdf_pages(_pdf_bytes(5), start=1, stop=4))
+    assert [p.strip() for p in pages] == ["Page 2 text", "Page 3 text", "Page 4 text"]
+
+
+def test_iter_pdf_pages_honors_max_pages(monkeypatch):
+    monkeypatch.setenv("PARSER_MAX_PAGES", "2")
+    pages = parser.iter_pdf_pages(_pdf_bytes(5))
+    assert next(pages).strip() == "Page 1 text"
+    assert [p.strip() for p in pages] == ["Page 2 text"]
+
+
+def test_extraction_stops_at_max_pages(monkeypatch):
+    monkeypatch.setenv("PARSER_MAX_PAGES", "2")
+    monkeypatch.setenv("PARSER_MODE", "pymupdf")
+    result = parser.parse_pdf(_pdf_bytes(5))
+    assert "Page 2 text" in result.text and "Page 3 text" not in result.text
+    assert result.truncated
@@ -0,0 +1,53 @@
+from backend.prompt_compaction import _heading_section, _normalize_lines, _split_sections, compact_resume_text
+
+RESUME = """Jane Doe
+jane@example.com
+
+Work Experience
+Senior Engineer, Acme
+- Built data pipelines in Python
+Python
+
+Engineer, Globex
+- Built data pipelines in Python
+Python
+Led data education for new hires
+Cloud work experience across AWS and GCP
+
+Education
+BSc Computer Science
+"""
+
+
+def test_lines_repeated_under_different_roles_are_kept():
+    lines, _ = _normalize_lines(RESUME)
+    assert lines.count("- Built data pipelines in Python") == 2
+    assert lines.count("Python") == 2
+
+
+def test_consecutive_duplicates_and_page_numbers_collapse():
+    lines, dropped = _normalize_lines("Senior Engineer\nSenior Engineer\n\nsenior engineer\nPage 2 of 3\nPython")
+    assert lines == ["Senior Engineer", "", "Python"]
+    assert dropped == 3
+
+
+def test_headings_match_the_whole_line():
+    assert _heading_section("Work Experience") == "experience"
+    assert _heading_section("EDUCATION:") == "education"
+    assert _heading_section("Technical Skills") == "skills"
+    assert _heading_section("Licenses & Certifications") == "certifications"
+    assert _heading_section("Led data education") is None
+    assert _heading_section("Cloud work experience") is None
+    assert _heading_section("Skills in Python and Go") is None
+
+
+def test_content_lines_stay_in_their_section():
+    sections = dict(_split_sections(_normalize_lines(RESUME)[0]))
+    assert set(sections) == {"header", "experience", "education"}
+    assert "Led data education for new hires" in sections["experience"]
+    assert "Cloud work experience across AWS and GCP" in sections["experience"]
+
+
+def test_compaction_without_budget_keeps_repeated_bullets():
+    text = compact_resume_text(RESUME, token_budget=0).text
+    assert text.count("Built data pipelines in Python") == 2
@@ -0,0 +1,43 @@
+import uuid
+from datetime import datetime
+
+from backend import events, store
+from backend.models import Calibration, CandidateProfile, RankingPayload
+
+
+def test_cascade_delta_ranks_match_the_ranking_order(monkeypatch):
+    calibration = Calibration(
+        id=str(uuid.uuid4()),
+        created_at=datetime.utcnow(),
+        requisition_name="T",
+        role="Engineer",
+        location="Remote",
+        scoring_mode="cascade",
+    )
+    store.set_calibration(calibration)
+    names = {"llm-low": "Ann", "rule-high": "Bob", "llm-new": "Cat"}
+    store.add_candidates(
+        calibration.id,
+        [CandidateProfile(id=cid, name=name, parsed_text="", created_at=datetime.utcnow()) for cid, name in names.items()],
+    )
+    generation = calibration.scoring_generation
+    store.set_candidate_scores(
+        calibration.id,
+        {
+            "llm-low": RankingPayload(total_score=40, engine="openai"),
+            "rule-high": RankingPayload(total_score=90),
+        },
+        generation,
+    )
+
+    published = []
+    monkeypatch.setattr(events, "is_watched", lambda cid: True)
+    monkeypatch.setattr(events, "publish", lambda cid, deltas: published.extend(deltas))
+    store.set_candidate_scores(calibration.id, {"llm-new": RankingPayload(total_score=50, engine="openai")}, generation)
+
+    (delta,) = published
+    assert delta["tier"] == "llm"
+    assert delta["previous_rank"] is None
+    order = [c.id for c in store.get_ranked_candidates(calibration.id)]
+    assert order == ["llm-new", "llm-low", "rule-high"]
+    assert delta["rank"] == order.index("llm-new") + 1 == 1
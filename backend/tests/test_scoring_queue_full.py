@@ -0,0 +1,79 @@
+import asyncio
+import io
+import uuid
+from datetime import datetime
+
+import fitz
+import pytest
+from fastapi.testclient import TestClient
+
+from backend import scoring_tasks, store
+from backend.main import app
+from backend.models import CandidateProfile
+from backend.scoring_tasks import ScoringQueueFull, defer_candidates_scoring, fire_due_rescores, queue_candidates_scoring
+
+CALIBRATION = {"requisition_name": "Queue", "role": "Engineer", "location": "Remote", "skills": ["python"]}
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setenv("SCORING_WORKER_MODE", "external")  # enqueue only: no scoring runs during the test
+    return TestClient(app, base_url="http://localhost")
+
+
+def _calibration_with_candidates(client, count):
+    calibration = client.post("/api/calibration", json=CALIBRATION).json()
+    profiles = [
+        CandidateProfile(id=str(uuid.uuid4()), name=f"C{i}", parsed_text="Python", created_at=datetime.utcnow())
+        for i in range(count)
+    ]
+    store.add_candidates(calibration["id"], profiles)
+    return calibration["id"], [p.id for p in profiles]
+
+
+def _pdf(text):
+    doc = fitz.open()
+    doc.new_page().insert_text((72, 72), text)
+    return doc.tobytes()
+
+
+def test_calibration_patch_is_refused_when_rescore_cannot_be_queued(client, monkeypatch):
+    calibration_id, _ = _calibration_with_candidates(client, 3)
+    monkeypatch.setenv("SCORING_QUEUE_MAX", "1")
+    response = client.patch(f"/api/calibration/{calibration_id}", json={**CALIBRATION, "skills": ["go"]})
+    assert response.status_code == 503
+    assert response.headers["retry-after"] == str(scoring_tasks.QUEUE_FULL_RETRY_S)
+    assert store.get_calibration(calibration_id).skills == ["python"]
+
+
+def test_upload_is_refused_before_saving_when_queue_full(client, monkeypatch):
+    calibration_id, _ = _calibration_with_candidates(client, 0)
+    monkeypatch.setenv("SCORING_QUEUE_MAX", "1")
+    files = [("files", (f"r{i}.pdf", io.BytesIO(_pdf(f"Resume {i} Python")), "application/pdf")) for i in range(2)]
+    response = client.post(f"/api/upload?calibration_id={calibration_id}", files=files)
+    assert response.status_code == 503
+    assert "retry-after" in response.headers
+    assert store.get_candidates(calibration_id) == []
+
+
+def test_candidates_added_while_queue_full_are_queued_later(client, monkeypatch):
+    calibration_id, candidate_ids = _calibration_with_candidates(client, 3)
+    queue = scoring_tasks.get_queue()
+    monkeypatch.setattr(scoring_tasks, "QUEUE_FULL_RETRY_S", 0)
+
+    async def run():
+        monkeypatch.setenv("SCORING_QUEUE_MAX", "1")
+        with pytest.raises(ScoringQueueFull):
+            queue_candidates_scoring(calibration_id, candidate_ids)
+        defer_candidates_scoring(calibration_id)
+        assert fire_due_rescores() == 0  # still full: the retry is kept
+        assert queue.next_rescore_due_at() is not None
+        monkeypatch.setenv("SCORING_QUEUE_MAX", "100000")
+        assert fire_due_rescores() == 1
+
+    asyncio.run(run())
+    try:
+        assert {(calibration_id, cid) for cid in candidate_ids} <= queue.job_keys()
+        assert queue.pop_due_deferred() == []
+    finally:
+        scoring_tasks.cancel_calibration_jobs(calibration_id)
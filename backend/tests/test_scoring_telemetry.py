@@ -0,0 +1,33 @@
+import uuid
+from datetime import datetime
+
+from fastapi.testclient import TestClient
+
+from backend import store
+from backend.main import app
+from backend.models import Calibration, CandidateProfile, RankingPayload, ScoringTelemetry
+
+
+def test_latency_percentiles_cover_llm_results_only():
+    calibration = Calibration(
+        id=str(uuid.uuid4()), created_at=datetime.utcnow(), requisition_name="T", role="Engineer", location="Remote"
+    )
+    store.set_calibration(calibration)
+    profiles = [CandidateProfile(id=f"c{i}", name=f"C{i}", parsed_text="", created_at=datetime.utcnow()) for i in range(6)]
+    store.add_candidates(calibration.id, profiles)
+    payloads = {}
+    for i, profile in enumerate(profiles):
+        if i < 2:
+            telemetry = ScoringTelemetry(engine="openai", model="gpt-4o-mini", latency_ms=1000 * (i + 1))
+            payloads[profile.id] = RankingPayload(total_score=50, engine="openai", telemetry=telemetry)
+        else:
+            payloads[profile.id] = RankingPayload(total_score=10, telemetry=ScoringTelemetry(latency_ms=0))
+    store.set_candidate_scores(calibration.id, payloads, calibration.scoring_generation)
+
+    body = TestClient(app, base_url="http://localhost").get(
+        f"/api/analytics/scoring-telemetry?calibration_id={calibration.id}"
+    ).json()
+    assert body["by_engine"] == {"openai": 2, "rule_based": 4}
+    assert body["latency_p50_ms"] == 1000
+    assert body["latency_p95_ms"] == 2000
+    assert body["by_model"][0]["latency_p50_ms"] == 1000
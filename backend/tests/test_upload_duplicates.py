@@ -0,0 +1,46 @@
+import io
+
+import fitz
+import pytest
+from fastapi.testclient import TestClient
+
+from backend.main import app
+
+CALIBRATION = {"requisition_name": "Dupes", "role": "Engineer", "location": "Remote", "skills": ["python"]}
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setenv("SCORING_WORKER_MODE", "external")  # enqueue only: no scoring runs during the test
+    monkeypatch.setenv("PARSER_WORKERS", "0")
+    return TestClient(app, base_url="http://localhost")
+
+
+def _pdf(text):
+    doc = fitz.open()
+    doc.new_page().insert_text((72, 72), text)
+    return doc.tobytes()
+
+
+def _upload(client, calibration_id, named_bytes):
+    files = [("files", (name, io.BytesIO(data), "application/pdf")) for name, data in named_bytes]
+    response = client.post(f"/api/upload?calibration_id={calibration_id}", files=files)
+    assert response.status_code == 200
+    return response
+
+
+def test_sync_upload_flags_each_duplicate_with_the_existing_candidate(client):
+    calibration_id = client.post("/api/calibration", json=CALIBRATION).json()["id"]
+    jane, john = _pdf("Jane Doe Python"), _pdf("John Roe Go")
+
+    first = _upload(client, calibration_id, [("jane.pdf", jane), ("jane-copy.pdf", jane)])
+    body = first.json()
+    assert len(body["candidates"]) == 1
+    jane_id = body["candidates"][0]["id"]
+    assert body["duplicates"] == [{"filename": "jane-copy.pdf", "candidate_id": jane_id}]
+    assert first.headers["x-duplicate-files"] == "1"
+
+    second = _upload(client, calibration_id, [("jane-again.pdf", jane), ("john.pdf", john)])
+    body = second.json()
+    assert len(body["candidates"]) == 2
+    assert body["duplicates"] == [{"filename": "jane-again.pdf", "candidate_id": jane_id}]
@@ -0,0 +1,333 @@
+"""
+Streaming multipart receiver for uploads (POST /api/upload, POST /api/upload-zip).
+
+Starlette's form parsing receives every file in full (in memory up to 1 MB, then in a
+temp file) before the endpoint runs, and the endpoint then read each one into RAM to
+check its size. This receiver writes each file part straight to a spool file as chunks
+arrive and hashes it on the way. It checks the PDF magic bytes at the start of the part
+and stops a file as soon as it passes the size limit; a rejected file's remaining bytes
+are discarded. Memory per request stays at a few chunks whatever the batch size.
+
+ZIP archives are received the same way, then their PDF entries are extracted one at a
+time in chunks (extract_zip_pdfs), with limits on each entry's and the archive's actual
+decompressed size, so a zip bomb is cut off rather than inflated.
+"""
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import os
+import posixpath
+import zipfile
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, BinaryIO, Callable, Optional
+
+from starlette.requests import Request
+
+try:
+    from python_multipart.multipart import MultipartParser, parse_options_header
+except ImportError:  # python-multipart < 0.0.13
+    from multipart.multipart import MultipartParser, parse_options_header
+
+PDF_MAGIC = b"%PDF-"
+MAGIC_WINDOW = 1024  # readers accept the header after a little leading junk, so look this far
+MAX_FILES = 1000  # same default as Starlette's form parser
+CHUNK_BYTES = 1024 * 1024
+
+# kind -> (file suffix, magic bytes, how far into the file the magic may start)
+_KINDS = {"PDF": (".pdf", PDF_MAGIC, MAGIC_WINDOW), "ZIP": (".zip", b"PK\x03\x04", 4)}
+
+
+class UploadRejected(Exception):
+    """The whole request is refused (too large, too many files, malformed multipart)."""
+
+    def __init__(self, status_code: int, detail: str) -> None:
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+
+
+def max_request_bytes() -> int:
+    """UPLOAD_MAX_REQUEST_MB: cap on one upload request's body (default 2048 MB); checked before reading."""
+    try:
+        return int(float(os.environ.get("UPLOAD_MAX_REQUEST_MB") or 2048) * 1024 * 1024)
+    except ValueError:
+        return 2048 * 1024 * 1024
+
+
+def _env_mb(name: str, default: float) -> int:
+    try:
+        return int(float(os.environ.get(name) or default) * 1024 * 1024)
+    except ValueError:
+        return int(default * 1024 * 1024)
+
+
+def zip_max_bytes() -> int:
+    """ZIP_MAX_MB: largest accepted archive (default 1024 MB, compressed)."""
+    return _env_mb("ZIP_MAX_MB", 1024)
+
+
+def zip_max_total_bytes() -> int:
+    """ZIP_MAX_TOTAL_MB: cap on the PDFs extracted from one archive (default 2048 MB, decompressed)."""
+    return _env_mb("ZIP_MAX_TOTAL_MB", 2048)
+
+
+def zip_max_entries() -> int:
+    try:
+        return max(1, int(os.environ.get("ZIP_MAX_ENTRIES") or 2000))
+    except ValueError:
+        return 2000
+
+
+@dataclass
+class SpooledFile:
+    index: int
+    filename: str
+    path: Optional[Path] = None  # None when rejected
+    size: int = 0
+    sha256: Optional[str] = None
+    error: Optional[str] = None  # why the file was rejected
+
+
+@dataclass
+class _Part:
+    field_name: str = ""
+    disposition: bytes = b""
+    upload: Optional[SpooledFile] = None
+    out: Optional[BinaryIO] = None
+    head: bytearray = field(default_factory=bytearray)  # bytes held back until the magic check passes
+    kind: str = "PDF"
+    checked: bool = False
+    hasher: Any = field(default_factory=hashlib.sha256)
+
+
+async def receive_files(
+    request: Request,
+    path_for: Callable[[int], Path],
+    max_file_bytes: int,
+    field_name: str = "files",
+    kind: str = "PDF",
+) -> list[SpooledFile]:
+    """
+    Stream the request's `field_name` file parts to path_for(index). Returns every file in upload
+    order; rejected ones (not a `kind` file, over max_file_bytes) have error set and no spool file.
+    Raises UploadRejected for a refused request; files already spooled are then removed.
+    """
+    content_length = request.headers.get("content-length")
+    if content_length and content_length.isdigit() and int(content_length) > max_request_bytes():
+        raise UploadRejected(413, f"Upload exceeds the {max_request_bytes() // (1024 * 1024)} MB request limit.")
+    _, params = parse_options_header(request.headers.get("content-type", ""))
+    boundary = params.get(b"boundary")
+    if not boundary:
+        raise UploadRejected(400, "Expected a multipart/form-data body.")
+
+    uploads: list[SpooledFile] = []
+    part = _Part()
+    header_name = bytearray()
+    header_value = bytearray()
+    pending: list[tuple[_Part, bytes]] = []  # file data parsed from the current chunk, written after it
+    finished: list[_Part] = []
+
+    def on_part_begin() -> None:
+        nonlocal part
+        part = _Part(kind=kind)
+
+    def on_header_field(data: bytes, start: int, end: int) -> None:
+        header_name.extend(data[start:end])
+
+    def on_header_value(data: bytes, start: int, end: int) -> None:
+        header_value.extend(data[start:end])
+
+    def on_header_end() -> None:
+        if bytes(header_name).lower() == b"content-disposition":
+            part.disposition = bytes(header_value)
+        header_name.clear()
+        header_value.clear()
+
+    def on_headers_finished() -> None:
+        _, options = parse_options_header(part.disposition)
+        part.field_name = options.get(b"name", b"").decode("utf-8", "replace")
+        if b"filename" not in options or part.field_name != field_name:
+            return  # other form fields are ignored
+        if len(uploads) >= MAX_FILES:
+            raise UploadRejected(413, f"Too many files. Maximum number of files is {MAX_FILES}.")
+        filename = options[b"filename"].decode("utf-8", "replace")
+        part.upload = SpooledFile(index=len(uploads), filename=filename or f"file-{len(uploads) + 1}")
+        uploads.append(part.upload)
+        if not part.upload.filename.lower().endswith(_KINDS[kind][0]):
+            part.upload.error = f"Not a {kind}."
+
+    def on_part_data(data: bytes, start: int, end: int) -> None:
+        if part.upload is not None and part.upload.error is None:
+            pending.append((part, data[start:end]))
+
+    def on_part_end() -> None:
+        if part.upload is not None:
+            finished.append(part)
+
+    parser = MultipartParser(
+        boundary,
+        {
+            "on_part_begin": on_part_begin,
+            "on_part_data": on_part_data,
+            "on_part_end": on_part_end,
+            "on_header_field": on_header_field,
+            "on_header_value": on_header_value,
+            "on_header_end": on_header_end,
+            "on_headers_finished": on_headers_finished,
+        },
+    )
+    received = 0
+    try:
+        async for chunk in request.stream():
+            received += len(chunk)
+            if received > max_request_bytes():
+                raise UploadRejected(413, f"Upload exceeds the {max_request_bytes() // (1024 * 1024)} MB request limit.")
+            parser.write(chunk)
+            for p, data in pending:
+                await _write(p, data, path_for, max_file_bytes)
+            pending.clear()
+            for p in finished:
+                await _finish(p)
+            finished.clear()
+        parser.finalize()
+    except UploadRejected:
+        _discard(uploads, part)
+        raise
+    except Exception as exc:
+        _discard(uploads, part)
+        raise UploadRejected(400, f"Malformed multipart body: {exc}") from exc
+    return uploads
+
+
+async def _write(part: _Part, data: bytes, path_for: Callable[[int], Path], max_file_bytes: int) -> None:
+    upload = part.upload
+    assert upload is not None
+    if upload.error is not None:
+        return  # rejected: discard the rest of this file
+    upload.size += len(data)
+    if upload.size > max_file_bytes:
+        _reject(part, f"File exceeds the {max_file_bytes // (1024 * 1024)} MB limit.")
+        return
+    part.hasher.update(data)
+    if not part.checked:
+        _, magic, window = _KINDS[part.kind]
+        part.head.extend(data)
+        if magic in part.head[: window + len(magic) - 1]:
+            part.checked = True
+        elif len(part.head) >= window + len(magic) - 1:
+            _reject(part, f"Not a {part.kind}.")
+            return
+        else:
+            return  # hold back until the magic-byte window is complete
+        data, part.head = bytes(part.head), bytearray()
+    if part.out is None:
+        upload.path = path_for(upload.index)
+        part.out = upload.path.open("wb")
+    await asyncio.to_thread(part.out.write, data)
+
+
+async def _finish(part: _Part) -> None:
+    upload = part.upload
+    assert upload is not None
+    if upload.error is None and not part.checked:
+        _reject(part, f"Not a {part.kind}.")  # shorter than the magic window and no header
+    if upload.error is not None:
+        return
+    await asyncio.to_thread(part.out.close)
+    part.out = None
+    upload.sha256 = part.hasher.hexdigest()
+
+
+def _reject(part: _Part, error: str) -> None:
+    upload = part.upload
+    assert upload is not None
+    upload.error = error
+    part.head = bytearray()
+    if part.out is not None:
+        part.out.close()
+        part.out = None
+    if upload.path is not None:
+        upload.path.unlink(missing_ok=True)
+        upload.path = None
+
+
+def _discard(uploads: list[SpooledFile], current: _Part) -> None:
+    if current.out is not None:
+        current.out.close()
+    for upload in uploads:
+        if upload.path is not None:
+            upload.path.unlink(missing_ok=True)
+            upload.path = None
+
+
+def extract_zip_pdfs(
+    zip_path: Path, path_for: Callable[[int], Path], max_entry_bytes: int
+) -> list[SpooledFile]:
+    """
+    Extract the archive's PDF entries one by one to path_for(index), in chunks (blocking; run in a thread).
+    Every file entry is reported in archive order, skipped ones with error set: not a PDF, encrypted,
+    over max_entry_bytes, or past ZIP_MAX_TOTAL_MB. Sizes are enforced on the bytes actually
+    decompressed, not the sizes the archive declares. Raises UploadRejected for an unreadable archive.
+    """
+    try:
+        archive = zipfile.ZipFile(zip_path)
+    except (zipfile.BadZipFile, OSError) as exc:
+        raise UploadRejected(400, f"Not a readable ZIP archive: {exc}") from exc
+    results: list[SpooledFile] = []
+    total_limit = zip_max_total_bytes()
+    total = 0
+    with archive:
+        for info in archive.infolist():
+            name = info.filename
+            base = posixpath.basename(name.rstrip("/"))
+            if info.is_dir() or name.startswith("__MACOSX/") or base.startswith("."):
+                continue  # folders and macOS/hidden metadata files
+            if len(results) >= zip_max_entries():
+                raise UploadRejected(413, f"Too many files in archive. Maximum is {zip_max_entries()}.")
+            entry = SpooledFile(index=len(results), filename=name)
+            results.append(entry)
+            if not base.lower().endswith(".pdf"):
+                entry.error = "Not a PDF."
+            elif info.flag_bits & 0x1:
+                entry.error = "Encrypted entry."
+            elif info.file_size > max_entry_bytes:
+                entry.error = f"File exceeds the {max_entry_bytes // (1024 * 1024)} MB limit."
+            elif total + info.file_size > total_limit:
+                entry.error = f"Archive exceeds the {total_limit // (1024 * 1024)} MB extraction limit."
+            else:
+                entry.error = _extract_entry(archive, info, entry, path_for(entry.index), min(max_entry_bytes, total_limit - total))
+                total += entry.size
+    return results
+
+
+def _extract_entry(
+    archive: zipfile.ZipFile, info: zipfile.ZipInfo, entry: SpooledFile, path: Path, limit: int
+) -> Optional[str]:
+    """Copy one entry to path; returns an error (and removes the file) or None."""
+    hasher = hashlib.sha256()
+    error: Optional[str] = None
+    try:
+        with archive.open(info) as src, path.open("wb") as out:
+            while chunk := src.read(CHUNK_BYTES):
+                if entry.size == 0 and PDF_MAGIC not in chunk[: MAGIC_WINDOW + len(PDF_MAGIC) - 1]:
+                    error = "Not a PDF."
+                    break
+                entry.size += len(chunk)
+                if entry.size > limit:
+                    error = "Entry is larger than declared or exceeds the size limit."
+                    break
+                hasher.update(chunk)
+                out.write(chunk)
+        if entry.size == 0 and error is None:
+            error = "Empty file."
+    except (zipfile.BadZipFile, RuntimeError, OSError, EOFError) as exc:
+        error = f"Could not extract: {exc}"
+    if error is not None:
+        path.unlink(missing_ok=True)
+        entry.size = 0
+        return error
+    entry.path = path
+    entry.sha256 = hasher.hexdigest()
+    return None
@@ -0,0 +1,201 @@
+"""
+Serialized, compressed views of the large list reads (GET /api/candidates, /api/candidate-rankings).
+
+The default FastAPI path re-validates every model against response_model, converts it to
+dicts with jsonable_encoder, then encodes those in Python. Here the store's models are
+encoded straight to JSON bytes by pydantic-core (Rust, one pass, same output). The bytes,
+and their gzip / brotli encodings, are cached per calibration until the store's data
+version for it changes, so repeated reads of an unchanged ranking cost a lookup and a send.
+
+Compression is negotiated from Accept-Encoding (brotli when the `brotli` package is
+installed, else gzip) for bodies of at least RESPONSE_COMPRESS_MIN_BYTES.
+
+`fields=` projects each item: "summary" (the default: what list and pipeline views show),
+"full" (every field, including resume text and sub-metric evidence), or a comma-separated
+list of field names, with "scoring.<field>" selecting parts of a ranking's scoring state.
+The projection is applied by the serializer, so omitted fields are never encoded. With
+SCORING_EVIDENCE=lazy, rankings that include sub-metrics get their evidence filled in (and
+memoized) by backend.evidence, so `fields=full` reads the same in either mode.
+"""
+from __future__ import annotations
+
+import gzip
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Optional
+
+from pydantic import TypeAdapter
+from starlette.requests import Request
+from starlette.responses import Response
+
+from backend import evidence, store
+from backend.etags import CACHE_CONTROL
+from backend.models import CandidateResult, CandidateScoringState, RankedCandidateResult
+from backend.scoring_engine import evidence_mode
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+MAX_VIEWS = 32  # cached views (latest version per calibration, kind and projection), least recently used dropped first
+
+SUMMARY_FIELDS = ("id", "name", "stage", "rating", "ai_summary", "created_at")
+SUMMARY_SCORING_FIELDS = ("status", "total_score", "summary", "tier", "error")
+
+_candidates_json = TypeAdapter(list[CandidateResult])
+_rankings_json = TypeAdapter(list[RankedCandidateResult])
+
+
+def compress_min_bytes() -> int:
+    """RESPONSE_COMPRESS_MIN_BYTES: smaller bodies go out uncompressed (default 1024; 0 = never compress)."""
+    try:
+        return max(0, int(os.environ.get("RESPONSE_COMPRESS_MIN_BYTES") or 1024))
+    except ValueError:
+        return 1024
+
+
+class View:
+    """JSON bytes of one read at one data version, with lazily built compressed encodings."""
+
+    def __init__(self, version: int, body: bytes) -> None:
+        self.version = version
+        self._encoded: dict[str, bytes] = {"identity": body}
+        self._lock = threading.Lock()
+
+    def encoded(self, encoding: str) -> bytes:
+        with self._lock:
+            if encoding not in self._encoded:
+                body = self._encoded["identity"]
+                if encoding == "br":
+                    self._encoded[encoding] = brotli.compress(body, quality=5)
+                else:
+                    self._encoded[encoding] = gzip.compress(body, compresslevel=6)
+            return self._encoded[encoding]
+
+
+class Projection:
+    """Parsed `fields=` value: the serializer's include spec (None = full) and a key for caches and ETags
+    ("summary", "full", or a digest of the sorted field names, so it is ETag-safe and order-insensitive)."""
+
+    def __init__(self, include: Optional[dict[str, Any]], key: str) -> None:
+        self.include = include
+        self.key = key
+
+
+def parse_fields(raw: Optional[str], ranked: bool) -> Projection:
+    """Parse `fields=` for a candidate list (ranked: ranking items, which have `scoring`). Raises ValueError."""
+    value = (raw or "summary").strip()
+    if value == "full":
+        return Projection(None, "full")
+    if value == "summary":
+        names = list(SUMMARY_FIELDS) + ([f"scoring.{f}" for f in SUMMARY_SCORING_FIELDS] if ranked else [])
+    else:
+        names = [n.strip() for n in value.split(",") if n.strip()]
+    allowed = set(CandidateResult.model_fields)
+    include: dict[str, Any] = {}
+    unknown = []
+    for name in names:
+        head, _, sub = name.partition(".")
+        if ranked and head == "scoring":
+            if not sub:
+                include["scoring"] = True
+            elif sub in CandidateScoringState.model_fields and include.get("scoring") is not True:
+                include.setdefault("scoring", {})[sub] = True
+            elif sub not in CandidateScoringState.model_fields:
+                unknown.append(name)
+        elif head in allowed and not sub:
+            include[head] = True
+        else:
+            unknown.append(name)
+    if unknown or not include:
+        raise ValueError(
+            f"Unknown fields: {', '.join(unknown) or '(none given)'}. Use summary, full, or a comma-separated list of "
+            f"{', '.join(sorted(allowed))}" + (", scoring or scoring.<field>." if ranked else ".")
+        )
+    key = value if value == "summary" else "f" + hashlib.sha1(",".join(sorted(set(names))).encode()).hexdigest()[:16]
+    return Projection({"__all__": include}, key)
+
+
+_views: OrderedDict[tuple[str, str], View] = OrderedDict()
+_views_lock = threading.Lock()
+
+
+def _cached(kind: str, calibration_id: Optional[str], build: Callable[[], bytes]) -> View:
+    cid = calibration_id or store.active_calibration_id() or ""
+    key = (kind, cid)
+    version = store.data_version(cid or None)
+    with _views_lock:
+        view = _views.get(key)
+        if view is not None and view.version == version:
+            _views.move_to_end(key)
+            return view
+    view = View(version, build())
+    # Cache only if nothing changed while building (get_ranked_candidates may itself write pending states).
+    if store.data_version(cid or None) == version:
+        with _views_lock:
+            _views[key] = view
+            _views.move_to_end(key)
+            while len(_views) > MAX_VIEWS:
+                _views.popitem(last=False)
+    return view
+
+
+def candidates_view(calibration_id: Optional[str], fields: Projection) -> View:
+    return _cached(
+        f"candidates:{fields.key}",
+        calibration_id,
+        lambda: _candidates_json.dump_json(store.get_candidates(calibration_id), include=fields.include),
+    )
+
+
+def _includes_sub_metrics(fields: Projection) -> bool:
+    if fields.include is None:
+        return True
+    scoring = fields.include["__all__"].get("scoring")
+    return scoring is True or (isinstance(scoring, dict) and "sub_metrics" in scoring)
+
+
+def _ranked_candidates(calibration_id: Optional[str], fields: Projection) -> list[RankedCandidateResult]:
+    candidates = store.get_ranked_candidates(calibration_id)
+    cid = calibration_id or store.active_calibration_id()
+    if cid and evidence_mode() == "lazy" and _includes_sub_metrics(fields):
+        candidates = [evidence.with_evidence(cid, c) for c in candidates]
+    return candidates
+
+
+def rankings_view(calibration_id: Optional[str], fields: Projection) -> View:
+    return _cached(
+        f"rankings:{fields.key}",
+        calibration_id,
+        lambda: _rankings_json.dump_json(_ranked_candidates(calibration_id, fields), include=fields.include),
+    )
+
+
+def _negotiate(request: Request, size: int) -> str:
+    minimum = compress_min_bytes()
+    if not minimum or size < minimum:
+        return "identity"
+    accepted = {
+        part.split(";")[0].strip().lower()
+        for part in request.headers.get("accept-encoding", "").split(",")
+        if not part.strip().endswith(";q=0")
+    }
+    if brotli is not None and "br" in accepted:
+        return "br"
+    if "gzip" in accepted:
+        return "gzip"
+    return "identity"
+
+
+def json_response(request: Request, view: View, etag: Optional[str] = None) -> Response:
+    encoding = _negotiate(request, len(view.encoded("identity")))
+    headers = {"Vary": "Accept-Encoding"}
+    if encoding != "identity":
+        headers["Content-Encoding"] = encoding
+    if etag:
+        headers["ETag"] = etag
+        headers["Cache-Control"] = CACHE_CONTROL
+    return Response(view.encoded(encoding), media_type="application/json", headers=headers)
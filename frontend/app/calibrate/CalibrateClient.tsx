@@ -241,13 +241,14 @@ export function CalibrateClient() {
         requisition_name: requisition_name || "Unnamed Requisition",
         role,
         location: job_locations[0] ?? "",
-        job_description: job_description || undefined,
-        hiring_company: hiring_company || undefined,
+        // Cleared fields are sent explicitly: PATCH keeps any field the body leaves out.
+        job_description,
+        hiring_company,
         job_locations,
         job_titles,
         companies,
         industries,
-        ideal_candidate: ideal_candidate || undefined,
+        ideal_candidate,
         skills,
         years_experience_min: experienceRange[0],
         years_experience_max: experienceRange[1],
@@ -255,10 +256,10 @@ export function CalibrateClient() {
         seniority_levels,
         schools,
         degrees,
-        graduation_year_min: graduation_year_min ?? undefined,
-        graduation_year_max: graduation_year_max ?? undefined,
+        graduation_year_min,
+        graduation_year_max,
         relocation_allowed: relocation_allowed,
-        workplace_type: workplace_type || undefined,
+        workplace_type,
         exclude_short_tenure: exclude_short_tenure,
         scoring_weight_skills: scoringWeights.skills,
         scoring_weight_titles: scoringWeights.titles,
@@ -7,7 +7,9 @@ import {
   listTemplates,
   getCandidates,
   getCandidateRankings,
-  uploadResumes,
+  startIngestion,
+  getIngestion,
+  subscribeScoringEvents,
   deleteCalibration,
   deleteCandidate,
   updateCandidate,
@@ -16,6 +18,7 @@ import {
   type Calibration,
   type CandidateResult,
   type RankedCandidateResult,
+  type ScoringDelta,
 } from "@/lib/api";
 import { Button } from "@/components/ui/button";
 import { Card, CardContent, CardHeader, CardTitle } from "@/components/ui/card";
@@ -253,15 +256,64 @@ export default function DashboardPage() {
       );
   }, [calibrations, rankingsByCalibrationId]);
 
+  // Read by applyScoringDeltas, whose stream callbacks outlive renders.
+  const cascadeCalibrationIdsRef = useRef<Set<string>>(new Set());
+  cascadeCalibrationIdsRef.current = new Set(calibrations.filter((c) => c.scoring_mode === "cascade").map((c) => c.id));
+
+  const applyScoringDeltas = useCallback((calibrationId: string, deltas: ScoringDelta[]) => {
+    setRankingsByCalibrationId((prev) => {
+      const list = prev[calibrationId];
+      if (!list) return prev;
+      const byId = new Map(deltas.map((d) => [d.candidate_id, d]));
+      const next = list
+        .filter((r) => byId.get(r.id)?.status !== "deleted")
+        .map((r) => {
+          const d = byId.get(r.id);
+          if (!d || d.status === "deleted" || d.status === "calibration_deleted") return r;
+          const scoring = { ...r.scoring, status: d.status, total_score: d.total_score, tier: d.tier, error: d.error ?? null };
+          return { ...r, scoring };
+        });
+      // Same order as the server: completed first, then (cascade) LLM tier before rule-based, then by score.
+      const statusRank: Record<string, number> = { completed: 0, processing: 1, pending: 2, failed: 3 };
+      const cascade = cascadeCalibrationIdsRef.current.has(calibrationId);
+      const tierRank = (r: RankedCandidateResult) =>
+        cascade ? ({ llm: 0, rule_based: 1 } as Record<string, number>)[r.scoring.tier ?? ""] ?? 2 : 0;
+      next.sort(
+        (a, b) =>
+          (statusRank[a.scoring.status] ?? 9) - (statusRank[b.scoring.status] ?? 9) ||
+          tierRank(a) - tierRank(b) ||
+          (b.scoring.total_score ?? -1) - (a.scoring.total_score ?? -1) ||
+          a.name.toLowerCase().localeCompare(b.name.toLowerCase())
+      );
+      return { ...prev, [calibrationId]: next };
+    });
+  }, []);
+
+  // Live scoring progress: one event stream per calibration with scoring in flight. Deltas patch the
+  // ranking in place; the full rankings (sub-metrics, evidence) are fetched once when scoring settles.
+  const scoringStreamsRef = useRef<Record<string, () => void>>({});
   useEffect(() => {
-    if (inFlightCalibrationIds.length === 0) return;
-    const timer = setInterval(() => {
-      inFlightCalibrationIds.forEach((id) => {
-        fetchRankingsForCalibration(id, true).catch(() => {});
-      });
-    }, 3000);
-    return () => clearInterval(timer);
-  }, [inFlightCalibrationIds, fetchRankingsForCalibration]);
+    const streams = scoringStreamsRef.current;
+    for (const id of inFlightCalibrationIds) {
+      if (streams[id]) continue;
+      streams[id] = subscribeScoringEvents(
+        id,
+        (deltas) => applyScoringDeltas(id, deltas),
+        () => fetchRankingsForCalibration(id, true).catch(() => {})
+      );
+    }
+    for (const id of Object.keys(streams)) {
+      if (inFlightCalibrationIds.includes(id)) continue;
+      streams[id]();
+      delete streams[id];
+      fetchRankingsForCalibration(id, true).catch(() => {});
+    }
+  }, [inFlightCalibrationIds, applyScoringDeltas, fetchRankingsForCalibration]);
+
+  useEffect(() => {
+    const streams = scoringStreamsRef.current;
+    return () => Object.values(streams).forEach((close) => close());
+  }, []);
 
   const onUpload = async (e: React.ChangeEvent<HTMLInputElement>, calibrationId: string) => {
     const files = e.target.files;
@@ -270,14 +322,27 @@ export default function DashboardPage() {
     setError(null);
     try {
       const list = Array.from(files);
-      const next = await uploadResumes(list, calibrationId);
+      // The server accepts the batch right away (202) and parses in the background; poll its progress.
+      let ingestion = await startIngestion(list, calibrationId);
+      while (ingestion.state !== "completed") {
+        const done = ingestion.total - (ingestion.counts.queued ?? 0) - (ingestion.counts.parsing ?? 0);
+        setSuccessMessage(`Processing resumes: ${done}/${ingestion.total}`);
+        await new Promise((resolve) => setTimeout(resolve, 1000));
+        ingestion = await getIngestion(ingestion.ingestion_id);
+      }
+      const next = await getCandidates(calibrationId);
       setCandidatesByCalibrationId((prev) => ({ ...prev, [calibrationId]: next }));
       await fetchRankingsForCalibration(calibrationId, true);
       const name = calibrations.find((c) => c.id === calibrationId)?.requisition_name ?? "Job";
+      const added = ingestion.counts.added ?? 0;
+      const duplicates = ingestion.counts.duplicate ?? 0;
+      const skipped = duplicates > 0 ? ` (${duplicates} duplicate${duplicates === 1 ? "" : "s"} skipped)` : "";
       setSuccessMessage(
-        list.length > 0
-          ? `${list.length} resume${list.length === 1 ? "" : "s"} queued for scoring in ${name}`
-          : "No new resumes added (only PDFs under 15MB are accepted)"
+        added > 0
+          ? `${added} resume${added === 1 ? "" : "s"} queued for scoring in ${name}${skipped}`
+          : duplicates > 0
+            ? `No new resumes added${skipped}`
+            : "No new resumes added (only PDFs under 15MB are accepted)"
       );
       setTimeout(() => setSuccessMessage(null), 4000);
     } catch (err) {
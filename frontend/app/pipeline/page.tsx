@@ -19,7 +19,7 @@ import {
   getCandidates,
   updateCandidate,
   type Calibration,
-  type CandidateResult,
+  type CandidateSummary,
 } from "@/lib/api";
 import { Button } from "@/components/ui/button";
 import { Card, CardContent } from "@/components/ui/card";
@@ -132,7 +132,7 @@ function DroppableColumn({
 
 export default function PipelinePage() {
   const [jobs, setJobs] = useState<Calibration[]>([]);
-  const [candidatesByJobId, setCandidatesByJobId] = useState<Record<string, CandidateResult[]>>({});
+  const [candidatesByJobId, setCandidatesByJobId] = useState<Record<string, CandidateSummary[]>>({});
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState<string | null>(null);
   const [activeId, setActiveId] = useState<string | null>(null);
@@ -147,10 +147,10 @@ export default function PipelinePage() {
     try {
       const list = await listCalibrations();
       setJobs(list);
-      const byId: Record<string, CandidateResult[]> = {};
+      const byId: Record<string, CandidateSummary[]> = {};
       await Promise.all(
         list.map(async (job) => {
-          const cand = await getCandidates(job.id);
+          const cand = await getCandidates(job.id, "summary");
           byId[job.id] = cand;
         })
       );
@@ -270,7 +270,7 @@ export default function PipelinePage() {
               {jobs.map((job) => {
                 const stages = job.pipeline_stages?.length ? job.pipeline_stages : ["Applied", "Screening", "Interview", "Offer"];
                 const candidates = candidatesByJobId[job.id] ?? [];
-                const byStage = stages.reduce<Record<string, CandidateResult[]>>((acc, s) => {
+                const byStage = stages.reduce<Record<string, CandidateSummary[]>>((acc, s) => {
                   acc[s] = candidates.filter((c) => (c.stage ?? stages[0]) === s);
                   return acc;
                 }, {});
@@ -375,7 +375,7 @@ function DraggableKanbanCard({
   getInitials,
 }: {
   jobId: string;
-  candidate: CandidateResult;
+  candidate: CandidateSummary;
   stages: string[];
   currentStage: string;
   stageBorderColor: string;
@@ -412,7 +412,7 @@ function CandidateKanbanCard({
   getInitials,
   dragHandle,
 }: {
-  candidate: CandidateResult;
+  candidate: CandidateSummary;
   stages: string[];
   currentStage: string;
   stageBorderColor: string;
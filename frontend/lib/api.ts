@@ -62,6 +62,11 @@ export interface CalibrationCreate {
   scoring_weight_education?: number | null;
   scoring_weight_experience?: number | null;
   scoring_weight_context?: number | null;
+  /** "cascade": rule-based pass for everyone, LLM only for the shortlist (top N / top % / score floor). */
+  scoring_mode?: "standard" | "cascade";
+  cascade_top_n?: number | null;
+  cascade_top_percent?: number | null;
+  cascade_min_score?: number | null;
 }
 
 export interface Calibration extends CalibrationCreate {
@@ -69,6 +74,7 @@ export interface Calibration extends CalibrationCreate {
   created_at: string;
   pipeline_stages?: string[];
   is_template?: boolean;
+  scoring_generation?: number;
 }
 
 export interface CandidateResult {
@@ -83,6 +89,12 @@ export interface CandidateResult {
   ai_summary?: string | null;
 }
 
+/** List item in the default `fields=summary` projection (no resume text or notes). */
+export type CandidateSummary = Pick<CandidateResult, "id" | "name" | "created_at" | "stage" | "rating" | "ai_summary">;
+
+/** `fields=` for the candidate list reads: "summary", "full", or comma-separated field names. */
+export type CandidateFields = "summary" | "full" | (string & {});
+
 export interface CandidateUpdate {
   stage?: string;
   rating?: number;
@@ -114,6 +126,22 @@ export interface CandidateScoringState {
   sub_metrics: RankingSubMetric[];
   error?: string | null;
   updated_at: string;
+  tier?: "rule_based" | "llm" | null;
+  rule_based_score?: number | null;
+  llm_score?: number | null;
+  generation?: number | null;
+  telemetry?: ScoringTelemetry | null;
+}
+
+export interface ScoringTelemetry {
+  engine: "rule_based" | "openai" | "openrouter" | "gemini";
+  model: string | null;
+  prompt_tokens: number;
+  completion_tokens: number;
+  cached_tokens: number;
+  cache_hit: boolean;
+  latency_ms: number;
+  retry_count: number;
 }
 
 export interface RankedCandidateResult extends CandidateResult {
@@ -124,6 +152,12 @@ export interface RescoreResult {
   queued: number;
   calibration_id: string;
   candidate_id?: string;
+  queue_position?: number | null;
+  queue_depth?: number;
+  in_flight?: number;
+  workers?: number;
+  eta_seconds?: number | null;
+  rescore_scheduled_at?: string | null;
 }
 
 export async function getCalibration(): Promise<Calibration | null> {
@@ -191,7 +225,11 @@ export async function createCalibration(body: CalibrationCreate): Promise<Calibr
   return res.json();
 }
 
-export async function updateCalibration(calibrationId: string, body: CalibrationCreate): Promise<Calibration> {
+export interface CalibrationUpdateResult extends Calibration {
+  rescore_scheduled_at?: string | null;
+}
+
+export async function updateCalibration(calibrationId: string, body: CalibrationCreate): Promise<CalibrationUpdateResult> {
   const res = await wrapFetch(`${API}/api/calibration/${calibrationId}`, {
     method: "PATCH",
     headers: { "Content-Type": "application/json" },
@@ -206,24 +244,62 @@ export async function deleteCalibration(calibrationId: string): Promise<void> {
   if (!res.ok) await handleResponse(res);
 }
 
-export async function getCandidates(calibrationId?: string): Promise<CandidateResult[]> {
-  const url = calibrationId
-    ? `${API}/api/candidates?calibration_id=${encodeURIComponent(calibrationId)}`
-    : `${API}/api/candidates`;
-  const res = await wrapFetch(url);
+function candidateListUrl(path: string, calibrationId: string | undefined, fields: CandidateFields): string {
+  const params = new URLSearchParams({ fields });
+  if (calibrationId) params.set("calibration_id", calibrationId);
+  return `${API}/api/${path}?${params}`;
+}
+
+export async function getCandidates(calibrationId?: string, fields?: "full"): Promise<CandidateResult[]>;
+export async function getCandidates(calibrationId: string | undefined, fields: "summary"): Promise<CandidateSummary[]>;
+export async function getCandidates(calibrationId?: string, fields: CandidateFields = "full"): Promise<CandidateSummary[]> {
+  const res = await wrapFetch(candidateListUrl("candidates", calibrationId, fields));
   if (!res.ok) await handleResponse(res);
   return res.json();
 }
 
-export async function getCandidateRankings(calibrationId?: string): Promise<RankedCandidateResult[]> {
-  const url = calibrationId
-    ? `${API}/api/candidate-rankings?calibration_id=${encodeURIComponent(calibrationId)}`
-    : `${API}/api/candidate-rankings`;
-  const res = await wrapFetch(url);
+export async function getCandidateRankings(calibrationId?: string, fields: CandidateFields = "full"): Promise<RankedCandidateResult[]> {
+  const res = await wrapFetch(candidateListUrl("candidate-rankings", calibrationId, fields));
   if (!res.ok) await handleResponse(res);
   return res.json();
 }
 
+/** One candidate with resume text, scoring state and evidence (pair with `fields=summary` lists). */
+export async function getCandidate(calibrationId: string, candidateId: string): Promise<RankedCandidateResult> {
+  const res = await wrapFetch(
+    `${API}/api/calibrations/${encodeURIComponent(calibrationId)}/candidates/${encodeURIComponent(candidateId)}`
+  );
+  if (!res.ok) await handleResponse(res);
+  return res.json();
+}
+
+/** One candidate's scoring change, pushed by the live scoring event stream. */
+export interface ScoringDelta {
+  candidate_id: string;
+  status: CandidateScoringState["status"] | "deleted" | "calibration_deleted";
+  total_score: number | null;
+  tier: CandidateScoringState["tier"];
+  rank: number | null;
+  previous_rank: number | null;
+  error?: string | null;
+}
+
+/**
+ * Follow a calibration's scoring progress over Server-Sent Events instead of polling the rankings.
+ * The browser reconnects on its own and resumes from the last event; onReset means deltas were
+ * missed (e.g. the server restarted) and the rankings should be fetched again. Returns a close function.
+ */
+export function subscribeScoringEvents(
+  calibrationId: string,
+  onDeltas: (deltas: ScoringDelta[]) => void,
+  onReset: () => void
+): () => void {
+  const source = new EventSource(`${API}/api/calibrations/${encodeURIComponent(calibrationId)}/events`);
+  source.addEventListener("scoring", (e) => onDeltas(JSON.parse((e as MessageEvent).data)));
+  source.addEventListener("reset", () => onReset());
+  return () => source.close();
+}
+
 export async function rescoreCandidateRankings(
   calibrationId: string,
   candidateId?: string
@@ -296,7 +372,18 @@ export async function getAnalyticsOverview(params?: { year?: number; month?: num
   return res.json();
 }
 
-export async function uploadResumes(files: File[], calibrationId?: string): Promise<CandidateResult[]> {
+/** A file the sync upload skipped as an exact copy of a candidate's resume (null id: the batch's first copy failed). */
+export interface UploadDuplicate {
+  filename: string;
+  candidate_id: string | null;
+}
+
+export interface UploadResult {
+  candidates: CandidateResult[];
+  duplicates: UploadDuplicate[];
+}
+
+export async function uploadResumes(files: File[], calibrationId?: string): Promise<UploadResult> {
   const form = new FormData();
   files.forEach((f) => form.append("files", f));
   const url = calibrationId
@@ -316,3 +403,44 @@ export async function uploadResumes(files: File[], calibrationId?: string): Prom
   }
   return res.json();
 }
+
+export interface IngestionFile {
+  index: number;
+  filename: string;
+  size: number;
+  status: "queued" | "parsing" | "added" | "failed" | "rejected" | "duplicate";
+  candidate_id: string | null;
+  error: string | null;
+  sha256: string | null;
+  scoring_status: CandidateScoringState["status"] | null;
+  updated_at: string;
+}
+
+export interface IngestionStatus {
+  ingestion_id: string;
+  calibration_id: string;
+  state: "running" | "completed";
+  created_at: string;
+  finished_at: string | null;
+  total: number;
+  counts: Partial<Record<IngestionFile["status"], number>>;
+  files: IngestionFile[];
+}
+
+/** Async upload: the server spools the files and returns 202 right away; poll getIngestion for progress. */
+export async function startIngestion(files: File[], calibrationId: string): Promise<IngestionStatus> {
+  const form = new FormData();
+  files.forEach((f) => form.append("files", f));
+  const res = await wrapFetch(
+    `${API}/api/upload?calibration_id=${encodeURIComponent(calibrationId)}&mode=async`,
+    { method: "POST", body: form }
+  );
+  if (!res.ok) await handleResponse(res);
+  return res.json();
+}
+
+export async function getIngestion(ingestionId: string): Promise<IngestionStatus> {
+  const res = await wrapFetch(`${API}/api/ingestions/${encodeURIComponent(ingestionId)}`);
+  if (!res.ok) await handleResponse(res);
+  return res.json();
+}